@@ -0,0 +1,88 @@
+"""
+Memory per Card: dict-backed layout (pre-__slots__) vs the current Card.
+
+    python benchmarks/bench_card_memory.py [count]
+"""
+
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from edhelper.domain.card import Card  # noqa: E402
+
+COLORS = ["W", "U", "B", "R", "G", "U,R", "B,G", "W,U,B", ""]
+TYPES = ["Artifact", "Instant", "Sorcery", "Legendary Creature — Elf Druid", "Land"]
+
+
+class DictCard:
+    """The previous Card layout: a regular instance __dict__."""
+
+    def __init__(self, *values):
+        (
+            self.id,
+            self.name,
+            self.colors,
+            self.color_identity,
+            self.cmc,
+            self.mana_cost,
+            self.image,
+            self.art,
+            self.legal_commanders,
+            self.is_commander,
+            self.price,
+            self.edhrec_rank,
+            self.type_line,
+        ) = values
+        self.commander_rank = None
+
+
+def iter_rows(count):
+    rng = random.Random(42)
+    for i in range(count):
+        color = rng.choice(COLORS)
+        # Strings are rebuilt per row, as sqlite3 returns a new object for
+        # every column value it decodes.
+        yield (
+            f"{i:08x}-0000-0000-0000-000000000000",
+            f"Card Name {i}",
+            "".join(color),
+            "".join(color),
+            rng.randint(0, 10),
+            "{" + str(rng.randint(0, 5)) + "}",
+            f"https://cards.scryfall.io/normal/front/{i}.jpg",
+            f"https://cards.scryfall.io/art_crop/front/{i}.jpg",
+            1,
+            0,
+            f"{rng.random() * 100:.2f}".replace(".", ","),
+            i,
+            "".join(rng.choice(TYPES)),
+        )
+
+
+def measure(factory, count):
+    """Bytes retained per card once the decoded rows are gone."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(row) for row in iter_rows(count)]
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # The list holding the objects is not part of the per-card cost.
+    size -= sys.getsizeof(objects)
+    return size / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    legacy = measure(lambda row: DictCard(*row), count)
+    slotted = measure(Card.from_row, count)
+    print(f"cards: {count}")
+    print(f"dict-backed Card : {legacy:8.1f} bytes/card")
+    print(f"slotted Card     : {slotted:8.1f} bytes/card")
+    print(f"saved            : {100 * (1 - slotted / legacy):7.1f} %")
+
+
+if __name__ == "__main__":
+    main()
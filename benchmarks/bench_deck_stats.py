@@ -0,0 +1,89 @@
+"""
+Deck statistics for many decks: one deck_statistics() call per deck vs a
+single decks_statistics() call, with the pure-Python sums and, when NumPy
+is installed (pip install edhelper[stats]), the NumPy ones.
+
+    python benchmarks/bench_deck_stats.py [decks]
+"""
+
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import edhelper.commom.deck_analyzer as deck_analyzer  # noqa: E402
+from edhelper.domain.card import Card  # noqa: E402
+from edhelper.domain.deck_card import DeckCard  # noqa: E402
+
+TYPES = [
+    "Legendary Creature — Elf Druid",
+    "Artifact Creature — Golem",
+    "Basic Land — Forest",
+    "Land",
+    "Instant",
+    "Sorcery",
+    "Artifact",
+    "Enchantment — Aura",
+    "Legendary Planeswalker — Nissa",
+    "Instant // Land",
+]
+COSTS = ["", "{1}{G}", "{2}{G/U}{G}", "{W/P}{B}", "{X}{R}{R}", "{3}", "{C}{C}"]
+
+
+def make_decks(count, size=100):
+    rng = random.Random(42)
+    decks = []
+    for deck_id in range(count):
+        deck_cards = []
+        for i in range(size):
+            card = Card(
+                id=f"{deck_id}-{i}",
+                name=f"Card {deck_id}-{i}",
+                cmc=rng.randint(0, 9),
+                mana_cost=rng.choice(COSTS),
+                type_line=rng.choice(TYPES),
+                price_brl_cents=rng.randint(0, 10000),
+            )
+            deck_cards.append(DeckCard(deck_id, card, 1, i == 0))
+        decks.append(deck_cards)
+    return decks
+
+
+def best(stmt, number=5):
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    decks = make_decks(count)
+    columns = deck_analyzer.DeckColumns.from_decks(decks)
+    print(f"decks: {count}, rows: {len(columns)}")
+    print(
+        "per deck            : %8.2f ms"
+        % best(lambda: [deck_analyzer.deck_statistics(deck) for deck in decks])
+    )
+    print(
+        "decks_statistics    : %8.2f ms"
+        % best(lambda: deck_analyzer.decks_statistics(decks))
+    )
+    print(
+        "  columnar view     : %8.2f ms"
+        % best(lambda: deck_analyzer.DeckColumns.from_decks(decks))
+    )
+    print(
+        "  sums, Python      : %8.2f ms"
+        % best(lambda: deck_analyzer._sums_python(columns))
+    )
+    if deck_analyzer.numpy_available():
+        print(
+            "  sums, NumPy       : %8.2f ms"
+            % best(lambda: deck_analyzer._sums_numpy(columns))
+        )
+    else:
+        print("  sums, NumPy       :  not installed")
+
+
+if __name__ == "__main__":
+    main()
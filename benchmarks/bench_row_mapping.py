@@ -0,0 +1,90 @@
+"""
+Decoding cost of card rows: positional Card(...) construction over SELECT *
+vs the mapper row factories, with and without column projection.
+
+    python benchmarks/bench_row_mapping.py [count]
+"""
+
+import sqlite3
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from edhelper.domain.card import Card  # noqa: E402
+from edhelper.domain.mapper import (  # noqa: E402
+    CARD_FIELDS,
+    CARD_NAME_FIELDS,
+    fetch_cards,
+)
+
+SCHEMA = Path(__file__).resolve().parents[1] / "edhelper" / "infra" / "schema.sql"
+
+
+def make_db(count):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA.read_text())
+    conn.executemany(
+        "INSERT INTO cards VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                f"{i:08x}-0000-0000-0000-000000000000",
+                f"Card Name {i}",
+                "U,R",
+                "U,R",
+                i % 10,
+                "{1}{U}{R}",
+                f"https://cards.scryfall.io/normal/front/{i}.jpg",
+                f"https://cards.scryfall.io/art_crop/front/{i}.jpg",
+                1,
+                0,
+                "12,34",
+                i,
+                "Legendary Creature — Human Wizard",
+            )
+            for i in range(count)
+        ),
+    )
+    return conn
+
+
+def positional(cursor):
+    rows = cursor.execute("SELECT * FROM cards").fetchall()
+    return [
+        Card(
+            row[0],
+            row[1],
+            row[2],
+            row[3],
+            row[4],
+            row[5],
+            row[6],
+            row[7],
+            row[8],
+            row[9],
+            row[10],
+            row[11],
+            None,
+            row[12],
+        )
+        for row in rows
+    ]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    cursor = make_db(count).cursor()
+    cases = [
+        ("positional Card(...), SELECT *", lambda: positional(cursor)),
+        ("mapper, all fields", lambda: fetch_cards(cursor, fields=CARD_FIELDS)),
+        ("mapper, id + name", lambda: fetch_cards(cursor, fields=CARD_NAME_FIELDS)),
+    ]
+    print(f"cards: {count}")
+    for label, func in cases:
+        best = min(timeit.repeat(func, number=1, repeat=5))
+        print(f"{label:32s}: {best * 1000:8.1f} ms ({best / count * 1e6:.2f} us/card)")
+
+
+if __name__ == "__main__":
+    main()
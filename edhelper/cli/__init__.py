@@ -7,10 +7,15 @@ import click
 import subprocess
 import webbrowser
 from edhelper.infra.config import settings
+from edhelper.infra.db import enable_sql_profiling
+from edhelper.infra.sql_profiler import profiler
+from edhelper.infra import startup
+from edhelper.external.http_cache import cache_mode
 from .utils import handle_cli_exceptions, DECK_NAME, TXT_FILE
 from .deck import register_deck_commands
 from .card import register_card_commands
 from .export import register_export_commands
+from .db import register_db_commands
 
 
 @click.group(invoke_without_command=True)
@@ -21,14 +26,37 @@ from .export import register_export_commands
     "--set-key", is_flag=True, help="Create and store API credentials using keyring."
 )
 @click.option("--logout", is_flag=True)
+@click.option(
+    "--profile-sql",
+    is_flag=True,
+    help="Time every SQL statement and print the slowest ones at exit.",
+)
+@click.option("--no-cache", is_flag=True, help="Bypass the HTTP response cache.")
+@click.option(
+    "--refresh",
+    is_flag=True,
+    help="Ignore cached HTTP responses and store fresh ones.",
+)
 @click.pass_context
-def cli(ctx, version, info, get_key, set_key, logout):
+def cli(ctx, version, info, get_key, set_key, logout, profile_sql, no_cache, refresh):
     """edhelper — EDH deck builder & analyzer."""
 
     if version:
         click.echo(f"edhelper {settings.VERSION}")
         ctx.exit()
 
+    if info:
+        click.echo(f"{settings.NAME} {settings.VERSION}")
+        click.echo(f"Database: {settings.DATABASE_URL}")
+        click.echo(f"API: {settings.API_URL}")
+        authenticated = "yes" if settings.user_is_authenticated() else "no"
+        click.echo(f"Authenticated: {authenticated}")
+        click.echo(startup.report())
+        ctx.exit()
+
+    if settings.STARTUP_PROFILE:
+        ctx.call_on_close(lambda: click.echo(startup.report(), err=True))
+
     if set_key:
         try:
             from edhelper.external.api import create_client
@@ -59,10 +87,23 @@ def cli(ctx, version, info, get_key, set_key, logout):
         click.echo("You need to authenticate first (--set-key).")
         ctx.exit()
 
+    if (profile_sql or settings.SQL_PROFILE) and ctx.invoked_subcommand:
+        enable_sql_profiling()
+        ctx.call_on_close(
+            lambda: click.echo(profiler.report(settings.SQL_PROFILE_TOP), err=True)
+        )
+        ctx.with_resource(profiler.label(ctx.invoked_subcommand))
+
+    if no_cache:
+        ctx.with_resource(cache_mode("off"))
+    elif refresh:
+        ctx.with_resource(cache_mode("refresh"))
+
 
 register_deck_commands(cli)
 register_card_commands(cli)
 register_export_commands(cli)
+register_db_commands(cli)
 
 
 @cli.command()
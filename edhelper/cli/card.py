@@ -26,9 +26,12 @@ def register_card_commands(cli_group):
 
     @card.command("search")
     @click.argument("partial", type=str)
+    @click.option(
+        "--refresh", is_flag=True, help="Query the API even if cards are stored."
+    )
     @handle_cli_exceptions
-    def card_search(partial):
-        CardCommands.search(partial)
+    def card_search(partial, refresh):
+        CardCommands.search(partial, refresh=refresh)
 
     @card.command("top-commanders")
     @handle_cli_exceptions
@@ -37,7 +40,34 @@ def register_card_commands(cli_group):
         TopCommandersCommands.show_top_commanders()
 
     @card.command("sync-db")
+    @click.option(
+        "--stale",
+        is_flag=True,
+        help="Only sync cards whose data or price is past its TTL.",
+    )
+    @click.option(
+        "--limit",
+        type=click.IntRange(min=1),
+        default=None,
+        help="With --stale, sync at most this many cards.",
+    )
+    @click.option(
+        "--resume",
+        is_flag=True,
+        help="Continue the last full sync that did not finish.",
+    )
     @handle_cli_exceptions
-    def sync_db():
+    def sync_db(stale, limit, resume):
         """Sync all cards in database with API."""
-        SyncDbCommands.sync_database()
+        if stale and resume:
+            raise click.UsageError("--stale and --resume cannot be used together.")
+        if stale:
+            SyncDbCommands.sync_stale(limit)
+        else:
+            SyncDbCommands.sync_database(resume=resume)
+
+    @card.command("sync-prices")
+    @handle_cli_exceptions
+    def sync_prices():
+        """Sync the price of every card in database with Scryfall."""
+        SyncDbCommands.sync_all_prices()
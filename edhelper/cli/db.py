@@ -0,0 +1,32 @@
+"""
+Comandos relacionados ao banco de dados local.
+"""
+
+import click
+from edhelper.commom.catalog_commands import CatalogCommands
+from .utils import handle_cli_exceptions
+
+
+def register_db_commands(cli_group):
+    """Registra todos os comandos relacionados ao banco de dados."""
+
+    @cli_group.group()
+    def db():
+        """Local database utilities."""
+        pass
+
+    @db.command("ingest")
+    @click.argument(
+        "bulk_file", type=click.Path(exists=True, dir_okay=False, readable=True)
+    )
+    @click.option(
+        "--batch-size",
+        type=click.IntRange(min=1),
+        default=5000,
+        show_default=True,
+        help="Cards written per transaction.",
+    )
+    @handle_cli_exceptions
+    def ingest(bulk_file, batch_size):
+        """Load a Scryfall oracle-cards/default-cards bulk file."""
+        CatalogCommands.ingest(bulk_file, batch_size)
@@ -84,6 +84,12 @@ def register_deck_commands(cli_group):
     def list_decks(limit):
         DeckListCommands.show(limit)
 
+    @deck.command("sync-status")
+    @handle_cli_exceptions
+    def deck_sync_status():
+        """List decks by when they were last synced, stalest first."""
+        DeckListCommands.sync_status()
+
     @deck.command("show")
     @click.argument("deck_name", type=DECK_NAME)
     @handle_cli_exceptions
@@ -114,6 +120,12 @@ def register_deck_commands(cli_group):
         """Get meta cards for a commander from EDHREC."""
         CommanderMetaCommands.get_meta(commander_name, category)
 
+    @deck.command("meta-prefetch")
+    @handle_cli_exceptions
+    def deck_meta_prefetch():
+        """Cache EDHREC data for the commander of every deck."""
+        CommanderMetaCommands.prefetch()
+
     @deck.command("add")
     @click.argument("deck_name", type=DECK_NAME)
     @click.argument("card_name", type=DECK_NAME)
@@ -141,6 +153,14 @@ def register_deck_commands(cli_group):
         cmd = DeckCardCommands.from_deck_name(deck_name)
         cmd.edit_quantity(card_name, qty)
 
+    @deck.command("sync-prices")
+    @click.argument("deck_name", type=DECK_NAME)
+    @handle_cli_exceptions
+    def deck_sync_prices(deck_name):
+        """Sync the prices of every card in a deck with Scryfall."""
+        cmd = DeckCommands.from_name(deck_name)
+        cmd.sync_prices()
+
     @deck.command("analyze")
     @click.argument("deck_name", type=DECK_NAME)
     @handle_cli_exceptions
@@ -14,6 +14,10 @@ from edhelper.commom.excptions import (
     CardIsCommander,
     ShortPartial,
     InvalidQuantity,
+    SyncNotAvailable,
+    NoSyncToResume,
+    SyncAlreadyRunning,
+    UpstreamError,
 )
 
 
@@ -32,6 +36,10 @@ def handle_cli_exceptions(func):
             CardIsCommander,
             ShortPartial,
             InvalidQuantity,
+            SyncNotAvailable,
+            NoSyncToResume,
+            SyncAlreadyRunning,
+            UpstreamError,
         ) as e:
             cli_handler.handle(e)
             return
@@ -10,12 +10,11 @@ class CardCommands:
         self.card: Card = card
 
     @staticmethod
-    def search(partial: str):
+    def search(partial: str, refresh: bool = False):
         if len(partial) < 3:
             raise ShortPartial(partial)
         try:
-            cards = card_service.get_autocomplete_from_api(partial=partial)
-            card_service.insert_or_update_cards(cards)
+            cards = card_service.get_by_autocomplete(partial, refresh=refresh)
             data = [
                 [
                     "ID",
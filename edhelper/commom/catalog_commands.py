@@ -0,0 +1,44 @@
+import click
+import edhelper.domain.card_service as card_service
+from edhelper.external.currency import get_usd_to_brl_rate
+from edhelper.external.scryfall_bulk import iter_bulk_cards
+from edhelper.infra.db import transaction
+
+
+class CatalogCommands:
+    @staticmethod
+    def _store_batch(batch):
+        with transaction() as t:
+            # Cards already in the database keep their id so deck_cards
+            # references stay valid when a bulk file uses another printing.
+            existing = card_service.get_card_ids_by_name(
+                [card.name for card in batch], cursor=t
+            )
+            for card in batch:
+                card.id = existing.get(card.name, card.id)
+            card_service.insert_or_update_cards(batch, cursor=t)
+
+    @staticmethod
+    def ingest(path: str, batch_size: int = 5000):
+        """Load a Scryfall bulk-data file into the cards table."""
+        rate = get_usd_to_brl_rate()
+        total = 0
+        batch = []
+        click.echo(f"Ingesting cards from {path}...")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for card in iter_bulk_cards(f, rate):
+                    batch.append(card)
+                    if len(batch) >= batch_size:
+                        CatalogCommands._store_batch(batch)
+                        total += len(batch)
+                        batch = []
+                        click.echo(f"  {total} cards stored...")
+                if batch:
+                    CatalogCommands._store_batch(batch)
+                    total += len(batch)
+            click.echo(f"Successfully ingested {total} cards.")
+            return total
+        except Exception as e:
+            click.echo(f"Error ingesting {path}: {e}", err=True)
+            raise e
@@ -1,9 +1,11 @@
 import click
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tabulate import tabulate
 from edhelper.commom.card_commands import CardCommands
 from edhelper.external.edhec import get_edhrec_cardlists
-from edhelper.external.api import get_many_cards_from_api
+from edhelper.external.batch import fetch_cards_in_batches
 import edhelper.domain.card_service as card_service
+import edhelper.domain.deck_service as deck_service
 from .excptions import CardNotFound
 
 CATEGORIES = [
@@ -71,7 +73,7 @@ class CommanderMetaCommands:
                 f"Fetching {len(card_names)} cards from category '{category}'..."
             )
 
-            cards = get_many_cards_from_api(card_names)
+            cards = fetch_cards_in_batches(card_names).cards
 
             card_service.insert_or_update_cards(cards)
 
@@ -106,3 +108,31 @@ class CommanderMetaCommands:
         except Exception as e:
             click.echo(f"Error: {e}", err=True)
             raise e
+
+    @staticmethod
+    def prefetch(workers: int = 4):
+        """Warm the EDHREC cache for the commander of every deck."""
+        try:
+            names = deck_service.get_commander_names()
+            if not names:
+                click.echo("No deck has a commander yet.")
+                return
+            click.echo(f"Fetching EDHREC data for {len(names)} commanders...")
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(get_edhrec_cardlists, name): name for name in names
+                }
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        card_lists = future.result()
+                    except Exception as e:
+                        click.echo(f"  {name}: error ({e})", err=True)
+                        continue
+                    if card_lists:
+                        click.echo(f"  {name}: {len(card_lists)} categories")
+                    else:
+                        click.echo(f"  {name}: no data on EDHREC")
+        except Exception as e:
+            click.echo(f"Error: {e}", err=True)
+            raise e
@@ -1,7 +1,14 @@
+import re
+from functools import lru_cache
 from edhelper.domain.deck_card import DeckCard
 from edhelper.domain.card import Card
 from typing import List, Dict, Tuple
 
+try:
+    import numpy as np
+except ImportError:  # pip install edhelper[stats]
+    np = None
+
 
 def parse_color_identity(color_identity: str) -> set:
     """Parse color identity string (e.g., 'R,B,U') into a set of colors."""
@@ -34,7 +41,8 @@ def analyze_commander_rules(deck_cards: List[DeckCard]) -> Dict:
     Returns a dictionary with:
     - valid: bool
     - total_cards: int
-    - commander: Card or None
+    - commander: str, the commander's name
+    - commander_card: Card or None
     - errors: List[str]
     - warnings: List[str]
     """
@@ -77,9 +85,10 @@ def analyze_commander_rules(deck_cards: List[DeckCard]) -> Dict:
         errors.append("Deck must have exactly 100 cards")
 
     validation = {
-        "valid": False,
+        "valid": not errors,
         "total_cards": count,
         "commander": commander if commander else "No commander set",
+        "commander_card": commander_card,
         "commander_color_identity": commander_card.color_identity
         if commander
         else "No commander set",
@@ -88,3 +97,221 @@ def analyze_commander_rules(deck_cards: List[DeckCard]) -> Dict:
     }
 
     return validation
+
+
+# Deck statistics. DeckColumns turns the cards of one or many decks into
+# one column per attribute, so every statistic is a weighted sum grouped by
+# deck: np.bincount when NumPy is installed, a single loop otherwise.
+
+COLORS = ("W", "U", "B", "R", "G", "C")
+CARD_TYPES = (
+    "Creature",
+    "Planeswalker",
+    "Battle",
+    "Land",
+    "Instant",
+    "Sorcery",
+    "Artifact",
+    "Enchantment",
+    "Other",
+)
+CURVE_MAX = 7  # the last bucket is 7+
+
+# Below this many rows NumPy's per-call overhead costs more than it saves.
+NUMPY_MIN_ROWS = 200
+
+_SYMBOL = re.compile(r"\{([^}]+)\}")
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+@lru_cache(maxsize=4096)
+def count_pips(mana_cost: str | None) -> tuple[int, ...]:
+    """
+    Mana symbols per color of COLORS in the front face's cost. Hybrid and
+    Phyrexian symbols count for each of their colors.
+    """
+    counts = [0] * len(COLORS)
+    if mana_cost:
+        for symbol in _SYMBOL.findall(mana_cost.split(" // ")[0]):
+            for part in symbol.split("/"):
+                if part in COLORS:
+                    counts[COLORS.index(part)] += 1
+    return tuple(counts)
+
+
+@lru_cache(maxsize=1024)
+def card_type(type_line: str | None) -> tuple[int, bool]:
+    """
+    Position in CARD_TYPES of the front face's main type, and whether the
+    front face is a land. An artifact creature is a Creature.
+    """
+    types = set((type_line or "").split(" // ")[0].split("—")[0].split())
+    is_land = "Land" in types
+    for index, name in enumerate(CARD_TYPES[:-1]):
+        if name in types:
+            return index, is_land
+    return len(CARD_TYPES) - 1, is_land
+
+
+class DeckColumns:
+    """One row per deck card; deck is the row's position in from_decks()."""
+
+    __slots__ = (
+        "decks",
+        "deck",
+        "quantity",
+        "cmc",
+        "category",
+        "land",
+        "price_cents",
+        "pips",
+    )
+
+    def __init__(self, decks: int):
+        self.decks = decks
+        self.deck: list[int] = []
+        self.quantity: list[int] = []
+        self.cmc: list[int] = []
+        self.category: list[int] = []
+        self.land: list[int] = []
+        self.price_cents: list[int] = []
+        self.pips: list[tuple[int, ...]] = []
+
+    @classmethod
+    def from_decks(cls, decks: List[List[DeckCard]]) -> "DeckColumns":
+        columns = cls(len(decks))
+        for position, deck_cards in enumerate(decks):
+            for deck_card in deck_cards:
+                card = deck_card.card
+                if card is None or not deck_card.quantidade:
+                    continue
+                category, is_land = card_type(card.type_line)
+                columns.deck.append(position)
+                columns.quantity.append(deck_card.quantidade)
+                columns.cmc.append(int(card.cmc or 0))
+                columns.category.append(category)
+                columns.land.append(int(is_land))
+                columns.price_cents.append(card.price_brl_cents or 0)
+                columns.pips.append(count_pips(card.mana_cost))
+        return columns
+
+    def __len__(self):
+        return len(self.deck)
+
+
+def _sums_numpy(columns: DeckColumns) -> tuple:
+    decks, types, buckets = columns.decks, len(CARD_TYPES), CURVE_MAX + 1
+    deck = np.asarray(columns.deck, dtype=np.int64)
+    quantity = np.asarray(columns.quantity, dtype=np.int64)
+    cmc = np.asarray(columns.cmc, dtype=np.int64)
+    category = np.asarray(columns.category, dtype=np.int64)
+    lands = quantity * np.asarray(columns.land, dtype=np.int64)
+    spells = quantity - lands
+    price = quantity * np.asarray(columns.price_cents, dtype=np.int64)
+    pips = np.asarray(columns.pips, dtype=np.int64).reshape(-1, len(COLORS))
+
+    def by_deck(weights):
+        return np.bincount(deck, weights=weights, minlength=decks)
+
+    def by_deck_and(key, size, weights):
+        return np.bincount(
+            deck * size + key, weights=weights, minlength=decks * size
+        ).reshape(decks, size)
+
+    sums = (
+        by_deck(quantity),
+        by_deck(lands),
+        by_deck(spells * cmc),
+        by_deck_and(np.minimum(cmc, CURVE_MAX), buckets, spells),
+        np.stack(
+            [by_deck(quantity * pips[:, color]) for color in range(len(COLORS))],
+            axis=1,
+        ),
+        by_deck_and(category, types, quantity),
+        by_deck(price),
+        by_deck_and(category, types, price),
+    )
+    return tuple(np.rint(values).astype(np.int64).tolist() for values in sums)
+
+
+def _sums_python(columns: DeckColumns) -> tuple:
+    decks, types = columns.decks, len(CARD_TYPES)
+    total = [0] * decks
+    lands = [0] * decks
+    cmc_sum = [0] * decks
+    curve = [[0] * (CURVE_MAX + 1) for _ in range(decks)]
+    pips = [[0] * len(COLORS) for _ in range(decks)]
+    type_counts = [[0] * types for _ in range(decks)]
+    price = [0] * decks
+    type_price = [[0] * types for _ in range(decks)]
+    for deck, quantity, cmc, category, land, price_cents, card_pips in zip(
+        columns.deck,
+        columns.quantity,
+        columns.cmc,
+        columns.category,
+        columns.land,
+        columns.price_cents,
+        columns.pips,
+    ):
+        total[deck] += quantity
+        type_counts[deck][category] += quantity
+        price[deck] += quantity * price_cents
+        type_price[deck][category] += quantity * price_cents
+        deck_pips = pips[deck]
+        for color, count in enumerate(card_pips):
+            deck_pips[color] += quantity * count
+        if land:
+            lands[deck] += quantity
+        else:
+            cmc_sum[deck] += quantity * cmc
+            curve[deck][min(cmc, CURVE_MAX)] += quantity
+    return total, lands, cmc_sum, curve, pips, type_counts, price, type_price
+
+
+def decks_statistics(decks: List[List[DeckCard]]) -> List[Dict]:
+    """Statistics of many decks from a single columnar view, in their order."""
+    columns = DeckColumns.from_decks(decks)
+    if np is not None and len(columns) >= NUMPY_MIN_ROWS:
+        sums = _sums_numpy(columns)
+    else:
+        sums = _sums_python(columns)
+    total, lands, cmc_sum, curve, pips, type_counts, price, type_price = sums
+    curve_labels = [str(cmc) for cmc in range(CURVE_MAX)] + [f"{CURVE_MAX}+"]
+    results = []
+    for deck in range(columns.decks):
+        spells = total[deck] - lands[deck]
+        results.append(
+            {
+                "total_cards": total[deck],
+                "lands": lands[deck],
+                "land_ratio": round(lands[deck] / total[deck], 3) if total[deck] else 0.0,
+                "average_cmc": round(cmc_sum[deck] / spells, 2) if spells else 0.0,
+                "mana_curve": dict(zip(curve_labels, curve[deck])),
+                "color_pips": dict(zip(COLORS, pips[deck])),
+                "types": {
+                    name: count
+                    for name, count in zip(CARD_TYPES, type_counts[deck])
+                    if count
+                },
+                "total_price_cents": price[deck],
+                "price_cents_by_type": {
+                    name: cents
+                    for name, cents, count in zip(
+                        CARD_TYPES, type_price[deck], type_counts[deck]
+                    )
+                    if count
+                },
+            }
+        )
+    return results
+
+
+def deck_statistics(deck_cards: List[DeckCard]) -> Dict:
+    """
+    Mana curve and average CMC (lands excluded), color pips, card types,
+    land ratio and total and per-type price (BRL cents) of a deck.
+    """
+    return decks_statistics([deck_cards])[0]
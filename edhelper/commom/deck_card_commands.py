@@ -5,6 +5,7 @@ import edhelper.domain.deck_card_service as deck_card_service
 from edhelper.domain.deck_card import DeckCard
 import edhelper.domain.card_service as card_service
 from tabulate import tabulate
+from edhelper.external.currency import format_brl_cents
 from .excptions import (
     CardNotFound,
     DeckNotFound,
@@ -167,3 +168,6 @@ class DeckCardCommands:
             data.append([dc.quantidade, dc.card.name, price, ""])
         table = tabulate(data, headers="firstrow", tablefmt="pipe")
         click.echo(table)
+        assert self.deck.id is not None
+        brl_cents, _ = deck_card_service.get_deck_price_totals(self.deck.id)
+        click.echo(f"Total: R$ {format_brl_cents(brl_cents)}")
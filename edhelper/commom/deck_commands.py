@@ -6,9 +6,12 @@ import edhelper.domain.deck_service as deck_service
 from .validators import validate_txt
 import edhelper.domain.card_service as card_service
 import edhelper.domain.deck_card_service as deck_card_service
+from edhelper.domain.mapper import CARD_NAME_FIELDS
 import os
 import csv
 from .excptions import DeckNotFound, DeckAlreadyExists, CardNotFound
+from tabulate import tabulate
+from edhelper.external.currency import format_brl_cents
 
 
 class DeckCommands:
@@ -102,7 +105,9 @@ class DeckCommands:
         try:
             if not self.exists():
                 raise DeckNotFound(self.deck.name)
-            deck, deck_cards = deck_card_service.get_deck_data_by_name(self.deck.name)
+            deck, deck_cards = deck_card_service.get_deck_data_by_name(
+                self.deck.name, fields=CARD_NAME_FIELDS
+            )
             output = os.path.join(path, f"{deck.name}.txt")
 
             with open(output, "w") as f:
@@ -130,7 +135,9 @@ class DeckCommands:
         try:
             if not self.exists():
                 raise DeckNotFound(self.deck.name)
-            deck, deck_cards = deck_card_service.get_deck_data_by_name(self.deck.name)
+            deck, deck_cards = deck_card_service.get_deck_data_by_name(
+                self.deck.name, fields=CARD_NAME_FIELDS
+            )
             output = os.path.join(path, f"{deck.name}.csv")
 
             with open(output, "w") as f:
@@ -160,7 +167,9 @@ class DeckCommands:
         try:
             if not self.exists():
                 raise DeckNotFound(self.deck.name)
-            deck, deck_cards = deck_card_service.get_deck_data_by_name(self.deck.name)
+            deck, deck_cards = deck_card_service.get_deck_data_by_name(
+                self.deck.name, fields=CARD_NAME_FIELDS
+            )
             output = os.path.join(path, f"{deck.name}.json")
 
             with open(output, "w") as f:
@@ -196,24 +205,20 @@ class DeckCommands:
             if self.exists():
                 raise DeckAlreadyExists(self.deck.name)
             card_names = [card[1] for card in cards]
-            card_data = card_service.get_cards_by_name(card_names)
-            if len(card_data) != len(card_names):
-                card_data_names = [card.name for card in card_data]
-                extra_cards = [
-                    card for card in card_names if card not in card_data_names
-                ]
-                extra_card_data = card_service.get_many_cards_from_api(extra_cards)
-                card_service.insert_or_update_cards(extra_card_data)
-                card_data.extend(extra_card_data)
-            click.echo(f"Found {len(card_data)} cards")
+            card_data = card_service.resolve_card_names(card_names)
+            found = {card.id for card in card_data.values()}
+            click.echo(f"Found {len(found)} cards")
             card_list = []
-            for card in card_data:
-                for qty, name in cards:
-                    if card.name == name:
-                        card_list.append({"card": card, "quantidade": int(qty)})
-                        break
-                else:
-                    click.echo(f"Card not found: {card.name}")
+            added = set()
+            for qty, name in cards:
+                card = card_data.get(name)
+                if card is None:
+                    click.echo(f"Card not found: {name}")
+                    continue
+                if card.id in added:
+                    continue
+                added.add(card.id)
+                card_list.append({"card": card, "quantidade": int(qty)})
             assert self.deck is not None
             assert self.deck.name is not None
             deck_service.create_deck_with_cards(self.deck.name, card_list)
@@ -258,12 +263,16 @@ class DeckCommands:
         try:
             if not self.exists():
                 raise DeckNotFound(self.deck.name)
-            from edhelper.commom.deck_analyzer import analyze_commander_rules
+            from edhelper.commom.deck_analyzer import (
+                analyze_commander_rules,
+                deck_statistics,
+            )
 
             deck, deck_cards = deck_card_service.get_deck_data_by_name(self.deck.name)
             if deck is None:
                 raise DeckNotFound(self.deck.name)
             result = analyze_commander_rules(deck_cards)
+            stats = deck_statistics(deck_cards)
 
             click.echo(f"Commander: {result['commander']}")
             click.echo(f"Color Identity: {result.get('commander_color_identity')}")
@@ -279,6 +288,39 @@ class DeckCommands:
                 click.echo("\nWarnings:")
                 for warning in result["warnings"]:
                     click.echo(f"  - {warning}")
+
+            click.echo(f"\nAverage CMC: {stats['average_cmc']:.2f}")
+            click.echo(f"Lands: {stats['lands']} ({stats['land_ratio']:.0%})")
+            curve = "  ".join(f"{cmc}: {n}" for cmc, n in stats["mana_curve"].items())
+            click.echo(f"Mana Curve: {curve}")
+            pips = "  ".join(f"{c}: {n}" for c, n in stats["color_pips"].items() if n)
+            click.echo(f"Color Pips: {pips or '-'}")
+            prices = stats["price_cents_by_type"]
+            data = [
+                [name, count, f"R$ {format_brl_cents(prices[name])}"]
+                for name, count in stats["types"].items()
+            ]
+            click.echo()
+            click.echo(tabulate(data, headers=["Type", "Cards", "Price"], tablefmt="pipe"))
+            click.echo(f"Total: R$ {format_brl_cents(stats['total_price_cents'])}")
+        except DeckNotFound as e:
+            raise e
+        except Exception as e:
+            click.echo(f"Error: {e}", err=True)
+            raise e
+
+    def sync_prices(self):
+        assert self.deck is not None
+        assert self.deck.name is not None
+        try:
+            if not self.exists():
+                raise DeckNotFound(self.deck.name)
+            from edhelper.commom.sync_db_commands import SyncDbCommands
+
+            assert self.deck.id is not None
+            click.echo(f"Updating prices of deck {self.deck.name} from Scryfall...")
+            updated = SyncDbCommands.sync_deck_prices(self.deck.id)
+            click.echo(f"Updated {updated} prices.")
         except DeckNotFound as e:
             raise e
         except Exception as e:
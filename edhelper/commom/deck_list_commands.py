@@ -1,33 +1,48 @@
 import click
+from datetime import datetime
 from tabulate import tabulate
 from edhelper.commom.deck_commands import DeckCommands
 import edhelper.domain.deck_service as deck_service
-import edhelper.domain.deck_card_service as deck_card_service
+import edhelper.domain.sync_state_service as sync_state_service
 
 
 class DeckListCommands:
     @staticmethod
     def show(limit=None):
         try:
-            decks = deck_service.get_decks(limit=limit)
-            data = []
-            headers = ["#", "Name", "Commander", "Last Modified"]
-            for deck in decks:
-                _, deck_cards = deck_card_service.get_deck_data_by_name(deck.name)
-                for dc in deck_cards:
-                    if dc.is_commander:
-                        data.append(
-                            [deck.id, deck.name, dc.card.name, deck.last_update]
-                        )
-                        break
-                else:
-                    data.append([deck.id, deck.name, "", deck.last_update])
+            decks = deck_service.get_deck_summaries(limit=limit)
+            data = [deck.get_list_row() for deck in decks]
+            headers = ["#", "Name", "Commander", "Cards", "Last Modified"]
             table = tabulate(data, headers=headers, tablefmt="pipe")
             click.echo(table)
         except Exception as e:
             click.echo(f"Error: {e}", err=True)
             raise e
 
+    @staticmethod
+    def sync_status():
+        """Decks by last sync, never synced and stalest first."""
+        try:
+            data = []
+            for deck_id, name, state in sync_state_service.get_deck_sync_states():
+                if state is None:
+                    data.append([deck_id, name, "never", "", ""])
+                    continue
+                synced = "never"
+                if state.last_synced_at:
+                    synced = datetime.fromtimestamp(state.last_synced_at)
+                    synced = synced.strftime("%Y-%m-%d %H:%M")
+                outcome = state.last_outcome or ""
+                if state.last_error:
+                    outcome = f"{outcome}: {state.last_error}"
+                duration = f"{state.duration:.1f}s" if state.duration else ""
+                data.append([deck_id, name, synced, outcome, duration])
+            headers = ["#", "Name", "Last Synced", "Last Outcome", "Duration"]
+            click.echo(tabulate(data, headers=headers, tablefmt="pipe"))
+        except Exception as e:
+            click.echo(f"Error: {e}", err=True)
+            raise e
+
     @staticmethod
     def import_folder():
         pass
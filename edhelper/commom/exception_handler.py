@@ -9,6 +9,9 @@ from .excptions import (
     ShortPartial,
     InvalidQuantity,
     SyncNotAvailable,
+    NoSyncToResume,
+    SyncAlreadyRunning,
+    UpstreamError,
 )
 
 
@@ -37,6 +40,10 @@ class ExceptionHandler:
             return self._handle_invalid_quantity(exception)
         elif isinstance(exception, SyncNotAvailable):
             return self._handle_sync_not_available(exception)
+        elif isinstance(exception, (NoSyncToResume, SyncAlreadyRunning)):
+            return self._handle_no_sync_to_resume(exception)
+        elif isinstance(exception, UpstreamError):
+            return self._handle_upstream_error(exception)
         return None
 
     def _handle_card_not_found(self, exc: CardNotFound) -> str:
@@ -114,6 +121,18 @@ class ExceptionHandler:
             return exc.message
         return exc.message
 
+    def _handle_no_sync_to_resume(
+        self, exc: NoSyncToResume | SyncAlreadyRunning
+    ) -> str:
+        if self.mode == self.MODE_CLI:
+            click.echo(f"Error: {exc.message}", err=True)
+        return exc.message
+
+    def _handle_upstream_error(self, exc: UpstreamError) -> str:
+        if self.mode == self.MODE_CLI:
+            click.echo(f"Error: {exc.message}", err=True)
+        return exc.message
+
 
 cli_handler = ExceptionHandler(ExceptionHandler.MODE_CLI)
 shell_handler = ExceptionHandler(ExceptionHandler.MODE_SHELL)
@@ -51,6 +51,35 @@ class InvalidQuantity(Exception):
 
 
 class SyncNotAvailable(Exception):
-    def __init__(self):
-        self.message = "Sync not available, try again later"
+    def __init__(self, retry_in: float | None = None):
+        self.retry_in = retry_in
+        if retry_in is None:
+            self.message = "Sync not available, try again later"
+        else:
+            self.message = f"Sync not available, try again in {retry_in:.0f}s"
         super().__init__(self.message)
+
+
+class NoSyncToResume(Exception):
+    def __init__(self, scope):
+        self.scope = scope
+        self.message = "No interrupted sync to resume"
+        super().__init__(self.message)
+
+
+class SyncAlreadyRunning(Exception):
+    def __init__(self, scope):
+        self.scope = scope
+        self.message = "A sync is already running"
+        super().__init__(self.message)
+
+
+class UpstreamError(Exception):
+    def __init__(self, message, status_code=None):
+        self.status_code = status_code
+        self.message = message
+        super().__init__(self.message)
+
+
+class UpstreamUnavailable(UpstreamError):
+    """The service could not be reached, or its circuit is open."""
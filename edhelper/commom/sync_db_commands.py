@@ -1,99 +1,307 @@
+import asyncio
 import click
 import edhelper.domain.card_service as card_service
+import edhelper.domain.sync_job_service as sync_job_service
 import edhelper.domain.deck_service as deck_service
 import edhelper.domain.deck_card_service as deck_card_service
-from edhelper.external.api import get_many_cards_from_api, get_card_from_api
+import edhelper.domain.sync_state_service as sync_state_service
+from edhelper.external.api import get_card_from_api
+from edhelper.external.batch import (
+    fetch_cards_in_batches,
+    fetch_cards_in_batches_async,
+)
+from edhelper.external.http_cache import refresh_cache
+from edhelper.external.resilience import metrics as http_metrics
+from edhelper.commom.excptions import (
+    CardNotFound,
+    DeckNotFound,
+    NoSyncToResume,
+    SyncAlreadyRunning,
+    UpstreamUnavailable,
+)
+from edhelper.domain.sync_job import SyncJob
 from edhelper.infra.config import settings
-from edhelper.commom.excptions import SyncNotAvailable, CardNotFound, DeckNotFound
-from edhelper.external.currency import convert_usd_to_brl
-from edhelper.domain.card_service import update_card_price
-from edhelper.external.api import get_card_price_from_scryfall
+from edhelper.infra.db import transaction
+from edhelper.external.currency import (
+    get_usd_to_brl_rate,
+    get_usd_to_brl_rate_async,
+)
+from edhelper.external.api import (
+    get_card_price_from_scryfall,
+    get_prices_from_scryfall,
+)
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
 
 
 class SyncDbCommands:
     @staticmethod
-    def sync_database():
-        """Sync all cards in database with API."""
-        if not settings.can_sync():
-            raise SyncNotAvailable()
-        click.echo("Fetching all card names from database...")
-        card_names = card_service.get_card_names()
+    def _echo_progress(done: int, total: int, failure):
+        if failure is not None:
+            click.echo(
+                f"Batch {done}/{total} failed ({len(failure.names)} cards): "
+                f"{failure.error}",
+                err=True,
+            )
+        elif total > 1:
+            click.echo(f"Batch {done}/{total} done")
+
+    @staticmethod
+    def _record_failures(run, result):
+        if result.failures:
+            run.partial(
+                f"{len(result.failed_names)} cards in "
+                f"{len(result.failures)} failed batches"
+            )
+
+    @staticmethod
+    def _echo_http_summary():
+        for line in http_metrics.summary():
+            click.echo(line, err=True)
+
+    @staticmethod
+    def format_progress(job: SyncJob, width: int = 30) -> str:
+        filled = int(width * job.percent / 100)
+        line = (
+            f"[{'#' * filled}{'-' * (width - filled)}] {job.percent:5.1f}% "
+            f"{job.processed}/{job.total} cards"
+        )
+        if job.rate is not None:
+            line += f"  {job.rate:.0f} cards/s"
+        if job.eta is not None:
+            line += f"  ETA {_format_duration(job.eta)}"
+        return line
 
-        if not card_names:
+    @staticmethod
+    def start_sync_job(resume: bool = False) -> SyncJob:
+        """
+        A new full sync job, once a day, or with resume=True the last one
+        that did not finish.
+        """
+        scope = sync_state_service.GLOBAL
+        if resume:
+            job = sync_job_service.get_resumable_job(scope)
+            if job is None:
+                raise NoSyncToResume(scope)
+            return sync_job_service.resume_job(job.id)
+        latest = sync_job_service.get_latest_job(scope)
+        if latest is not None and sync_job_service.is_alive(latest):
+            raise SyncAlreadyRunning(scope)
+        sync_state_service.ensure_can_sync(scope)
+        return sync_job_service.create_job(scope, card_service.count_cards())
+
+    @staticmethod
+    def run_sync_job(job: SyncJob, on_progress=None) -> SyncJob:
+        """
+        Sync every card after the job checkpoint with the API, SYNC_JOB_CHUNK
+        cards at a time. Each chunk is stored in the transaction that moves
+        the checkpoint, so a failed or interrupted job loses at most the
+        chunk in flight. on_progress gets the job after every chunk.
+        """
+        if on_progress is not None:
+            on_progress(job)
+        with sync_state_service.track_sync(job.scope) as run:
+            try:
+                while True:
+                    chunk = card_service.get_card_names_after(
+                        job.checkpoint or "", settings.SYNC_JOB_CHUNK
+                    )
+                    if not chunk:
+                        break
+                    result = fetch_cards_in_batches([name for _, name in chunk])
+                    unreachable = [
+                        failure
+                        for failure in result.failures
+                        if isinstance(failure.error, UpstreamUnavailable)
+                    ]
+                    retry_names = {name for f in unreachable for name in f.names}
+                    # The checkpoint stops before the first card the API could
+                    # not be reached for, the next chunk starts from it again.
+                    synced = chunk
+                    for i, (_, name) in enumerate(chunk):
+                        if name in retry_names:
+                            synced = chunk[:i]
+                            break
+                    if not synced:
+                        # The API is down, stop so a resume retries this chunk.
+                        raise unreachable[0].error
+                    # Only cards the API refused for good count as failed.
+                    failed_names = set(result.failed_names) - retry_names
+                    failed = sum(1 for _, name in synced if name in failed_names)
+                    with transaction() as t:
+                        card_service.insert_or_update_cards(result.cards, cursor=t)
+                        job = sync_job_service.checkpoint(
+                            job.id, synced[-1][0], len(synced) - failed, failed, cursor=t
+                        )
+                    if on_progress is not None:
+                        on_progress(job)
+            except BaseException as e:
+                sync_job_service.finish_job(
+                    job.id, sync_job_service.FAILED, str(e) or type(e).__name__
+                )
+                raise
+            sync_job_service.finish_job(job.id, sync_job_service.DONE)
+            if job.failed:
+                run.partial(f"{job.failed} cards failed")
+        return sync_job_service.get_job(job.id)
+
+    @staticmethod
+    def sync_database(resume: bool = False):
+        """Sync all cards in database with API."""
+        if not resume and not card_service.count_cards():
             click.echo("No cards found in database.")
             return
 
-        click.echo(f"Found {len(card_names)} cards. Updating from API...")
+        job = SyncDbCommands.start_sync_job(resume)
+        if resume:
+            click.echo(f"Resuming sync at {job.processed}/{job.total} cards...")
+        else:
+            click.echo(f"Found {job.total} cards. Updating from API...")
 
         try:
-            # Fetch updated cards from API
-            updated_cards = get_many_cards_from_api(card_names)
+            job = SyncDbCommands.run_sync_job(
+                job,
+                on_progress=lambda job: click.echo(
+                    "\r" + SyncDbCommands.format_progress(job), nl=False
+                ),
+            )
+            click.echo()
+            click.echo(f"Successfully updated {job.done} cards.")
+            if job.failed:
+                click.echo(f"Could not update {job.failed} cards.", err=True)
+        except BaseException as e:
+            click.echo()
+            click.echo(f"Error syncing database: {e}", err=True)
+            click.echo("Run it again with --resume to continue from here.", err=True)
+            raise
+        finally:
+            SyncDbCommands._echo_http_summary()
 
-            # Update database
-            card_service.insert_or_update_cards(updated_cards)
+    @staticmethod
+    def sync_stale(limit: int | None = None):
+        """
+        Sync only the cards past their TTL: card data older than
+        CARD_DATA_TTL and prices older than CARD_PRICE_TTL, cards in decks
+        first. Not limited to once a day like sync_database. limit caps the
+        number of distinct cards, stale data taking precedence over prices.
+        """
+        stale = card_service.get_stale_cards(
+            card_service.DATA, settings.CARD_DATA_TTL, limit
+        )
+        stale_prices = card_service.get_stale_cards(
+            card_service.PRICE, settings.CARD_PRICE_TTL, limit
+        )
+        if limit is not None:
+            stale_ids = {card_id for card_id, _ in stale}
+            room = limit - len(stale_ids)
+            kept = []
+            for card_id, name in stale_prices:
+                if card_id not in stale_ids:
+                    if room <= 0:
+                        continue
+                    room -= 1
+                kept.append((card_id, name))
+            stale_prices = kept
+        if not stale and not stale_prices:
+            click.echo("All cards are up to date.")
+            return
 
-            click.echo(f"Successfully updated {len(updated_cards)} cards.")
+        click.echo(
+            f"Found {len(stale)} cards with stale data and "
+            f"{len(stale_prices)} with stale prices."
+        )
+        try:
+            with sync_state_service.track_sync(sync_state_service.STALE) as run:
+                if stale:
+                    result = fetch_cards_in_batches(
+                        [name for _, name in stale],
+                        on_progress=SyncDbCommands._echo_progress,
+                    )
+                    card_service.insert_or_update_cards(result.cards)
+                    SyncDbCommands._record_failures(run, result)
+                    click.echo(f"Successfully updated {len(result.cards)} cards.")
+                if stale_prices:
+                    updated = SyncDbCommands.sync_prices(
+                        [card_id for card_id, _ in stale_prices]
+                    )
+                    click.echo(f"Updated {updated} prices.")
         except Exception as e:
             click.echo(f"Error syncing database: {e}", err=True)
             raise
+        finally:
+            SyncDbCommands._echo_http_summary()
 
     @staticmethod
-    def sync_database_shell():
+    def sync_database_shell(resume: bool = False):
         """Sync all cards in database with API (for shell)."""
-        if not settings.can_sync():
-            raise SyncNotAvailable()
-        print("Fetching all card names from database...")
-        card_names = card_service.get_card_names()
-
-        if not card_names:
+        if not resume and not card_service.count_cards():
             print("No cards found in database.")
             return
 
-        print(f"Found {len(card_names)} cards. Updating from API...")
+        job = SyncDbCommands.start_sync_job(resume)
+        if resume:
+            print(f"Resuming sync at {job.processed}/{job.total} cards...")
+        else:
+            print(f"Found {job.total} cards. Updating from API...")
 
         try:
-            updated_cards = get_many_cards_from_api(card_names)
-
-            card_service.insert_or_update_cards(updated_cards)
-
-            print(f"Successfully updated {len(updated_cards)} cards.")
-        except Exception as e:
+            job = SyncDbCommands.run_sync_job(
+                job,
+                on_progress=lambda job: print(
+                    "\r" + SyncDbCommands.format_progress(job), end="", flush=True
+                ),
+            )
+            print()
+            print(f"Successfully updated {job.done} cards.")
+            if job.failed:
+                print(f"Could not update {job.failed} cards.")
+        except BaseException as e:
+            print()
             print(f"Error syncing database: {e}")
+            print("Run sync-db --resume to continue from here.")
             raise
 
     @staticmethod
     def sync_card(card_id: str):
-        if not settings.can_sync_card():
-            raise SyncNotAvailable()
+        sync_state_service.ensure_can_sync(sync_state_service.CARD, card_id)
         card = card_service.get_card_by_id(card_id)
         if not card:
             raise CardNotFound(card_id)
         try:
             assert card.name is not None, "Card name is None"
-            updated_card = get_card_from_api(card.name)
-            card_service.insert_or_update_card(updated_card)
-            settings.set_card_sync_timestamp()
+            with sync_state_service.track_sync(sync_state_service.CARD, card_id):
+                with refresh_cache():
+                    updated_card = get_card_from_api(card.name)
+                card_service.insert_or_update_card(updated_card)
         except Exception as e:
             print(f"Error syncing database: {e}")
             raise
 
     @staticmethod
     def sync_deck(deck_id: int):
-        if not settings.can_sync_deck():
-            raise SyncNotAvailable()
+        sync_state_service.ensure_can_sync(sync_state_service.DECK, deck_id)
         deck = deck_service.get_deck_by_id(deck_id)
         if not deck:
             raise DeckNotFound(deck_id)
         try:
             assert deck.name is not None, "Deck name is None"
-            deck, data = deck_card_service.get_deck_data_by_name(deck.name)
-            cards = []
-            for deck_card in data:
-                name = deck_card.card.name
-                cards.append(name)
-            updated_deck = get_many_cards_from_api(cards)
-            card_service.insert_or_update_cards(updated_deck)
-            settings.set_deck_sync_timestamp()
+            with sync_state_service.track_sync(
+                sync_state_service.DECK, deck_id
+            ) as run:
+                deck, data = deck_card_service.get_deck_data_by_name(deck.name)
+                cards = []
+                for deck_card in data:
+                    name = deck_card.card.name
+                    cards.append(name)
+                result = fetch_cards_in_batches(cards)
+                card_service.insert_or_update_cards(result.cards)
+                SyncDbCommands._record_failures(run, result)
         except Exception as e:
             raise e
 
@@ -109,7 +317,129 @@ class SyncDbCommands:
     
         try:
             price_usd = get_card_price_from_scryfall(card_id)
-            price_brl = convert_usd_to_brl(price_usd)
-            update_card_price(card_id, price_brl)
+            card_service.update_card_prices({card_id: price_usd}, get_usd_to_brl_rate())
         except Exception as e:
-            raise e
\ No newline at end of file
+            raise e
+
+    @staticmethod
+    def sync_prices(card_ids: list[str]) -> int:
+        """
+        Sync the prices of many cards from Scryfall in batches of 75, with a
+        single exchange-rate lookup and a single write. Returns how many
+        prices were updated.
+        """
+        if not card_ids:
+            return 0
+        prices_usd = get_prices_from_scryfall(card_ids)
+        missing_ids = [card_id for card_id in card_ids if card_id not in prices_usd]
+        card_service.update_card_prices(
+            prices_usd, get_usd_to_brl_rate(), missing_ids=missing_ids
+        )
+        return len(prices_usd)
+
+    @staticmethod
+    async def sync_deck_async(deck_id: int):
+        """
+        sync_deck() for the editor backend: the API calls run on the event
+        loop and the writes go through the database writer.
+        """
+        await sync_state_service.ensure_can_sync_async(
+            sync_state_service.DECK, deck_id
+        )
+        deck = await deck_service.get_deck_by_id_async(deck_id)
+        if not deck:
+            raise DeckNotFound(deck_id)
+        assert deck.name is not None, "Deck name is None"
+        async with sync_state_service.track_sync_async(
+            sync_state_service.DECK, deck_id
+        ) as run:
+            deck, data = await deck_card_service.get_deck_data_by_name_async(
+                deck.name
+            )
+            result = await fetch_cards_in_batches_async(
+                [deck_card.card.name for deck_card in data]
+            )
+            await card_service.insert_or_update_cards_async(result.cards)
+            SyncDbCommands._record_failures(run, result)
+
+    @staticmethod
+    async def sync_card_async(card_id: str):
+        """
+        sync_card() with the API call in a worker thread and the write on the
+        database writer.
+        """
+        await sync_state_service.ensure_can_sync_async(
+            sync_state_service.CARD, card_id
+        )
+        card = await card_service.get_card_by_id_async(card_id)
+        if not card:
+            raise CardNotFound(card_id)
+        assert card.name is not None, "Card name is None"
+        async with sync_state_service.track_sync_async(
+            sync_state_service.CARD, card_id
+        ):
+            with refresh_cache():
+                updated_card = await asyncio.to_thread(get_card_from_api, card.name)
+            await card_service.insert_or_update_card_async(updated_card)
+
+    @staticmethod
+    async def sync_card_price_async(card_id: str):
+        """
+        sync_card_price() with the Scryfall call in a worker thread and the
+        write on the database writer.
+        """
+        card = await card_service.get_card_by_id_async(card_id)
+        if not card:
+            raise CardNotFound(card_id)
+        price_usd = await asyncio.to_thread(get_card_price_from_scryfall, card_id)
+        await card_service.update_card_prices_async(
+            {card_id: price_usd}, await get_usd_to_brl_rate_async()
+        )
+
+    @staticmethod
+    async def sync_prices_async(card_ids: list[str]) -> int:
+        """
+        sync_prices() with the Scryfall calls in a worker thread and the
+        write on the database writer.
+        """
+        if not card_ids:
+            return 0
+        prices_usd = await asyncio.to_thread(get_prices_from_scryfall, card_ids)
+        missing_ids = [card_id for card_id in card_ids if card_id not in prices_usd]
+        await card_service.update_card_prices_async(
+            prices_usd, await get_usd_to_brl_rate_async(), missing_ids=missing_ids
+        )
+        return len(prices_usd)
+
+    @staticmethod
+    async def sync_deck_prices_async(deck_id: int) -> int:
+        deck = await deck_service.get_deck_by_id_async(deck_id)
+        assert deck.id is not None
+        card_ids = await deck_card_service.get_deck_card_ids_async(deck.id)
+        return await SyncDbCommands.sync_prices_async(card_ids)
+
+    @staticmethod
+    def sync_deck_prices(deck_id: int) -> int:
+        deck = deck_service.get_deck_by_id(deck_id)
+        assert deck.id is not None
+        card_ids = deck_card_service.get_deck_card_ids(deck.id)
+        return SyncDbCommands.sync_prices(card_ids)
+
+    @staticmethod
+    def sync_all_prices():
+        """Sync the price of every card in the database (CLI)."""
+        card_ids = card_service.get_card_ids()
+        if not card_ids:
+            click.echo("No cards found in database.")
+            return
+        click.echo(f"Updating prices of {len(card_ids)} cards from Scryfall...")
+        try:
+            updated = SyncDbCommands.sync_prices(card_ids)
+            click.echo(f"Updated {updated} prices.")
+            if updated < len(card_ids):
+                click.echo(f"{len(card_ids) - updated} cards not found on Scryfall.")
+        except Exception as e:
+            click.echo(f"Error syncing prices: {e}", err=True)
+            raise
+        finally:
+            SyncDbCommands._echo_http_summary()
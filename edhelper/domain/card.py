@@ -1,4 +1,31 @@
+import sys
+
+
+def _intern(value):
+    # Colors and type lines repeat across thousands of cards, so every Card
+    # shares one string object per distinct value.
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 class Card:
+    __slots__ = (
+        "id",
+        "name",
+        "colors",
+        "color_identity",
+        "cmc",
+        "mana_cost",
+        "image",
+        "art",
+        "legal_commanders",
+        "is_commander",
+        "price",
+        "edhrec_rank",
+        "commander_rank",
+        "type_line",
+        "price_brl_cents",
+    )
+
     def __init__(
         self,
         id=None,
@@ -15,13 +42,14 @@ class Card:
         edhrec_rank=None,
         commander_rank=None,
         type_line=None,
+        price_brl_cents=None,
     ):
         self.id = id
         self.name = name
-        self.colors = colors
-        self.color_identity = color_identity
+        self.colors = _intern(colors)
+        self.color_identity = _intern(color_identity)
         self.cmc = cmc
-        self.mana_cost = mana_cost
+        self.mana_cost = _intern(mana_cost)
         self.image = image
         self.art = art
         self.legal_commanders = legal_commanders
@@ -29,7 +57,9 @@ class Card:
         self.price = price
         self.edhrec_rank = edhrec_rank
         self.commander_rank = commander_rank
-        self.type_line = type_line
+        self.type_line = _intern(type_line)
+        # Kept by the cards table triggers from price, never written directly.
+        self.price_brl_cents = price_brl_cents
 
     def get_values_tuple(
         self,
@@ -47,6 +77,7 @@ class Card:
         edhrec_rank=True,
         commander_rank=False,
         type_line=True,
+        price_brl_cents=False,
     ):
         values = []
         if id:
@@ -77,10 +108,16 @@ class Card:
             values.append(self.commander_rank)
         if type_line:
             values.append(self.type_line)
+        if price_brl_cents:
+            values.append(self.price_brl_cents)
         return tuple(values)
 
     def __hash__(self):
-        return hash(self.get_values_tuple())
+        # Equality is defined by id alone, and str hashes are cached by the
+        # interpreter, so this avoids building a values tuple per call.
+        if self.id is None:
+            return object.__hash__(self)
+        return hash(self.id)
 
     def __eq__(self, other):
         if not isinstance(other, Card):
@@ -89,6 +126,27 @@ class Card:
             return False
         return self.id == other.id
 
+    @classmethod
+    def from_row(cls, row):
+        """Build a Card from a row of the cards table in column order."""
+        card = cls.__new__(cls)
+        card.id = row[0]
+        card.name = row[1]
+        card.colors = _intern(row[2])
+        card.color_identity = _intern(row[3])
+        card.cmc = row[4]
+        card.mana_cost = _intern(row[5])
+        card.image = row[6]
+        card.art = row[7]
+        card.legal_commanders = row[8]
+        card.is_commander = row[9]
+        card.price = row[10]
+        card.edhrec_rank = row[11]
+        card.commander_rank = None
+        card.type_line = _intern(row[12])
+        card.price_brl_cents = row[13]
+        return card
+
     @staticmethod
     def from_dict(card_dict: dict):
         card = Card(
@@ -106,6 +164,7 @@ class Card:
             edhrec_rank=card_dict["edhrec_rank"],
             commander_rank=card_dict.get("commander_rank", None),
             type_line=card_dict.get("type_line", None),
+            price_brl_cents=card_dict.get("price_brl_cents", None),
         )
         return card
 
@@ -0,0 +1,144 @@
+"""
+In-process LRU of cards read by id or by name.
+
+card_service reads through it and its writes keep it current once they
+commit (see edhelper.infra.db.after_commit). Every entry is a full card
+and callers get their own copy, so changing a returned Card never changes
+the cached one. Writes made by another process are not seen until the
+entry is evicted, which is fine for the CLI and a single editor server.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from edhelper.domain.card import Card
+from edhelper.infra.config import settings
+
+
+def normalize_name(card_name: str) -> str:
+    return card_name.strip().lower()
+
+
+def _detached(card: Card) -> Card:
+    card = copy.copy(card)
+    # Not a column of the cards table, a stored card never has it.
+    card.commander_rank = None
+    return card
+
+
+class CardCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cards: OrderedDict[str, Card] = OrderedDict()
+        self._ids_by_name: dict[str, str] = {}
+        # Bumped by every write, so a read that raced a write does not put
+        # the row it read before the write into the cache.
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def token(self) -> int:
+        """Take before reading from the database, hand to fill()."""
+        return self._version
+
+    def get_by_id(self, card_id: str) -> Card | None:
+        with self._lock:
+            card = self._cards.get(card_id)
+            if card is None:
+                self.misses += 1
+                return None
+            self._cards.move_to_end(card_id)
+            self.hits += 1
+            return copy.copy(card)
+
+    def get_by_name(self, card_name: str) -> Card | None:
+        with self._lock:
+            card_id = self._ids_by_name.get(normalize_name(card_name))
+            card = self._cards.get(card_id) if card_id is not None else None
+            if card is None:
+                self.misses += 1
+                return None
+            self._cards.move_to_end(card_id)
+            self.hits += 1
+            return copy.copy(card)
+
+    def fill(self, card: Card, token: int):
+        """Cache a card just read from the database."""
+        with self._lock:
+            if token == self._version:
+                self._store(_detached(card))
+
+    def refresh(self, cards: list[Card]):
+        """
+        Write-through for cards just written to the database. Only cards
+        already cached are replaced, so a bulk import does not flush the
+        cache with cards nobody asked for.
+        """
+        with self._lock:
+            self._version += 1
+            for card in cards:
+                if card.id in self._cards:
+                    self._store(_detached(card))
+
+    def set_price(self, card_id: str, price: str, price_brl_cents: int | None):
+        with self._lock:
+            self._version += 1
+            card = self._cards.get(card_id)
+            if card is not None:
+                card = copy.copy(card)
+                card.price = price
+                card.price_brl_cents = price_brl_cents
+                self._cards[card_id] = card
+
+    def _store(self, card: Card):
+        if self.max_size <= 0 or card.id is None:
+            return
+        old = self._cards.pop(card.id, None)
+        if old is not None:
+            self._forget_name(old)
+        self._cards[card.id] = card
+        if card.name:
+            self._ids_by_name[normalize_name(card.name)] = card.id
+        while len(self._cards) > self.max_size:
+            _, evicted = self._cards.popitem(last=False)
+            self._forget_name(evicted)
+            self.evictions += 1
+
+    def _forget_name(self, card: Card):
+        if card.name:
+            key = normalize_name(card.name)
+            if self._ids_by_name.get(key) == card.id:
+                del self._ids_by_name[key]
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._cards.clear()
+            self._ids_by_name.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._cards),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache: CardCache | None = None
+_cache_path: str | None = None
+_cache_lock = threading.Lock()
+
+
+def get_card_cache() -> CardCache:
+    """The process-wide cache, emptied when DATABASE_URL changes."""
+    global _cache, _cache_path
+    with _cache_lock:
+        if _cache is None or _cache_path != settings.DATABASE_URL:
+            _cache = CardCache(settings.CARD_CACHE_SIZE)
+            _cache_path = settings.DATABASE_URL
+        return _cache
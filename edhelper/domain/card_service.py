@@ -1,169 +1,320 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
 from edhelper.external.api import (
     get_card_from_api,
     get_many_cards_from_api,
     get_autocomplete_from_api,
 )
-from edhelper.infra.db import transaction
+from edhelper.external.batch import (
+    fetch_cards_in_batches,
+    fetch_cards_in_batches_async,
+)
+from edhelper.external.http_cache import refresh_cache
+from edhelper.external.currency import (
+    format_brl_cents,
+    usd_cents_to_brl_cents,
+    usd_to_cents,
+)
+from edhelper.infra.db import after_commit, get_connection, transaction
+from edhelper.infra.async_db import reader, writer, run_read, run_write
+from edhelper.infra.coalesce import AsyncSingleFlight, NegativeCache, SingleFlight
+from edhelper.infra.config import settings
 from edhelper.domain.card import Card
-from edhelper.commom.excptions import CardNotFound
+from edhelper.domain.card_cache import get_card_cache, normalize_name
+from edhelper.domain.mapper import CARD_FIELDS, fetch_card, fetch_cards
+from edhelper.commom.excptions import CardNotFound, UpstreamError
 
 
-def get_card_by_name(card_name: str, cursor=None):
+def _cache_for(cursor=None, fields=CARD_FIELDS):
+    """
+    The card cache, or None inside a write transaction: its reads must see
+    its own uncommitted writes, and what it reads may still be rolled back.
+    """
+    conn = cursor.connection if cursor is not None else get_connection()
+    if fields != CARD_FIELDS or conn.in_transaction:
+        return None
+    return get_card_cache()
+
+
+def find_card_by_name(card_name: str, cursor=None) -> Card | None:
+    """Stored card with this name, without falling back to the API."""
+    cache = _cache_for(cursor)
+    if cache is not None:
+        card = cache.get_by_name(card_name)
+        if card is not None:
+            return card
+        token = cache.token()
     with transaction(cursor=cursor) as t:
-        card_data = t.execute(
-            "SELECT * FROM cards WHERE name = ?", (card_name,)
-        ).fetchone()
-        if card_data is None:
-            try:
-                card = get_card_from_api(card_name)
-            except Exception:
-                raise CardNotFound(card_name)
+        card = fetch_card(t, "WHERE name = ? COLLATE NOCASE", (card_name,))
+        if cache is not None and card is not None:
+            cache.fill(card, token)
+        return card
 
-            t.execute(
-                "INSERT INTO cards (id, name, colors, color_identity, cmc, mana_cost, image, art, legal_commanders, is_commander, price, edhrec_rank, type_line) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                card.get_values_tuple(),
-            )
 
-        else:
-            card = Card(
-                card_data[0],
-                card_data[1],
-                card_data[2],
-                card_data[3],
-                card_data[4],
-                card_data[5],
-                card_data[6],
-                card_data[7],
-                card_data[8],
-                card_data[9],
-                card_data[10],
-                card_data[11],
-                None,
-                card_data[12],
-            )
+# Concurrent lookups of the same missing name share one API call; names the
+# API does not know are not asked again for a while.
+_lookups = SingleFlight()
+_async_lookups = AsyncSingleFlight()
+_missing_names = NegativeCache(settings.CARD_MISS_TTL)
+
+
+def _fetch_card(card_name: str) -> Card:
+    try:
+        return get_card_from_api(card_name)
+    except UpstreamError as e:
+        # Only a real "not found" is remembered; any other failure of the API
+        # is raised as is, so it is not mistaken for a missing card.
+        if e.status_code != 404:
+            raise
+        _missing_names.add(normalize_name(card_name))
+        raise CardNotFound(card_name)
+
+
+def get_card_by_name(card_name: str, cursor=None):
+    with transaction(cursor=cursor) as t:
+        card = find_card_by_name(card_name, cursor=t)
+        if card is None:
+            key = normalize_name(card_name)
+            if key in _missing_names:
+                raise CardNotFound(card_name)
+            card = _lookups.do(key, _fetch_card, card_name)
+            # Every caller stores the shared card in its own transaction: the
+            # leader's may still roll back, and then the row would be missing
+            # for the followers' deck_cards.
+            card = insert_or_update_card(card, cursor=t)
         return card
 
 
 def get_card_by_id(card_id: str, cursor=None):
+    cache = _cache_for(cursor)
+    if cache is not None:
+        card = cache.get_by_id(card_id)
+        if card is not None:
+            return card
+        token = cache.token()
     with transaction(cursor=cursor) as t:
-        card_data = t.execute("SELECT * FROM cards WHERE id = ?", (card_id,)).fetchone()
-        if not card_data:
+        card = fetch_card(t, "WHERE id = ?", (card_id,))
+        if not card:
             raise CardNotFound(card_id)
-        card = Card(
-            card_data[0],
-            card_data[1],
-            card_data[2],
-            card_data[3],
-            card_data[4],
-            card_data[5],
-            card_data[6],
-            card_data[7],
-            card_data[8],
-            card_data[9],
-            card_data[10],
-            card_data[11],
-            None,
-            card_data[12],
-        )
+        if cache is not None:
+            cache.fill(card, token)
         return card
 
 
-def insert_or_update_card(card: Card, cursor=None):
-    with transaction(cursor=cursor) as t:
-        sql = """
-        INSERT INTO cards 
-        (id, name, colors, color_identity, cmc, mana_cost, image, art, legal_commanders, is_commander, price, edhrec_rank, type_line) 
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(id)
-        DO UPDATE SET
-            name = excluded.name,
-            colors = excluded.colors,
-            color_identity = excluded.color_identity,
-            cmc = excluded.cmc,
-            mana_cost = excluded.mana_cost,
-            price = excluded.price,
-            image = excluded.image,
-            art = excluded.art,
-            legal_commanders = excluded.legal_commanders,
-            is_commander = excluded.is_commander,
-            edhrec_rank = excluded.edhrec_rank,
-            type_line = excluded.type_line;
+# Rows whose data did not change keep their old values, so the search index
+# and deck_summary triggers only fire for cards that really changed. A new
+# price clears the Scryfall USD cents, which no longer match it.
+_UPSERT_CARD = """
+INSERT INTO cards
+(id, name, colors, color_identity, cmc, mana_cost, image, art, legal_commanders, is_commander, price, edhrec_rank, type_line, data_hash, last_synced_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id)
+DO UPDATE SET
+    name = excluded.name,
+    colors = excluded.colors,
+    color_identity = excluded.color_identity,
+    cmc = excluded.cmc,
+    mana_cost = excluded.mana_cost,
+    price = excluded.price,
+    price_usd_cents = CASE
+        WHEN cards.price IS excluded.price THEN cards.price_usd_cents
+    END,
+    image = excluded.image,
+    art = excluded.art,
+    legal_commanders = excluded.legal_commanders,
+    is_commander = excluded.is_commander,
+    edhrec_rank = excluded.edhrec_rank,
+    type_line = excluded.type_line,
+    data_hash = excluded.data_hash,
+    last_synced_at = excluded.last_synced_at
+WHERE cards.data_hash IS NOT excluded.data_hash;
+"""
+
+
+def _data_hash(card: Card) -> str:
+    return hashlib.sha1(repr(card.get_values_tuple()).encode()).hexdigest()
+
+
+def _upsert_cards(t, cards: list[Card]) -> list[Card]:
+    """
+    Store the cards and return them as stored, in the order given: a card
+    whose data did not change keeps its stored row, and the price cents come
+    from the price trigger rather than the API.
+    """
+    now = time.time()
+    t.executemany(
+        _UPSERT_CARD,
+        [card.get_values_tuple() + (_data_hash(card), now) for card in cards],
+    )
+    ids = json.dumps([card.id for card in cards])
+    # Unchanged rows were skipped above but are just as fresh.
+    t.execute(
         """
-        t.execute(sql, card.get_values_tuple())
+        UPDATE cards SET last_synced_at = ?
+        WHERE id IN (SELECT value FROM json_each(?))
+        """,
+        (now, ids),
+    )
+    stored = {
+        card.id: card
+        for card in fetch_cards(t, "WHERE id IN (SELECT value FROM json_each(?))", (ids,))
+    }
+    return list({card.id: stored[card.id] for card in cards}.values())
+
+
+def insert_or_update_card(card: Card, cursor=None) -> Card:
+    with transaction(cursor=cursor) as t:
+        (stored,) = _upsert_cards(t, [card])
+        after_commit(lambda: get_card_cache().refresh([stored]))
+        return stored
 
 
 def fetch_many_cards(cards: list, cursor=None):
     with transaction(cursor=cursor) as t:
         card_data = get_many_cards_from_api(cards)
-        insert_or_update_cards(card_data, cursor=t)
-        return card_data
+        return insert_or_update_cards(card_data, cursor=t)
 
 
-def get_cards_by_name(card_names: list[str], cursor=None):
+def get_cards_by_names(
+    card_names: list[str], fields=CARD_FIELDS, cursor=None
+) -> dict[str, Card]:
+    """
+    Bulk lookup keyed by the requested names (matched case-insensitively).
+
+    Names are bound as a single JSON array and expanded with json_each(), so
+    any number of names costs one indexed query and no placeholder limit.
+    """
+    if not card_names:
+        return {}
+    found = {}
+    cache = _cache_for(cursor, fields)
+    if cache is not None:
+        for name in card_names:
+            card = cache.get_by_name(name)
+            if card is not None:
+                found[name] = card
+        card_names = [name for name in card_names if name not in found]
+        if not card_names:
+            return found
+        token = cache.token()
     with transaction(cursor=cursor) as t:
-        sql = (
-            "SELECT * FROM cards WHERE name IN ("
-            + ", ".join("?" * len(card_names))
-            + ")"
+        cards = fetch_cards(
+            t,
+            "WHERE name COLLATE NOCASE IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(dict.fromkeys(card_names))),),
+            fields=fields,
+        )
+        if cache is not None:
+            for card in cards:
+                cache.fill(card, token)
+    by_name = {card.name.lower(): card for card in cards if card.name}
+    for name in card_names:
+        card = by_name.get(name.lower())
+        if card is not None:
+            found[name] = card
+    return found
+
+
+def get_cards_by_name(card_names: list[str], fields=CARD_FIELDS, cursor=None):
+    cards = get_cards_by_names(card_names, fields=fields, cursor=cursor)
+    return list({card.id: card for card in cards.values()}.values())
+
+
+def _add_fetched(found: dict[str, Card], missing: list[str], fetched: list[Card]):
+    by_name = {card.name.lower(): card for card in fetched if card.name}
+    for name in missing:
+        card = by_name.get(name.lower())
+        if card is not None:
+            found[name] = card
+
+
+def resolve_card_names(card_names: list[str], cursor=None) -> dict[str, Card]:
+    """
+    Resolve names to cards, reading stored cards in bulk and fetching only
+    the missing ones from the API. Names the API does not know are left out.
+    """
+    with transaction(cursor=cursor) as t:
+        found = get_cards_by_names(card_names, cursor=t)
+        missing = [name for name in dict.fromkeys(card_names) if name not in found]
+        if missing:
+            fetched = fetch_cards_in_batches(missing).cards
+            fetched = insert_or_update_cards(fetched, cursor=t)
+            _add_fetched(found, missing, fetched)
+        return found
+
+
+def insert_or_update_cards(cards: list, cursor=None) -> list[Card]:
+    with transaction(cursor=cursor) as t:
+        stored = _upsert_cards(t, list(cards))
+        after_commit(lambda: get_card_cache().refresh(stored))
+        return stored
+
+
+def build_search_query(partial: str) -> str:
+    """Turn a partial card name into an FTS5 prefix query on the name column."""
+    tokens = re.findall(r"\w+", partial)
+    if not tokens:
+        return ""
+    return "name : (" + " ".join(f'"{token}"*' for token in tokens) + ")"
+
+
+def search_cards(partial: str, limit: int = 20, cursor=None):
+    """Search the cards already stored locally through the cards_fts index."""
+    query = build_search_query(partial)
+    if not query:
+        return []
+    with transaction(cursor=cursor) as t:
+        return fetch_cards(
+            t,
+            """
+            INNER JOIN cards_fts ON cards_fts.rowid = cards.rowid
+            WHERE cards_fts MATCH ?
+            ORDER BY cards_fts.rank
+            LIMIT ?
+            """,
+            (query, limit),
         )
-        card_data = t.execute(sql, card_names).fetchall()
-        cards = []
-        for card in card_data:
-            cards.append(
-                Card(
-                    card[0],
-                    card[1],
-                    card[2],
-                    card[3],
-                    card[4],
-                    card[5],
-                    card[6],
-                    card[7],
-                    card[8],
-                    card[9],
-                    card[10],
-                    card[11],
-                    card[12] if len(card) > 12 else None,
-                )
-            )
-        return cards
-
-
-def insert_or_update_cards(cards: list, cursor=None):
-    with transaction(cursor=cursor) as t:
-        sql = """
-        INSERT INTO cards 
-        (id, name, colors, color_identity, cmc, mana_cost, image, art, legal_commanders, is_commander, price, edhrec_rank, type_line) 
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(id)
-        DO UPDATE SET
-            name = excluded.name,
-            colors = excluded.colors,
-            color_identity = excluded.color_identity,
-            cmc = excluded.cmc,
-            mana_cost = excluded.mana_cost,
-            price = excluded.price,
-            image = excluded.image,
-            art = excluded.art,
-            legal_commanders = excluded.legal_commanders,
-            is_commander = excluded.is_commander,
-            price = excluded.price,
-            edhrec_rank = excluded.edhrec_rank,
-            type_line = excluded.type_line;
-        """
-        cards = [card.get_values_tuple() for card in cards]
-        t.executemany(sql, cards)
 
 
-def get_by_autocomplete(card_name: str, cursor=None):
+def get_by_autocomplete(card_name: str, refresh: bool = False, cursor=None):
+    """
+    Local-first autocomplete: answers from cards_fts and only calls the API
+    when nothing is stored locally or when refresh is requested.
+    """
     from edhelper.commom.excptions import ShortPartial
 
     if len(card_name) < 3:
         raise ShortPartial(card_name)
     with transaction(cursor=cursor) as t:
-        cards = get_autocomplete_from_api(card_name)
-        insert_or_update_cards(cards, cursor=t)
-        return cards
+        if not refresh:
+            cards = search_cards(card_name, cursor=t)
+            if cards:
+                return cards
+        with refresh_cache(refresh):
+            cards = get_autocomplete_from_api(card_name)
+        return insert_or_update_cards(cards, cursor=t)
+
+
+def get_card_ids_by_name(card_names: list[str], cursor=None) -> dict[str, str]:
+    """
+    Map the given names to the ids already stored for them, matched
+    case-insensitively and keyed by the given names.
+    """
+    with transaction(cursor=cursor) as t:
+        rows = t.execute(
+            """
+            SELECT name, id FROM cards
+            WHERE name COLLATE NOCASE IN (SELECT value FROM json_each(?))
+            """,
+            (json.dumps(card_names),),
+        ).fetchall()
+    by_name = {name.lower(): card_id for name, card_id in rows}
+    return {
+        name: by_name[name.lower()] for name in card_names if name.lower() in by_name
+    }
 
 
 def get_card_names():
@@ -171,9 +322,128 @@ def get_card_names():
         card_names = t.execute("SELECT name FROM cards").fetchall()
         return [card[0] for card in card_names]
 
+def get_card_ids(cursor=None) -> list[str]:
+    with transaction(cursor=cursor) as t:
+        return [row[0] for row in t.execute("SELECT id FROM cards").fetchall()]
+
+
+def count_cards(cursor=None) -> int:
+    with transaction(cursor=cursor) as t:
+        return t.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+
+def get_card_names_after(
+    after_id: str, limit: int, cursor=None
+) -> list[tuple[str, str]]:
+    """Next (id, name) page in id order, for walking every card in chunks."""
+    with transaction(cursor=cursor) as t:
+        rows = t.execute(
+            "SELECT id, name FROM cards WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit),
+        ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+
+DATA = "last_synced_at"
+PRICE = "price_synced_at"
+
+
+def get_stale_cards(
+    synced_column: str,
+    max_age: float,
+    limit: int | None = None,
+    deck_ids: list[int] | None = None,
+    cursor=None,
+) -> list[tuple[str, str]]:
+    """
+    (id, name) of the cards whose synced_column (DATA or PRICE) is older
+    than max_age seconds or was never set, only from deck_ids if given.
+    Cards in a deck come first, the ones in the most recently changed decks
+    before the others, then the never synced ones and the rest oldest first.
+    """
+    if synced_column not in (DATA, PRICE):
+        raise ValueError(f"Unknown sync column: {synced_column}")
+    in_decks = ""
+    params = [time.time() - max_age]
+    if deck_ids is not None:
+        in_decks = """
+            AND cards.id IN (
+                SELECT card_id FROM deck_cards
+                WHERE deck_id IN (SELECT value FROM json_each(?))
+            )
+        """
+        params.append(json.dumps(deck_ids))
+    params.append(-1 if limit is None else limit)
+    with transaction(cursor=cursor) as t:
+        rows = t.execute(
+            f"""
+            SELECT cards.id, cards.name, (
+                SELECT MAX(COALESCE(deck_summary.last_change, ''))
+                FROM deck_cards
+                LEFT JOIN deck_summary ON deck_summary.deck_id = deck_cards.deck_id
+                WHERE deck_cards.card_id = cards.id
+            ) AS deck_change
+            FROM cards
+            WHERE (cards.{synced_column} IS NULL OR cards.{synced_column} < ?)
+            {in_decks}
+            ORDER BY deck_change IS NULL, deck_change DESC,
+                cards.{synced_column} IS NOT NULL, cards.{synced_column} ASC
+            LIMIT ?
+            """,
+            params,
+        ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+
+def update_card_prices(
+    prices_usd: dict[str, float | None],
+    rate: float,
+    missing_ids: list[str] = (),
+    cursor=None,
+):
+    """
+    Write many USD prices (card id -> price or None) in one executemany,
+    converted with rate: the BRL display string plus the numeric USD and
+    BRL cents columns. missing_ids are cards Scryfall did not return: they
+    keep their price but are stamped as synced, so stale syncs do not ask
+    for them again on every run.
+    """
+    now = time.time()
+    rows = []
+    for card_id, price_usd in prices_usd.items():
+        usd_cents = usd_to_cents(price_usd)
+        brl_cents = usd_cents_to_brl_cents(usd_cents, rate) or 0
+        rows.append((format_brl_cents(brl_cents), usd_cents, brl_cents, now, card_id))
+    with transaction(cursor=cursor) as t:
+        t.executemany(
+            """
+            UPDATE cards SET price = ?, price_usd_cents = ?, price_brl_cents = ?,
+                price_synced_at = ?
+            WHERE id = ?
+            """,
+            rows,
+        )
+        if missing_ids:
+            t.execute(
+                """
+                UPDATE cards SET price_synced_at = ?
+                WHERE id IN (SELECT value FROM json_each(?))
+                """,
+                (now, json.dumps(list(missing_ids))),
+            )
+        after_commit(lambda: _cache_prices({row[4]: (row[0], row[2]) for row in rows}))
+
+
+def _cache_prices(prices: dict[str, tuple[str, int]]):
+    cache = get_card_cache()
+    for card_id, (price, price_brl_cents) in prices.items():
+        cache.set_price(card_id, price, price_brl_cents)
+
+
 def update_card_price(card_id: str, price: str, cursor=None):
     """
-    Atualiza apenas o campo price de uma carta no banco de dados.
+    Atualiza apenas o campo price de uma carta no banco de dados. O preço em
+    USD não é conhecido aqui, então price_usd_cents fica NULL se mudar.
     """
     with transaction(cursor=cursor) as t:
         # Verificar se a carta existe
@@ -182,4 +452,72 @@ def update_card_price(card_id: str, price: str, cursor=None):
             raise CardNotFound(card_id)
         
         # Atualizar apenas o preço
-        t.execute("UPDATE cards SET price = ? WHERE id = ?", (price, card_id))
\ No newline at end of file
+        t.execute(
+            """
+            UPDATE cards SET price = ?,
+                price_usd_cents = CASE
+                    WHEN price IS ? THEN price_usd_cents
+                END,
+                price_synced_at = ?
+            WHERE id = ?
+            """,
+            (price, price, time.time(), card_id),
+        )
+        brl_cents = t.execute(
+            "SELECT price_brl_cents FROM cards WHERE id = ?", (card_id,)
+        ).fetchone()[0]
+        after_commit(lambda: get_card_cache().set_price(card_id, price, brl_cents))
+
+
+# Async versions for the editor backend (see edhelper.infra.async_db). The
+# ones that may call the API do it outside the database threads, so a slow
+# request never holds the writer.
+
+get_card_by_id_async = reader(get_card_by_id)
+find_card_by_name_async = reader(find_card_by_name)
+get_cards_by_names_async = reader(get_cards_by_names)
+search_cards_async = reader(search_cards)
+get_stale_cards_async = reader(get_stale_cards)
+insert_or_update_card_async = writer(insert_or_update_card)
+insert_or_update_cards_async = writer(insert_or_update_cards)
+update_card_price_async = writer(update_card_price)
+update_card_prices_async = writer(update_card_prices)
+
+
+async def _fetch_and_store_async(card_name: str) -> Card:
+    card = await asyncio.to_thread(_fetch_card, card_name)
+    return await run_write(insert_or_update_card, card)
+
+
+async def get_card_by_name_async(card_name: str) -> Card:
+    card = await run_read(find_card_by_name, card_name)
+    if card is None:
+        key = normalize_name(card_name)
+        if key in _missing_names:
+            raise CardNotFound(card_name)
+        card = await _async_lookups.do(key, _fetch_and_store_async, card_name)
+    return card
+
+
+async def resolve_card_names_async(card_names: list[str]) -> dict[str, Card]:
+    found = await run_read(get_cards_by_names, card_names)
+    missing = [name for name in dict.fromkeys(card_names) if name not in found]
+    if missing:
+        fetched = (await fetch_cards_in_batches_async(missing)).cards
+        fetched = await run_write(insert_or_update_cards, fetched)
+        _add_fetched(found, missing, fetched)
+    return found
+
+
+async def get_by_autocomplete_async(card_name: str, refresh: bool = False):
+    from edhelper.commom.excptions import ShortPartial
+
+    if len(card_name) < 3:
+        raise ShortPartial(card_name)
+    if not refresh:
+        cards = await run_read(search_cards, card_name)
+        if cards:
+            return cards
+    with refresh_cache(refresh):
+        cards = await asyncio.to_thread(get_autocomplete_from_api, card_name)
+    return await run_write(insert_or_update_cards, cards)
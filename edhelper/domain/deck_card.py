@@ -2,6 +2,8 @@ from edhelper.domain.card import Card
 
 
 class DeckCard:
+    __slots__ = ("deck_id", "card", "quantidade", "is_commander")
+
     def __init__(self, deck_id=None, card=None, quantidade=None, is_commander=None):
         assert isinstance(deck_id, int | None)
         assert isinstance(card, Card | None)
@@ -1,90 +1,74 @@
 from edhelper.domain.deck_card import DeckCard
-from edhelper.domain.card import Card
 from edhelper.domain.deck import Deck
+from edhelper.domain.mapper import CARD_FIELDS, fetch_deck_cards
 from edhelper.infra.db import transaction
+from edhelper.infra.async_db import reader, writer
 from edhelper.commom.excptions import DeckNotFound, CardNotOnDeck
 
 
-def get_deck_data_by_name(deck_name: str, cursor=None):
+def get_deck_data_by_name(deck_name: str, fields=CARD_FIELDS, cursor=None):
+    """
+    Load a deck and its cards. Pass fields (e.g. CARD_NAME_FIELDS) to decode
+    only the card columns the caller actually uses.
+    """
     with transaction(cursor=cursor) as t:
         deck = t.execute("SELECT * from decks WHERE nome = ?", (deck_name,)).fetchone()
         if not deck:
             raise DeckNotFound(deck_name)
-        data = t.execute(
+        deck_cards = fetch_deck_cards(
+            t,
             """
-                SELECT deck_cards.*, cards.*
-                FROM deck_cards
-                INNER JOIN cards ON cards.id = deck_cards.card_id
-                INNER JOIN decks ON decks.id = deck_cards.deck_id
-                WHERE decks.nome = ?
-                ORDER by deck_cards.is_commander DESC
-                """,
-            (deck[1],),
-        ).fetchall()
-        deck_cards = []
-        for deck_card in data:
-            dc = DeckCard(
-                deck_id=deck[0],
-                card=Card(
-                    deck_card[4],  # id
-                    deck_card[5],  # name
-                    deck_card[6],  # colors
-                    deck_card[7],  # color_identity
-                    deck_card[8],  # cmc
-                    deck_card[9],  # mana_cost
-                    deck_card[10],  # image
-                    deck_card[11],  # art
-                    deck_card[12],  # legal_commanders
-                    deck_card[13],  # is_commander
-                    deck_card[14],  # price
-                    deck_card[15],  # edhrec_rank
-                    None,  # commander_rank
-                    deck_card[16] if len(deck_card) > 16 else None,  # type_line
-                ),
-                quantidade=deck_card[2],
-                is_commander=deck_card[3] == 1,
-            )
-            deck_cards.append(dc)
+            WHERE deck_cards.deck_id = ?
+            ORDER by deck_cards.is_commander DESC
+            """,
+            (deck[0],),
+            fields=fields,
+        )
         deck = Deck(deck[0], deck[1], deck[2])
         return deck, deck_cards
 
 
-def get_deck_card(deck_id: int, card_id: str, cursor=None):
+def get_deck_card_ids(deck_id: int, cursor=None) -> list[str]:
     with transaction(cursor=cursor) as t:
-        deck_card = t.execute(
+        rows = t.execute(
+            "SELECT card_id FROM deck_cards WHERE deck_id = ?", (deck_id,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+def get_deck_price_totals(deck_id: int, cursor=None) -> tuple[int, int | None]:
+    """
+    Deck total as (BRL cents, USD cents), summed in SQL. The USD total is
+    None until every priced card went through a Scryfall price sync.
+    """
+    with transaction(cursor=cursor) as t:
+        brl_cents, usd_cents, missing_usd = t.execute(
             """
-                SELECT deck_cards.*, cards.*
-                FROM deck_cards
-                INNER JOIN cards ON cards.id = deck_cards.card_id
-                WHERE deck_cards.deck_id = ? AND cards.id = ?
-                """,
-            (deck_id, card_id),
+            SELECT
+                COALESCE(SUM(deck_cards.quantidade * cards.price_brl_cents), 0),
+                SUM(deck_cards.quantidade * cards.price_usd_cents),
+                COUNT(*) FILTER (
+                    WHERE cards.price_usd_cents IS NULL AND cards.price_brl_cents > 0
+                )
+            FROM deck_cards
+            JOIN cards ON cards.id = deck_cards.card_id
+            WHERE deck_cards.deck_id = ?
+            """,
+            (deck_id,),
         ).fetchone()
-        if not deck_card:
-            return None
-        card = Card(
-            deck_card[4],  # id
-            deck_card[5],  # name
-            deck_card[6],  # colors
-            deck_card[7],  # color_identity
-            deck_card[8],  # cmc
-            deck_card[9],  # mana_cost
-            deck_card[10],  # image
-            deck_card[11],  # art
-            deck_card[12],  # legal_commanders
-            deck_card[13],  # is_commander
-            deck_card[14],  # price
-            deck_card[15],  # edhrec_rank
-            None,  # commander_rank
-            deck_card[16] if len(deck_card) > 16 else None,  # type_line
-        )
-        deck_card = DeckCard(
-            deck_id=deck_id,
-            card=card,
-            quantidade=deck_card[2],
-            is_commander=deck_card[3] == 1,
+        return brl_cents, None if missing_usd else (usd_cents or 0)
+
+
+def get_deck_card(deck_id: int, card_id: str, cursor=None):
+    with transaction(cursor=cursor) as t:
+        deck_cards = fetch_deck_cards(
+            t,
+            "WHERE deck_cards.deck_id = ? AND cards.id = ?",
+            (deck_id, card_id),
         )
-        return deck_card
+        if not deck_cards:
+            return None
+        return deck_cards[0]
 
 
 def get_deck_commanders_name(deck_id: int, cursor=None):
@@ -157,3 +141,17 @@ def set_deck_commander(deck_card: DeckCard, cursor=None):
         reset_deck_commander(deck_card.deck_id, cursor)
         sql = "UPDATE deck_cards SET is_commander = 1, quantidade = 1 WHERE deck_id = ? AND card_id = ?"
         t.execute(sql, deck_card.get_values_tuple(quantidade=False, is_commander=False))
+
+
+# Async versions for the editor backend (see edhelper.infra.async_db).
+
+get_deck_data_by_name_async = reader(get_deck_data_by_name)
+get_deck_card_async = reader(get_deck_card)
+get_deck_card_ids_async = reader(get_deck_card_ids)
+get_deck_price_totals_async = reader(get_deck_price_totals)
+get_deck_commanders_name_async = reader(get_deck_commanders_name)
+update_or_insert_deck_card_async = writer(update_or_insert_deck_card)
+update_deck_card_quantity_async = writer(update_deck_card_quantity)
+delete_deck_card_async = writer(delete_deck_card)
+reset_deck_commander_async = writer(reset_deck_commander)
+set_deck_commander_async = writer(set_deck_commander)
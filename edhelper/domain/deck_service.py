@@ -1,6 +1,8 @@
 from edhelper.infra.db import transaction
+from edhelper.infra.async_db import reader, writer
 from edhelper.domain.deck import Deck
 from edhelper.domain.deck_card import DeckCard
+from edhelper.domain.deck_summary import DeckSummary
 import edhelper.domain.deck_card_service as deck_card_service
 from edhelper.commom.excptions import DeckNotFound, DeckAlreadyExists
 
@@ -59,6 +61,35 @@ def get_decks(limit=None, cursor=None):
         return decks
 
 
+def get_deck_summaries(limit=None, cursor=None) -> list[DeckSummary]:
+    """List decks with card count, commander and totals in a single query."""
+    with transaction(cursor=cursor) as t:
+        sql = """
+            SELECT decks.id, decks.nome, decks.last_update,
+                   COALESCE(s.card_count, 0), s.commander_id, s.commander_name,
+                   s.color_identity, COALESCE(s.total_price, 0), s.last_change
+            FROM decks
+            LEFT JOIN deck_summary AS s ON s.deck_id = decks.id
+            ORDER BY decks.last_update DESC
+            LIMIT ?
+        """
+        rows = t.execute(sql, (limit if limit else -1,)).fetchall()
+        return [DeckSummary(*row) for row in rows]
+
+
+def get_commander_names(cursor=None) -> list[str]:
+    """Distinct commander names across all decks."""
+    with transaction(cursor=cursor) as t:
+        rows = t.execute(
+            """
+            SELECT DISTINCT commander_name FROM deck_summary
+            WHERE commander_name IS NOT NULL
+            ORDER BY commander_name
+            """
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
 def copy_deck(source: Deck, new_name: str, cursor=None):
     with transaction(cursor=cursor) as t:
         assert source.name is not None
@@ -114,3 +145,16 @@ def get_deck_names():
     with transaction(cursor=None) as t:
         deck_names = t.execute("SELECT nome FROM decks").fetchall()
         return [deck[0] for deck in deck_names]
+
+
+# Async versions for the editor backend (see edhelper.infra.async_db).
+
+get_deck_by_name_async = reader(get_deck_by_name)
+get_deck_by_id_async = reader(get_deck_by_id)
+get_decks_async = reader(get_decks)
+get_deck_summaries_async = reader(get_deck_summaries)
+create_deck_async = writer(create_deck)
+copy_deck_async = writer(copy_deck)
+delete_deck_async = writer(delete_deck)
+rename_deck_async = writer(rename_deck)
+create_deck_with_cards_async = writer(create_deck_with_cards)
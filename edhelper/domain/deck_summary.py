@@ -0,0 +1,45 @@
+class DeckSummary:
+    """Read-only view of a deck and its deck_summary row."""
+
+    __slots__ = (
+        "id",
+        "name",
+        "last_update",
+        "card_count",
+        "commander_id",
+        "commander_name",
+        "color_identity",
+        "total_price",
+        "last_change",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        last_update: str,
+        card_count: int = 0,
+        commander_id: str | None = None,
+        commander_name: str | None = None,
+        color_identity: str | None = None,
+        total_price: float = 0.0,
+        last_change: str | None = None,
+    ):
+        self.id = id
+        self.name = name
+        self.last_update = last_update
+        self.card_count = card_count
+        self.commander_id = commander_id
+        self.commander_name = commander_name
+        self.color_identity = color_identity
+        self.total_price = total_price
+        self.last_change = last_change
+
+    def get_list_row(self):
+        return [
+            self.id,
+            self.name,
+            self.commander_name or "",
+            self.card_count,
+            self.last_update,
+        ]
@@ -0,0 +1,105 @@
+"""
+Row-to-domain mapping for the cards table.
+
+Every query that builds Card or DeckCard objects goes through here: callers
+pick the columns they need (fields) and a sqlite row factory turns each row
+into a domain object, so no service indexes raw tuples by position.
+"""
+
+from functools import lru_cache
+from edhelper.domain.card import Card
+from edhelper.domain.deck_card import DeckCard
+
+
+CARD_FIELDS = (
+    "id",
+    "name",
+    "colors",
+    "color_identity",
+    "cmc",
+    "mana_cost",
+    "image",
+    "art",
+    "legal_commanders",
+    "is_commander",
+    "price",
+    "edhrec_rank",
+    "type_line",
+    "price_brl_cents",
+)
+
+# Enough for listings and exports, skips image/art URLs and the rest.
+CARD_NAME_FIELDS = ("id", "name")
+
+
+def card_columns(fields=CARD_FIELDS, table="cards") -> str:
+    unknown = set(fields) - set(CARD_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown card fields: {', '.join(sorted(unknown))}")
+    return ", ".join(f"{table}.{field}" for field in fields)
+
+
+@lru_cache(maxsize=None)
+def card_factory(fields=CARD_FIELDS):
+    """Row factory producing Cards from rows projected with card_columns()."""
+    if fields == CARD_FIELDS:
+        return lambda cursor, row: Card.from_row(row)
+    return lambda cursor, row: Card(**dict(zip(fields, row)))
+
+
+@lru_cache(maxsize=None)
+def deck_card_factory(fields=CARD_FIELDS):
+    """Row factory for (deck_id, quantidade, is_commander, *card fields) rows."""
+    to_card = card_factory(fields)
+    return lambda cursor, row: DeckCard(
+        deck_id=row[0],
+        card=to_card(cursor, row[3:]),
+        quantidade=row[1],
+        is_commander=row[2] == 1,
+    )
+
+
+def _execute(cursor, row_factory, sql: str, params=()):
+    # A sibling cursor shares the connection, and therefore the transaction,
+    # of the caller while keeping its own row factory.
+    mapped = cursor.connection.cursor()
+    mapped.row_factory = row_factory
+    return mapped.execute(sql, params)
+
+
+def fetch_cards(cursor, where: str = "", params=(), fields=CARD_FIELDS) -> list[Card]:
+    fields = tuple(fields)
+    sql = f"SELECT {card_columns(fields)} FROM cards {where}"
+    mapped = _execute(cursor, card_factory(fields), sql, params)
+    try:
+        return mapped.fetchall()
+    finally:
+        mapped.close()
+
+
+def fetch_card(cursor, where: str = "", params=(), fields=CARD_FIELDS) -> Card | None:
+    fields = tuple(fields)
+    sql = f"SELECT {card_columns(fields)} FROM cards {where}"
+    mapped = _execute(cursor, card_factory(fields), sql, params)
+    try:
+        return mapped.fetchone()
+    finally:
+        mapped.close()
+
+
+def fetch_deck_cards(
+    cursor, where: str = "", params=(), fields=CARD_FIELDS
+) -> list[DeckCard]:
+    fields = tuple(fields)
+    sql = f"""
+        SELECT deck_cards.deck_id, deck_cards.quantidade, deck_cards.is_commander,
+               {card_columns(fields)}
+        FROM deck_cards
+        INNER JOIN cards ON cards.id = deck_cards.card_id
+        {where}
+    """
+    mapped = _execute(cursor, deck_card_factory(fields), sql, params)
+    try:
+        return mapped.fetchall()
+    finally:
+        mapped.close()
@@ -0,0 +1,33 @@
+import time
+from edhelper.infra.db import transaction
+from edhelper.infra.async_db import reader, writer
+
+
+def get_rate(base: str, quote: str, cursor=None) -> tuple[float, float] | None:
+    """Stored (rate, fetched_at) for base -> quote, or None."""
+    with transaction(cursor=cursor) as t:
+        row = t.execute(
+            "SELECT rate, fetched_at FROM exchange_rates WHERE base = ? AND quote = ?",
+            (base, quote),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+
+def save_rate(base: str, quote: str, rate: float, fetched_at: float | None = None, cursor=None):
+    with transaction(cursor=cursor) as t:
+        t.execute(
+            """
+            INSERT INTO exchange_rates (base, quote, rate, fetched_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(base, quote) DO UPDATE SET
+                rate = excluded.rate,
+                fetched_at = excluded.fetched_at
+            """,
+            (base, quote, rate, fetched_at if fetched_at is not None else time.time()),
+        )
+
+
+# Async versions for the editor backend (see edhelper.infra.async_db).
+
+get_rate_async = reader(get_rate)
+save_rate_async = writer(save_rate)
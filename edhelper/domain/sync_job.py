@@ -0,0 +1,75 @@
+class SyncJob:
+    """A chunked sync of many cards, resumable from its checkpoint."""
+
+    __slots__ = (
+        "id",
+        "scope",
+        "status",
+        "total",
+        "done",
+        "failed",
+        "checkpoint",
+        "started_at",
+        "run_started_at",
+        "run_processed",
+        "updated_at",
+        "finished_at",
+        "error",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        scope: str,
+        status: str,
+        total: int = 0,
+        done: int = 0,
+        failed: int = 0,
+        checkpoint: str | None = None,
+        started_at: float = 0.0,
+        run_started_at: float = 0.0,
+        run_processed: int = 0,
+        updated_at: float = 0.0,
+        finished_at: float | None = None,
+        error: str | None = None,
+    ):
+        self.id = id
+        self.scope = scope
+        self.status = status
+        self.total = total
+        self.done = done
+        self.failed = failed
+        self.checkpoint = checkpoint
+        self.started_at = started_at
+        self.run_started_at = run_started_at
+        self.run_processed = run_processed
+        self.updated_at = updated_at
+        self.finished_at = finished_at
+        self.error = error
+
+    @property
+    def processed(self) -> int:
+        return self.done + self.failed
+
+    @property
+    def percent(self) -> float:
+        if not self.total:
+            return 100.0
+        return min(self.processed * 100.0 / self.total, 100.0)
+
+    @property
+    def rate(self) -> float | None:
+        """Cards per second since the current run started."""
+        elapsed = self.updated_at - self.run_started_at
+        processed = self.processed - self.run_processed
+        if elapsed <= 0 or processed <= 0:
+            return None
+        return processed / elapsed
+
+    @property
+    def eta(self) -> float | None:
+        """Seconds left at the current rate."""
+        rate = self.rate
+        if rate is None:
+            return None
+        return max(self.total - self.processed, 0) / rate
@@ -0,0 +1,140 @@
+import time
+from edhelper.domain.sync_job import SyncJob
+from edhelper.infra.config import settings
+from edhelper.infra.db import transaction
+from edhelper.infra.async_db import reader
+from edhelper.commom.excptions import SyncAlreadyRunning
+
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_COLUMNS = """
+    id, scope, status, total, done, failed, checkpoint, started_at,
+    run_started_at, run_processed, updated_at, finished_at, error
+"""
+
+
+def get_job(job_id: int, cursor=None) -> SyncJob | None:
+    with transaction(cursor=cursor) as t:
+        row = t.execute(
+            f"SELECT {_COLUMNS} FROM sync_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return SyncJob(*row) if row else None
+
+
+def get_latest_job(scope: str | None = None, cursor=None) -> SyncJob | None:
+    with transaction(cursor=cursor) as t:
+        if scope is None:
+            row = t.execute(
+                f"SELECT {_COLUMNS} FROM sync_jobs ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        else:
+            row = t.execute(
+                f"""
+                SELECT {_COLUMNS} FROM sync_jobs WHERE scope = ?
+                ORDER BY id DESC LIMIT 1
+                """,
+                (scope,),
+            ).fetchone()
+        return SyncJob(*row) if row else None
+
+
+def is_alive(job: SyncJob) -> bool:
+    """
+    A running job checkpointed within SYNC_JOB_STALE seconds. Every
+    checkpoint is its heartbeat, a job left running by a process that was
+    killed stops beating.
+    """
+    return (
+        job.status == RUNNING
+        and time.time() - job.updated_at < settings.SYNC_JOB_STALE
+    )
+
+
+def get_resumable_job(scope: str, cursor=None) -> SyncJob | None:
+    """
+    The latest job of scope if it did not finish, or raise
+    SyncAlreadyRunning while another process is still running it.
+    """
+    job = get_latest_job(scope, cursor=cursor)
+    if job is None or job.status == DONE:
+        return None
+    if is_alive(job):
+        raise SyncAlreadyRunning(scope)
+    return job
+
+
+def create_job(scope: str, total: int, cursor=None) -> SyncJob:
+    now = time.time()
+    with transaction(cursor=cursor) as t:
+        job_id = t.execute(
+            """
+            INSERT INTO sync_jobs (
+                scope, status, total, started_at, run_started_at, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (scope, RUNNING, total, now, now, now),
+        ).lastrowid
+        return get_job(job_id, cursor=t)
+
+
+def resume_job(job_id: int, cursor=None) -> SyncJob:
+    """
+    Start a new run of job_id; throughput is measured from here. The job
+    is taken over in the same statement that checks it is not alive, so
+    two processes cannot both resume it.
+    """
+    now = time.time()
+    with transaction(cursor=cursor) as t:
+        claimed = t.execute(
+            """
+            UPDATE sync_jobs SET status = ?, run_started_at = ?,
+                run_processed = done + failed, updated_at = ?, error = NULL
+            WHERE id = ? AND (status != ? OR updated_at < ?)
+            """,
+            (RUNNING, now, now, job_id, RUNNING, now - settings.SYNC_JOB_STALE),
+        ).rowcount
+        job = get_job(job_id, cursor=t)
+        if not claimed:
+            raise SyncAlreadyRunning(job.scope)
+        return job
+
+
+def checkpoint(
+    job_id: int, last_key: str, done: int, failed: int, cursor=None
+) -> SyncJob:
+    """
+    Move the job past last_key. Call it in the transaction that wrote the
+    chunk, so a chunk counts as synced only if its cards were stored.
+    """
+    with transaction(cursor=cursor) as t:
+        t.execute(
+            """
+            UPDATE sync_jobs SET checkpoint = ?, done = done + ?,
+                failed = failed + ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (last_key, done, failed, time.time(), job_id),
+        )
+        return get_job(job_id, cursor=t)
+
+
+def finish_job(job_id: int, status: str, error: str | None = None, cursor=None):
+    now = time.time()
+    with transaction(cursor=cursor) as t:
+        t.execute(
+            """
+            UPDATE sync_jobs SET status = ?, error = ?, updated_at = ?,
+                finished_at = ?
+            WHERE id = ?
+            """,
+            (status, error, now, now, job_id),
+        )
+
+
+# Async versions for the editor backend (see edhelper.infra.async_db).
+
+get_job_async = reader(get_job)
+get_latest_job_async = reader(get_latest_job)
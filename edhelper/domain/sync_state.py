@@ -0,0 +1,30 @@
+class SyncState:
+    """Last sync of a scope: everything ("global"), one card or one deck."""
+
+    __slots__ = (
+        "scope",
+        "key",
+        "last_started_at",
+        "last_synced_at",
+        "last_outcome",
+        "last_error",
+        "duration",
+    )
+
+    def __init__(
+        self,
+        scope: str,
+        key: str = "",
+        last_started_at: float | None = None,
+        last_synced_at: float | None = None,
+        last_outcome: str | None = None,
+        last_error: str | None = None,
+        duration: float | None = None,
+    ):
+        self.scope = scope
+        self.key = key
+        self.last_started_at = last_started_at
+        self.last_synced_at = last_synced_at
+        self.last_outcome = last_outcome
+        self.last_error = last_error
+        self.duration = duration
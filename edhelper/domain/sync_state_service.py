@@ -0,0 +1,190 @@
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import date, datetime, timedelta
+from datetime import time as time_of_day
+from edhelper.domain.sync_state import SyncState
+from edhelper.infra.config import settings
+from edhelper.infra.db import transaction
+from edhelper.infra.async_db import run_write, writer
+from edhelper.commom.excptions import SyncNotAvailable
+
+
+GLOBAL = "global"
+STALE = "stale"
+CARD = "card"
+DECK = "deck"
+
+OK = "ok"
+PARTIAL = "partial"
+ERROR = "error"
+
+
+def get_sync_state(scope: str, key="", cursor=None) -> SyncState | None:
+    with transaction(cursor=cursor) as t:
+        row = t.execute(
+            """
+            SELECT scope, key, last_started_at, last_synced_at, last_outcome,
+                   last_error, duration
+            FROM sync_state WHERE scope = ? AND key = ?
+            """,
+            (scope, str(key)),
+        ).fetchone()
+        return SyncState(*row) if row else None
+
+
+def _interval(scope: str) -> float:
+    if scope == CARD:
+        return settings.SYNC_CARD_INTERVAL
+    return settings.SYNC_DECK_INTERVAL
+
+
+def _may_start_before(scope: str, now: float) -> float:
+    """A sync of scope that started before this may run again at now."""
+    if scope == GLOBAL:
+        return datetime.combine(date.fromtimestamp(now), time_of_day()).timestamp()
+    return now - _interval(scope)
+
+
+def seconds_until_sync(scope: str, key="", cursor=None) -> float:
+    """
+    0 when scope/key may sync now. Everything syncs once a day, a card
+    every SYNC_CARD_INTERVAL seconds and a deck every SYNC_DECK_INTERVAL
+    seconds, each card and deck on its own clock. The clock starts when a
+    sync starts, so one that keeps failing is throttled too.
+    """
+    with transaction(cursor=cursor) as t:
+        row = t.execute(
+            "SELECT last_started_at FROM sync_state WHERE scope = ? AND key = ?",
+            (scope, str(key)),
+        ).fetchone()
+    now = time.time()
+    if row is None or row[0] is None or row[0] < _may_start_before(scope, now):
+        return 0.0
+    last = row[0]
+    if scope == GLOBAL:
+        tomorrow = date.fromtimestamp(last) + timedelta(days=1)
+        return max(datetime.combine(tomorrow, time_of_day()).timestamp() - now, 0.0)
+    return max(last + _interval(scope) - now, 0.0)
+
+
+def ensure_can_sync(scope: str, key="", cursor=None):
+    """
+    Claim scope/key for a sync starting now, or raise SyncNotAvailable.
+    The check and the last_started_at stamp are a single statement, so two
+    runs cannot both get through.
+    """
+    now = time.time()
+    with transaction(cursor=cursor) as t:
+        claimed = t.execute(
+            """
+            INSERT INTO sync_state (scope, key, last_started_at) VALUES (?, ?, ?)
+            ON CONFLICT(scope, key) DO UPDATE SET
+                last_started_at = excluded.last_started_at
+            WHERE last_started_at IS NULL OR last_started_at < ?
+            """,
+            (scope, str(key), now, _may_start_before(scope, now)),
+        ).rowcount
+        if not claimed:
+            raise SyncNotAvailable(seconds_until_sync(scope, key, cursor=t))
+
+
+def record_sync(
+    scope: str,
+    key,
+    started_at: float,
+    outcome: str,
+    error: str | None = None,
+    cursor=None,
+):
+    """Store how a sync went. Failed syncs keep the last successful time."""
+    finished_at = time.time()
+    with transaction(cursor=cursor) as t:
+        t.execute(
+            """
+            INSERT INTO sync_state (
+                scope, key, last_started_at, last_synced_at, last_outcome,
+                last_error, duration
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(scope, key) DO UPDATE SET
+                last_started_at = excluded.last_started_at,
+                last_synced_at = COALESCE(excluded.last_synced_at, last_synced_at),
+                last_outcome = excluded.last_outcome,
+                last_error = excluded.last_error,
+                duration = excluded.duration
+            """,
+            (
+                scope,
+                str(key),
+                started_at,
+                None if outcome == ERROR else finished_at,
+                outcome,
+                error,
+                finished_at - started_at,
+            ),
+        )
+
+
+class SyncRun:
+    __slots__ = ("outcome", "error")
+
+    def __init__(self):
+        self.outcome = OK
+        self.error: str | None = None
+
+    def partial(self, error: str):
+        self.outcome = PARTIAL
+        self.error = error
+
+
+@contextmanager
+def track_sync(scope: str, key=""):
+    """
+    Record the block as a sync of scope/key: "error" if it raises, else
+    "ok", or "partial" when the block calls run.partial().
+    """
+    run = SyncRun()
+    started_at = time.time()
+    try:
+        yield run
+    except Exception as e:
+        record_sync(scope, key, started_at, ERROR, str(e))
+        raise
+    record_sync(scope, key, started_at, run.outcome, run.error)
+
+
+def get_deck_sync_states(cursor=None) -> list[tuple[int, str, SyncState | None]]:
+    """Every deck with its last sync, never synced and oldest first."""
+    with transaction(cursor=cursor) as t:
+        rows = t.execute(
+            """
+            SELECT decks.id, decks.nome, s.scope, s.key, s.last_started_at,
+                   s.last_synced_at, s.last_outcome, s.last_error, s.duration
+            FROM decks
+            LEFT JOIN sync_state AS s
+                ON s.scope = ? AND s.key = CAST(decks.id AS TEXT)
+            ORDER BY s.last_synced_at IS NOT NULL, s.last_synced_at, decks.nome
+            """,
+            (DECK,),
+        ).fetchall()
+        return [
+            (row[0], row[1], SyncState(*row[2:]) if row[2] is not None else None)
+            for row in rows
+        ]
+
+
+# Async versions for the editor backend (see edhelper.infra.async_db).
+
+ensure_can_sync_async = writer(ensure_can_sync)
+
+
+@asynccontextmanager
+async def track_sync_async(scope: str, key=""):
+    """track_sync() recording through the database writer."""
+    run = SyncRun()
+    started_at = time.time()
+    try:
+        yield run
+    except Exception as e:
+        await run_write(record_sync, scope, key, started_at, ERROR, str(e))
+        raise
+    await run_write(record_sync, scope, key, started_at, run.outcome, run.error)
@@ -1,7 +1,13 @@
 from fastapi import APIRouter, HTTPException
 from edhelper.domain import card_service
 from edhelper.external.api import get_commanders_from_api
-from edhelper.commom.excptions import CardNotFound, ShortPartial, SyncNotAvailable
+from edhelper.commom.excptions import (
+    CardNotFound,
+    ShortPartial,
+    SyncNotAvailable,
+    UpstreamError,
+    UpstreamUnavailable,
+)
 from edhelper.commom.sync_db_commands import SyncDbCommands
 from edhelper.editor.backend.app.schemas.card import Card, CardList
 
@@ -15,13 +21,17 @@ def convert_exception_to_http(e: Exception) -> HTTPException:
         return HTTPException(status_code=400, detail=e.message)
     elif isinstance(e, ShortPartial):
         return HTTPException(status_code=400, detail=e.message)
+    elif isinstance(e, UpstreamUnavailable):
+        return HTTPException(status_code=503, detail=e.message)
+    elif isinstance(e, UpstreamError):
+        return HTTPException(status_code=502, detail=e.message)
     return None
 
 
 @router.get("/autocomplete/{partial}", response_model=CardList)
-def autocomplete_cards(partial: str):
+async def autocomplete_cards(partial: str, refresh: bool = False):
     try:
-        cards = card_service.get_by_autocomplete(partial)
+        cards = await card_service.get_by_autocomplete_async(partial, refresh=refresh)
         return CardList(cards=cards)
     except HTTPException:
         raise
@@ -30,15 +40,20 @@ def autocomplete_cards(partial: str):
         if http_exc:
             raise http_exc
         raise
+    except UpstreamError as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/sync/{card_id}", response_model=Card)
-def sync_card(card_id: str):
+async def sync_card(card_id: str):
     try:
-        SyncDbCommands.sync_card(card_id)
-        card = card_service.get_card_by_id(card_id)
+        await SyncDbCommands.sync_card_async(card_id)
+        card = await card_service.get_card_by_id_async(card_id)
         if not card:
             raise CardNotFound(card_id)
         return card
@@ -54,14 +69,19 @@ def sync_card(card_id: str):
         if http_exc:
             raise http_exc
         raise
+    except UpstreamError as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/named/{name}", response_model=Card)
-def get_card_by_name(name: str):
+async def get_card_by_name(name: str):
     try:
-        card = card_service.get_card_by_name(name)
+        card = await card_service.get_card_by_name_async(name)
         return card
     except HTTPException:
         raise
@@ -70,14 +90,19 @@ def get_card_by_name(name: str):
         if http_exc:
             raise http_exc
         raise
+    except UpstreamError as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{card_id}", response_model=Card)
-def get_card(card_id: str):
+async def get_card(card_id: str):
     try:
-        card = card_service.get_card_by_id(card_id)
+        card = await card_service.get_card_by_id_async(card_id)
         return card
     except HTTPException:
         raise
@@ -90,10 +115,10 @@ def get_card(card_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/sync-price/{card_id}", response_model=Card)
-def sync_card_price(card_id: str):
+async def sync_card_price(card_id: str):
     try:
-        SyncDbCommands.sync_card_price(card_id)
-        card = card_service.get_card_by_id(card_id)
+        await SyncDbCommands.sync_card_price_async(card_id)
+        card = await card_service.get_card_by_id_async(card_id)
         if not card:
             raise CardNotFound(card_id)
         return card
@@ -104,5 +129,10 @@ def sync_card_price(card_id: str):
         if http_exc:
             raise http_exc
         raise
+    except UpstreamError as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
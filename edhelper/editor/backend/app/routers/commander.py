@@ -1,8 +1,15 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from edhelper.external.edhec import get_edhrec_cardlists
-from edhelper.external.api import get_commanders_from_api, get_many_cards_from_api
+from edhelper.external.api import get_commanders_from_api
+from edhelper.external.batch import fetch_cards_in_batches_async
 import edhelper.domain.card_service as card_service
-from edhelper.commom.excptions import CardNotFound, DeckNotFound
+from edhelper.commom.excptions import (
+    CardNotFound,
+    DeckNotFound,
+    UpstreamError,
+    UpstreamUnavailable,
+)
 from edhelper.editor.backend.app.schemas.card import CommanderList
 
 router = APIRouter(prefix="/api/commander", tags=["commander"])
@@ -30,25 +37,34 @@ def convert_exception_to_http(e: Exception) -> HTTPException:
         return HTTPException(status_code=404, detail=e.message)
     elif isinstance(e, DeckNotFound):
         return HTTPException(status_code=404, detail=e.message)
+    elif isinstance(e, UpstreamUnavailable):
+        return HTTPException(status_code=503, detail=e.message)
+    elif isinstance(e, UpstreamError):
+        return HTTPException(status_code=502, detail=e.message)
     return None
 
 
 @router.get("/", response_model=CommanderList)
-def get_top_commanders():
+async def get_top_commanders():
     try:
-        commanders = get_commanders_from_api()
-        card_service.insert_or_update_cards(commanders)
+        commanders = await run_in_threadpool(get_commanders_from_api)
+        await card_service.insert_or_update_cards_async(commanders)
         return CommanderList(cards=commanders)
     except HTTPException:
         raise
+    except UpstreamError as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{name}/meta", response_model=dict)
-def get_commander_meta(name: str, category: str | None = None):
+async def get_commander_meta(name: str, category: str | None = None):
     try:
-        card_list = get_edhrec_cardlists(name)
+        card_list = await run_in_threadpool(get_edhrec_cardlists, name)
 
         if not card_list:
             raise HTTPException(
@@ -64,7 +80,7 @@ def get_commander_meta(name: str, category: str | None = None):
             )
 
         if category == "Basic Lands":
-            card = card_service.get_card_by_name(name)
+            card = await card_service.get_card_by_name_async(name)
             if not card:
                 raise CardNotFound(name)
             card_ci = card.color_identity
@@ -85,9 +101,9 @@ def get_commander_meta(name: str, category: str | None = None):
         if not card_names:
             return {"commander": name, "category": category, "cards": []}
 
-        cards = get_many_cards_from_api(card_names)
+        cards = (await fetch_cards_in_batches_async(card_names)).cards
 
-        card_service.insert_or_update_cards(cards)
+        await card_service.insert_or_update_cards_async(cards)
 
         cards_dict = []
         for card in cards:
@@ -112,6 +128,11 @@ def get_commander_meta(name: str, category: str | None = None):
         return {"commander": name, "category": category, "cards": cards_dict}
     except HTTPException:
         raise
+    except UpstreamError as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -137,11 +158,11 @@ def get_basic_lands_for_color_identity(color_identity: str) -> list[str]:
 
 
 @router.get("/{name}/meta/all", response_model=dict)
-def get_commander_meta_all(name: str):
+async def get_commander_meta_all(name: str):
     """Get all meta categories and basic lands for a commander by name."""
     try:
         # Get commander by name
-        commander = card_service.get_card_by_name(name)
+        commander = await card_service.get_card_by_name_async(name)
         if not commander:
             raise CardNotFound(name)
 
@@ -152,7 +173,7 @@ def get_commander_meta_all(name: str):
             )
 
         # Get all categories from EDHREC
-        card_list = get_edhrec_cardlists(commander_name)
+        card_list = await run_in_threadpool(get_edhrec_cardlists, commander_name)
 
         if not card_list:
             raise HTTPException(
@@ -182,8 +203,8 @@ def get_commander_meta_all(name: str):
 
         # Fetch all cards from API in one batch
         if all_card_names:
-            all_cards = get_many_cards_from_api(list(all_card_names))
-            card_service.insert_or_update_cards(all_cards)
+            all_cards = (await fetch_cards_in_batches_async(list(all_card_names))).cards
+            await card_service.insert_or_update_cards_async(all_cards)
 
             # Create a map of card name to card object
             cards_by_name = {card.name: card for card in all_cards}
@@ -222,5 +243,10 @@ def get_commander_meta_all(name: str):
         if http_exc:
             raise http_exc
         raise
+    except UpstreamError as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
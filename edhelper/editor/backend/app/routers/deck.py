@@ -5,10 +5,12 @@ from io import BytesIO, StringIO
 from edhelper.commom.sync_db_commands import SyncDbCommands
 from edhelper.domain import card_service
 from edhelper.editor.backend.app.schemas.card import SetCommander
+from edhelper.editor.backend.app.scheduler import scheduler
 from edhelper.domain.deck import Deck
 from edhelper.domain.deck_card import DeckCard
 import edhelper.domain.deck_service as deck_service
 import edhelper.domain.deck_card_service as deck_card_service
+from edhelper.domain.mapper import CARD_NAME_FIELDS
 from edhelper.commom.excptions import (
     CardNotFound,
     DeckNotFound,
@@ -18,8 +20,9 @@ from edhelper.commom.excptions import (
     ShortPartial,
     InvalidQuantity,
     SyncNotAvailable,
+    UpstreamError,
+    UpstreamUnavailable,
 )
-from edhelper.external.api import get_many_cards_from_api
 import csv
 import json
 import zipfile
@@ -54,18 +57,24 @@ def convert_exception_to_http(e: Exception) -> HTTPException:
         return HTTPException(status_code=400, detail=e.message)
     elif isinstance(e, SyncNotAvailable):
         return HTTPException(status_code=400, detail=e.message)
+    elif isinstance(e, UpstreamUnavailable):
+        return HTTPException(status_code=503, detail=e.message)
+    elif isinstance(e, UpstreamError):
+        return HTTPException(status_code=502, detail=e.message)
     return None
 
 
 @router.get("/sync/{deck_id}", response_model=CompleteDeckRead)
-def sync_deck(deck_id: int):
+async def sync_deck(deck_id: int):
     try:
-        SyncDbCommands.sync_deck(deck_id)
-        deck = deck_service.get_deck_by_id(deck_id)
+        await SyncDbCommands.sync_deck_async(deck_id)
+        deck = await deck_service.get_deck_by_id_async(deck_id)
         if not deck:
             raise DeckNotFound(deck_id)
         assert deck.name is not None, "Deck should have a name"
-        deck, deck_cards = deck_card_service.get_deck_data_by_name(deck.name)
+        deck, deck_cards = await deck_card_service.get_deck_data_by_name_async(
+            deck.name
+        )
 
         return {
             "name": deck.name,
@@ -85,25 +94,65 @@ def sync_deck(deck_id: int):
         if http_exc:
             raise http_exc
         raise
+    except UpstreamError as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/sync-prices/{deck_id}", response_model=CompleteDeckRead)
+async def sync_deck_prices(deck_id: int):
+    try:
+        deck = await deck_service.get_deck_by_id_async(deck_id)
+        await SyncDbCommands.sync_deck_prices_async(deck_id)
+        assert deck.name is not None, "Deck should have a name"
+        deck, deck_cards = await deck_card_service.get_deck_data_by_name_async(
+            deck.name
+        )
+
+        return {
+            "name": deck.name,
+            "id": deck.id,
+            "last_update": deck.last_update,
+            "cards": deck_cards,
+        }
+    except HTTPException:
+        raise
+    except DeckNotFound as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
+    except UpstreamError as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/", response_model=DeckList)
-def list_decks():
+async def list_decks():
     try:
-        decks = deck_service.get_decks()
+        decks = await deck_service.get_deck_summaries_async()
         return DeckList(decks=decks)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{id}", response_model=CompleteDeckRead)
-def get_deck(id: int):
+async def get_deck(id: int):
     try:
-        deck = deck_service.get_deck_by_id(id)
+        deck = await deck_service.get_deck_by_id_async(id)
         assert deck.name is not None, "Deck should have a name"
-        deck, deck_cards = deck_card_service.get_deck_data_by_name(deck.name)
+        scheduler.deck_opened(id)
+        deck, deck_cards = await deck_card_service.get_deck_data_by_name_async(
+            deck.name
+        )
 
         return {
             "name": deck.name,
@@ -123,21 +172,21 @@ def get_deck(id: int):
 
 
 @router.post("/", response_model=DeckInDB, status_code=201)
-def create_deck(new_deck: DeckCreate):
+async def create_deck(new_deck: DeckCreate):
     try:
-        deck = deck_service.get_deck_by_name(new_deck.name)
+        deck = await deck_service.get_deck_by_name_async(new_deck.name)
         if deck:
             raise DeckAlreadyExists(new_deck.name)
 
         deck = Deck(name=new_deck.name)
         deck.update()
         if new_deck.commander:
-            card = card_service.get_card_by_name(new_deck.commander)
-            deck = deck_service.create_deck_with_cards(
+            card = await card_service.get_card_by_name_async(new_deck.commander)
+            deck = await deck_service.create_deck_with_cards_async(
                 new_deck.name, [{"card": card, "quantidade": 1}]
             )
         else:
-            deck = deck_service.create_deck(deck)
+            deck = await deck_service.create_deck_async(deck)
         return deck
     except HTTPException:
         raise
@@ -146,20 +195,25 @@ def create_deck(new_deck: DeckCreate):
         if http_exc:
             raise http_exc
         raise
+    except UpstreamError as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.put("/{id}", response_model=DeckInDB)
-def rename_deck(id: int, data: DeckUpdate):
+async def rename_deck(id: int, data: DeckUpdate):
     try:
-        deck = deck_service.get_deck_by_id(id)
-        dest = deck_service.get_deck_by_name(data.name)
+        deck = await deck_service.get_deck_by_id_async(id)
+        dest = await deck_service.get_deck_by_name_async(data.name)
         if dest:
             raise DeckAlreadyExists(data.name)
         assert deck.name is not None, "Deck should have a name"
-        deck_service.rename_deck(deck.name, data.name)
-        return deck_service.get_deck_by_name(data.name)
+        await deck_service.rename_deck_async(deck.name, data.name)
+        return await deck_service.get_deck_by_name_async(data.name)
     except HTTPException:
         raise
     except (DeckNotFound, DeckAlreadyExists) as e:
@@ -172,11 +226,11 @@ def rename_deck(id: int, data: DeckUpdate):
 
 
 @router.delete("/{id}", status_code=204)
-def delete_deck(id: int):
+async def delete_deck(id: int):
     try:
-        deck = deck_service.get_deck_by_id(id)
+        deck = await deck_service.get_deck_by_id_async(id)
         assert deck.name is not None, "Deck should have a name"
-        deck_service.delete_deck(deck.name)
+        await deck_service.delete_deck_async(deck.name)
         return
     except HTTPException:
         raise
@@ -190,17 +244,17 @@ def delete_deck(id: int):
 
 
 @router.post("/{id}/copy", response_model=DeckInDB, status_code=201)
-def copy_deck(id: int, dest: DeckUpdate):
+async def copy_deck(id: int, dest: DeckUpdate):
     try:
-        deck = deck_service.get_deck_by_id(id)
+        deck = await deck_service.get_deck_by_id_async(id)
         if not deck:
             raise HTTPException(status_code=404, detail="Deck not found")
         assert deck.name is not None, "Deck should have a name"
-        dest_deck = deck_service.get_deck_by_name(dest.name)
+        dest_deck = await deck_service.get_deck_by_name_async(dest.name)
         if dest_deck:
             raise HTTPException(status_code=400, detail="Deck already exists")
-        deck_service.copy_deck(deck, dest.name)
-        resp = deck_service.get_deck_by_name(dest.name)
+        await deck_service.copy_deck_async(deck, dest.name)
+        resp = await deck_service.get_deck_by_name_async(dest.name)
         return resp
     except HTTPException as e:
         raise e
@@ -209,13 +263,15 @@ def copy_deck(id: int, dest: DeckUpdate):
 
 
 @router.get("/{id}/txt")
-def export_txt(id: int):
+async def export_txt(id: int):
     try:
-        deck = deck_service.get_deck_by_id(id)
+        deck = await deck_service.get_deck_by_id_async(id)
         if not deck:
             raise HTTPException(status_code=404, detail="Deck not found")
         assert deck.name is not None, "Deck should have a name"
-        _, cards = deck_card_service.get_deck_data_by_name(deck.name)
+        _, cards = await deck_card_service.get_deck_data_by_name_async(
+            deck.name, fields=CARD_NAME_FIELDS
+        )
         txt = []
         for card in cards:
             if card.is_commander:
@@ -236,13 +292,15 @@ def export_txt(id: int):
 
 
 @router.get("/{id}/csv")
-def export_csv(id: int):
+async def export_csv(id: int):
     try:
-        deck = deck_service.get_deck_by_id(id)
+        deck = await deck_service.get_deck_by_id_async(id)
         if not deck:
             raise HTTPException(status_code=404, detail="Deck not found")
         assert deck.name is not None, "Deck should have a name"
-        _, cards = deck_card_service.get_deck_data_by_name(deck.name)
+        _, cards = await deck_card_service.get_deck_data_by_name_async(
+            deck.name, fields=CARD_NAME_FIELDS
+        )
 
         buffer = StringIO()
         writer = csv.writer(buffer)
@@ -271,13 +329,15 @@ def export_csv(id: int):
 @router.get(
     "/{id}/json",
 )
-def export_json(id: int):
+async def export_json(id: int):
     try:
-        deck = deck_service.get_deck_by_id(id)
+        deck = await deck_service.get_deck_by_id_async(id)
         if not deck:
             raise HTTPException(status_code=404, detail="Deck not found")
         assert deck.name is not None, "Deck should have a name"
-        _, cards = deck_card_service.get_deck_data_by_name(deck.name)
+        _, cards = await deck_card_service.get_deck_data_by_name_async(
+            deck.name, fields=CARD_NAME_FIELDS
+        )
 
         data = []
         for card in cards:
@@ -300,16 +360,18 @@ def export_json(id: int):
 
 
 @router.get("/all/export")
-def export_all():
+async def export_all():
     try:
-        decks = deck_service.get_decks()
+        decks = await deck_service.get_decks_async()
 
         # Create zip file in memory
         zip_buffer = BytesIO()
         with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
             for deck in decks:
                 assert deck.name is not None
-                _, cards = deck_card_service.get_deck_data_by_name(deck.name)
+                _, cards = await deck_card_service.get_deck_data_by_name_async(
+                    deck.name, fields=CARD_NAME_FIELDS
+                )
 
                 # Create txt content
                 txt_lines = []
@@ -336,15 +398,15 @@ def export_all():
 
 
 @router.post("/import-txt", response_model=CompleteDeckRead, status_code=201)
-def import_txt(deck_name: str = Form(...), file: UploadFile = File(...)):
+async def import_txt(deck_name: str = Form(...), file: UploadFile = File(...)):
     try:
         # Check if deck already exists (following CLI pattern)
-        existing_deck = deck_service.get_deck_by_name(deck_name)
+        existing_deck = await deck_service.get_deck_by_name_async(deck_name)
         if existing_deck:
             raise DeckAlreadyExists(deck_name)
 
         # Read file content
-        content = file.file.read().decode("utf-8")
+        content = (await file.read()).decode("utf-8")
         lines = content.splitlines()
 
         # Parse cards from txt
@@ -373,30 +435,26 @@ def import_txt(deck_name: str = Form(...), file: UploadFile = File(...)):
         # Get card names
         card_names = [card[1] for card in cards]
 
-        # Get cards from database
-        card_data = card_service.get_cards_by_name(card_names)
-
-        # Fetch missing cards from API
-        if len(card_data) != len(card_names):
-            card_data_names = [card.name for card in card_data]
-            extra_cards = [card for card in card_names if card not in card_data_names]
-            extra_card_data = get_many_cards_from_api(extra_cards)
-            card_service.insert_or_update_cards(extra_card_data)
-            card_data.extend(extra_card_data)
+        # Get cards from database, fetching missing ones from API
+        card_data = await card_service.resolve_card_names_async(card_names)
 
         # Create deck cards list (following CLI pattern)
         card_list = []
-        for card in card_data:
-            for qty, name in cards:
-                if card.name == name:
-                    card_list.append({"card": card, "quantidade": int(qty)})
-                    break
+        added = set()
+        for qty, name in cards:
+            card = card_data.get(name)
+            if card is None or card.id in added:
+                continue
+            added.add(card.id)
+            card_list.append({"card": card, "quantidade": int(qty)})
 
         # Create deck with cards (following CLI pattern)
-        deck = deck_service.create_deck_with_cards(deck_name, card_list)
+        deck = await deck_service.create_deck_with_cards_async(deck_name, card_list)
 
         # Return created deck
-        deck, deck_cards = deck_card_service.get_deck_data_by_name(deck.name)
+        deck, deck_cards = await deck_card_service.get_deck_data_by_name_async(
+            deck.name
+        )
         return {
             "name": deck.name,
             "id": deck.id,
@@ -415,19 +473,24 @@ def import_txt(deck_name: str = Form(...), file: UploadFile = File(...)):
 
 
 @router.get("/{id}/analyze", response_model=dict)
-def analyze_deck(id: int):
+async def analyze_deck(id: int):
     try:
-        deck = deck_service.get_deck_by_id(id)
+        deck = await deck_service.get_deck_by_id_async(id)
         assert deck.name is not None, "Deck should have a name"
-        deck, deck_cards = deck_card_service.get_deck_data_by_name(deck.name)
+        deck, deck_cards = await deck_card_service.get_deck_data_by_name_async(
+            deck.name
+        )
 
-        from edhelper.commom.deck_analyzer import analyze_commander_rules
+        from edhelper.commom.deck_analyzer import (
+            analyze_commander_rules,
+            deck_statistics,
+        )
 
         result = analyze_commander_rules(deck_cards)
 
         commander_data = None
-        if result["commander"]:
-            commander = result["commander"]
+        if result["commander_card"] is not None:
+            commander = result["commander_card"]
             commander_data = {
                 "id": commander.id,
                 "name": commander.name,
@@ -443,6 +506,7 @@ def analyze_deck(id: int):
             "commander_color_identity": result.get("commander_color_identity"),
             "errors": result["errors"],
             "warnings": result["warnings"],
+            "statistics": deck_statistics(deck_cards),
         }
     except HTTPException:
         raise
@@ -456,14 +520,14 @@ def analyze_deck(id: int):
 
 
 @router.post("/{id}/add", response_model=FullDeckCards)
-def add_card(id: int, body: DeckQuantity):
+async def add_card(id: int, body: DeckQuantity):
     try:
         if body.quantidade <= 0:
             raise InvalidQuantity(body.quantidade)
-        deck = deck_service.get_deck_by_id(id)
-        card = card_service.get_card_by_id(body.card_id)
+        deck = await deck_service.get_deck_by_id_async(id)
+        card = await card_service.get_card_by_id_async(body.card_id)
         assert card.name is not None, "Card should have a name"
-        dc = deck_card_service.get_deck_commanders_name(card.name)
+        dc = await deck_card_service.get_deck_commanders_name_async(card.name)
         if not dc:
             dc = DeckCard(
                 deck_id=deck.id,
@@ -473,10 +537,10 @@ def add_card(id: int, body: DeckQuantity):
             )
         else:
             dc.quantidade = body.quantidade
-        deck_card_service.update_or_insert_deck_card(dc)
+        await deck_card_service.update_or_insert_deck_card_async(dc)
         assert deck.id is not None, "Deck should have an id"
         assert card.id is not None, "Card should have an id"
-        dc = deck_card_service.get_deck_card(deck.id, card.id)
+        dc = await deck_card_service.get_deck_card_async(deck.id, card.id)
         if not dc:
             raise HTTPException(status_code=404, detail="Deck card not found")
         return dc
@@ -492,25 +556,25 @@ def add_card(id: int, body: DeckQuantity):
 
 
 @router.post("/{id}/remove", response_model=FullDeckCards)
-def remove_card(id: int, body: DeckQuantity):
+async def remove_card(id: int, body: DeckQuantity):
     try:
         if body.quantidade <= 0:
             raise InvalidQuantity(body.quantidade)
-        deck = deck_service.get_deck_by_id(id)
-        card = card_service.get_card_by_id(body.card_id)
+        deck = await deck_service.get_deck_by_id_async(id)
+        card = await card_service.get_card_by_id_async(body.card_id)
         assert card.name is not None, "Card should have a name"
         assert deck.id is not None, "Deck should have an id"
         assert card.id is not None, "Card should have an id"
-        dc = deck_card_service.get_deck_card(deck.id, card.id)
+        dc = await deck_card_service.get_deck_card_async(deck.id, card.id)
         if not dc:
             assert deck.name is not None
             raise CardNotOnDeck(card.name, deck.name)
         assert dc.quantidade is not None, "Deck card should have a qty"
         if dc.quantidade <= body.quantidade:
-            deck_card_service.delete_deck_card(dc)
+            await deck_card_service.delete_deck_card_async(dc)
             return DeckCard(card=card, quantidade=0, is_commander=False)
         dc.quantidade -= body.quantidade
-        deck_card_service.update_deck_card_quantity(dc)
+        await deck_card_service.update_deck_card_quantity_async(dc)
         return dc
     except HTTPException:
         raise
@@ -524,31 +588,31 @@ def remove_card(id: int, body: DeckQuantity):
 
 
 @router.delete("/{id}/commander", status_code=204)
-def reset_commander(id: int):
+async def reset_commander(id: int):
     try:
-        deck = deck_service.get_deck_by_id(id)
+        deck = await deck_service.get_deck_by_id_async(id)
         if not deck:
             raise HTTPException(status_code=404, detail="Deck not found")
         assert deck.id is not None, "Deck should have a id"
-        deck_card_service.reset_deck_commander(deck.id)
+        await deck_card_service.reset_deck_commander_async(deck.id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/{id}/commander", response_model=FullDeckCards)
-def set_commander(id: int, card: SetCommander):
+async def set_commander(id: int, card: SetCommander):
     try:
         card_id = card.card_id
-        deck = deck_service.get_deck_by_id(id)
+        deck = await deck_service.get_deck_by_id_async(id)
         assert deck.id is not None, "Deck should have a id"
-        card = card_service.get_card_by_id(card_id)
-        dc = deck_card_service.get_deck_card(deck.id, card_id)
+        card = await card_service.get_card_by_id_async(card_id)
+        dc = await deck_card_service.get_deck_card_async(deck.id, card_id)
         if not dc:
             assert deck.name is not None
             raise CardNotOnDeck(card.name, deck.name)
         dc.is_commander = True
         dc.quantidade = 1
-        deck_card_service.set_deck_commander(dc)
+        await deck_card_service.set_deck_commander_async(dc)
         return dc
     except HTTPException:
         raise
@@ -562,20 +626,25 @@ def set_commander(id: int, card: SetCommander):
 
 
 @router.get("/{id}/commander", response_model=FullDeckCards)
-def get_commander(id: int):
+async def get_commander(id: int):
     try:
-        deck = deck_service.get_deck_by_id(id)
+        deck = await deck_service.get_deck_by_id_async(id)
         if not deck:
             raise HTTPException(status_code=404, detail="Deck not found")
-        commander = deck_card_service.get_deck_commanders_name(id)
+        commander = await deck_card_service.get_deck_commanders_name_async(id)
         if not commander:
             raise HTTPException(status_code=404, detail="Commander not found")
-        card = card_service.get_card_by_name(commander)
+        card = await card_service.get_card_by_name_async(commander)
         assert deck.id is not None, "Deck should have an id"
         assert card.id is not None, "Card should have an id"
-        deck_card = deck_card_service.get_deck_card(deck.id, card.id)
+        deck_card = await deck_card_service.get_deck_card_async(deck.id, card.id)
         return deck_card
     except HTTPException as e:
         raise e
+    except UpstreamError as e:
+        http_exc = convert_exception_to_http(e)
+        if http_exc:
+            raise http_exc
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
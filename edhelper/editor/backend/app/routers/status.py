@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from edhelper.domain.card_cache import get_card_cache
+from edhelper.editor.backend.app.scheduler import scheduler, tracker
+from edhelper.external.resilience import circuit_states, metrics
+
+router = APIRouter(prefix="/api/status", tags=["status"])
+
+
+@router.get("/", response_model=dict)
+async def get_status():
+    return {
+        "scheduler": scheduler.status(),
+        "requests_in_flight": tracker.in_flight,
+        "http": metrics.snapshot(),
+        "circuits": circuit_states(),
+        "card_cache": get_card_cache().stats(),
+    }
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException
+from edhelper.domain import sync_job_service
+from edhelper.editor.backend.app.schemas.sync import SyncJob
+
+router = APIRouter(prefix="/api/sync", tags=["sync"])
+
+
+@router.get("/jobs/latest", response_model=SyncJob)
+async def get_latest_sync_job(scope: str | None = None):
+    """Poll this while a full sync runs (CLI, shell or here) to show its progress."""
+    job = await sync_job_service.get_latest_job_async(scope)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No sync job found")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=SyncJob)
+async def get_sync_job(job_id: int):
+    job = await sync_job_service.get_job_async(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Sync job {job_id} not found")
+    return job
@@ -0,0 +1,190 @@
+"""
+Background refresh for the editor server.
+
+RefreshScheduler starts and stops with the app lifespan. Every
+SCHEDULER_INTERVAL seconds it syncs the stale cards of the recently opened
+decks: card data past CARD_DATA_TTL and prices past CARD_PRICE_TTL. Opening
+those decks later then needs no upstream call. Before each deck it waits
+until no foreground request has been in flight for SCHEDULER_IDLE seconds.
+It skips a host whose circuit is open or whose rate limit is half used.
+Decks are refreshed one at a time; the upstream calls stay off the event
+loop and the writes go through the database writer like any request's.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+import httpx
+import edhelper.domain.card_service as card_service
+import edhelper.domain.deck_service as deck_service
+from edhelper.commom.sync_db_commands import SyncDbCommands
+from edhelper.external.batch import fetch_cards_in_batches_async
+from edhelper.external.http_cache import refresh_cache
+from edhelper.external.resilience import has_headroom
+from edhelper.infra.async_db import run_read
+from edhelper.infra.config import settings
+
+
+logger = logging.getLogger("edhelper.scheduler")
+
+SCRYFALL_HOST = "api.scryfall.com"
+
+
+class RequestTracker:
+    """Foreground requests in flight, counted by the app middleware."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.last_finished = 0.0
+
+    @contextmanager
+    def track(self):
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.last_finished = time.monotonic()
+
+    def busy(self, idle: float) -> bool:
+        """True while a request runs or the last one ended less than idle seconds ago."""
+        return self.in_flight > 0 or time.monotonic() - self.last_finished < idle
+
+
+class RefreshScheduler:
+    STOPPED = "stopped"
+    IDLE = "idle"
+    PAUSED = "paused"
+    RUNNING = "running"
+
+    def __init__(self, tracker: RequestTracker):
+        self.tracker = tracker
+        self.state = self.STOPPED
+        self.runs = 0
+        self.cards_refreshed = 0
+        self.prices_refreshed = 0
+        self.skipped = 0
+        self.last_run_at: float | None = None
+        self.next_run_at: float | None = None
+        self.last_error: str | None = None
+        self._opened: OrderedDict[int, None] = OrderedDict()
+        self._stop: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def deck_opened(self, deck_id: int):
+        self._opened[deck_id] = None
+        self._opened.move_to_end(deck_id)
+        while len(self._opened) > settings.SCHEDULER_DECKS:
+            self._opened.popitem(last=False)
+
+    def recent_decks(self) -> list[int]:
+        """Opened decks, newest first, topped up with the last updated ones."""
+        deck_ids = list(reversed(self._opened))
+        if len(deck_ids) < settings.SCHEDULER_DECKS:
+            for deck in deck_service.get_deck_summaries(limit=settings.SCHEDULER_DECKS):
+                if deck.id not in deck_ids:
+                    deck_ids.append(deck.id)
+        return deck_ids[: settings.SCHEDULER_DECKS]
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        self.state = self.IDLE
+
+    async def stop(self):
+        """Let the deck being refreshed finish, then stop."""
+        if self._task is None:
+            return
+        self._stop.set()
+        await self._task
+        self._task = None
+        self.state = self.STOPPED
+        self.next_run_at = None
+
+    def status(self) -> dict:
+        return {
+            "enabled": settings.SCHEDULER,
+            "state": self.state,
+            "interval": settings.SCHEDULER_INTERVAL,
+            "runs": self.runs,
+            "cards_refreshed": self.cards_refreshed,
+            "prices_refreshed": self.prices_refreshed,
+            "skipped": self.skipped,
+            "last_run_at": self.last_run_at,
+            "next_run_at": self.next_run_at,
+            "last_error": self.last_error,
+            "recent_decks": list(reversed(self._opened)),
+        }
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._stop.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _wait_idle(self):
+        while not self._stop.is_set() and self.tracker.busy(settings.SCHEDULER_IDLE):
+            self.state = self.PAUSED
+            await self._sleep(settings.SCHEDULER_IDLE)
+        self.state = self.RUNNING
+
+    async def _run(self):
+        while not self._stop.is_set():
+            await self._refresh()
+            self.state = self.IDLE
+            self.next_run_at = time.time() + settings.SCHEDULER_INTERVAL
+            await self._sleep(settings.SCHEDULER_INTERVAL)
+
+    async def _refresh(self):
+        await self._wait_idle()
+        self.last_run_at = time.time()
+        try:
+            for deck_id in await run_read(self.recent_decks):
+                await self._wait_idle()
+                if self._stop.is_set():
+                    return
+                await self._refresh_deck(deck_id)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning("background refresh failed: %s", e)
+        finally:
+            self.runs += 1
+
+    async def _refresh_deck(self, deck_id: int):
+        stale = await card_service.get_stale_cards_async(
+            card_service.DATA,
+            settings.CARD_DATA_TTL,
+            settings.SCHEDULER_BATCH,
+            deck_ids=[deck_id],
+        )
+        if stale and has_headroom(httpx.URL(settings.API_URL).host):
+            with refresh_cache():
+                result = await fetch_cards_in_batches_async(
+                    [name for _, name in stale]
+                )
+            await card_service.insert_or_update_cards_async(result.cards)
+            self.cards_refreshed += len(result.cards)
+        elif stale:
+            self.skipped += len(stale)
+
+        stale_prices = await card_service.get_stale_cards_async(
+            card_service.PRICE,
+            settings.CARD_PRICE_TTL,
+            settings.SCHEDULER_BATCH,
+            deck_ids=[deck_id],
+        )
+        if stale_prices and has_headroom(SCRYFALL_HOST):
+            self.prices_refreshed += await SyncDbCommands.sync_prices_async(
+                [card_id for card_id, _ in stale_prices]
+            )
+        elif stale_prices:
+            self.skipped += len(stale_prices)
+
+
+tracker = RequestTracker()
+scheduler = RefreshScheduler(tracker)
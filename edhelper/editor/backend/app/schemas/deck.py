@@ -27,8 +27,17 @@ class DeckInDB(Deck):
     last_update: datetime
 
 
+class DeckSummary(DeckInDB):
+    card_count: int = 0
+    commander_id: Optional[str] = None
+    commander_name: Optional[str] = None
+    color_identity: Optional[str] = None
+    total_price: float = 0.0
+    last_change: Optional[datetime] = None
+
+
 class DeckList(BaseModel):
-    decks: list[DeckInDB]
+    decks: list[DeckSummary]
 
     class Config:
         from_attributes = True
@@ -0,0 +1,21 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class SyncJob(BaseModel):
+    id: int
+    scope: str
+    status: str
+    total: int
+    done: int
+    failed: int
+    percent: float
+    rate: Optional[float] = None
+    eta: Optional[float] = None
+    started_at: float
+    updated_at: float
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
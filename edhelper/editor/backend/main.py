@@ -1,15 +1,39 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from edhelper.editor.backend.app.routers.deck import router as deck_router
 from edhelper.editor.backend.app.routers.card import router as card_router
 from edhelper.editor.backend.app.routers.commander import router as commander_router
+from edhelper.editor.backend.app.routers.sync import router as sync_router
+from edhelper.editor.backend.app.routers.status import router as status_router
+from edhelper.editor.backend.app.scheduler import scheduler, tracker
+from edhelper.external.http import close_client
+from edhelper.external.http_cache import close_caches, refresh_cache
 from edhelper.infra.config import settings
+from edhelper.infra.async_db import shutdown_db_executor
+from edhelper.infra.db import close_connections
+from edhelper.infra.sql_profiler import logger as sql_logger, profiler
 import os
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.SCHEDULER:
+        scheduler.start()
+    yield
+    await scheduler.stop()
+    # Let queued database work finish before the connections go away.
+    shutdown_db_executor()
+    close_connections()
+    close_client()
+    close_caches()
+
+
 app = FastAPI(
     title="MTG Commanders App",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 origins = [
@@ -19,6 +43,45 @@ origins = [
     "http://0.0.0.0:3839",
 ]
 
+
+# Polled by the UI all the time, they must not keep the scheduler paused.
+_BACKGROUND_PATHS = ("/api/status", "/api/sync/jobs")
+
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    path = request.url.path
+    if not path.startswith("/api/") or path.startswith(_BACKGROUND_PATHS):
+        return await call_next(request)
+    with tracker.track():
+        return await call_next(request)
+
+
+@app.middleware("http")
+async def http_cache_control(request: Request, call_next):
+    # A client asking for "Cache-Control: no-cache" also gets fresh upstream data.
+    no_cache = "no-cache" in request.headers.get("cache-control", "")
+    with refresh_cache(no_cache):
+        return await call_next(request)
+
+
+@app.middleware("http")
+async def profile_sql(request: Request, call_next):
+    if not profiler.enabled:
+        return await call_next(request)
+    label = f"{request.method} {request.url.path}"
+    before_statements, before_elapsed = profiler.summary(label)
+    with profiler.label(label):
+        response = await call_next(request)
+    statements, elapsed = profiler.summary(label)
+    sql_logger.info(
+        "%s: %d statements, %.2f ms",
+        label,
+        statements - before_statements,
+        (elapsed - before_elapsed) * 1000,
+    )
+    return response
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -30,6 +93,8 @@ app.add_middleware(
 app.include_router(card_router)
 app.include_router(deck_router)
 app.include_router(commander_router)
+app.include_router(sync_router)
+app.include_router(status_router)
 
 # Mount static files only if dist/ exists
 frontend_dist_path = os.path.join(settings.BASE_PATH, "editor", "frontend", "dist")
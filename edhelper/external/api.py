@@ -1,6 +1,9 @@
 import httpx
 from edhelper.infra.config import settings
 from edhelper.domain.card import Card
+from edhelper.external.http import get_client
+from edhelper.external.http_cache import cached_request
+from edhelper.commom.excptions import UpstreamError, UpstreamUnavailable
 
 
 def get_headers():
@@ -18,43 +21,49 @@ def create_client() -> dict:
 
     url = f"{settings.API_URL}/api/auth/create-client"
     try:
-        with httpx.Client() as client:
-            resp = client.post(url)
-            resp.raise_for_status()
-            return resp.json()
+        client = get_client()
+        # Never repeated: a retry could register a second client.
+        resp = client.post(url, extensions={"retry": False})
+        resp.raise_for_status()
+        return resp.json()
     except httpx.HTTPStatusError as e:
-        raise Exception(
-            f"HTTP error creating client: {e.response.status_code} - {e.response.text}"
+        raise UpstreamError(
+            f"HTTP error creating client: {e.response.status_code} - {e.response.text}",
+            e.response.status_code,
         )
     except httpx.RequestError as e:
-        raise Exception(f"Error connecting to API: {str(e)}")
+        raise UpstreamUnavailable(f"Error connecting to API: {str(e)}")
 
 
 def get_card_from_api(name: str) -> Card:
     url = f"{settings.API_URL}/api/cards/named/{name}"
     try:
-        with httpx.Client() as client:
-            resp = client.get(url, headers=get_headers())
-            resp.raise_for_status()
-            return Card.from_dict(resp.json())
+        client = get_client()
+        resp = cached_request(client, "GET", url, headers=get_headers())
+        resp.raise_for_status()
+        return Card.from_dict(resp.json())
     except httpx.HTTPStatusError as e:
-        raise Exception(f"HTTP error fetching card: {e.response.status_code}")
+        raise UpstreamError(
+            f"HTTP error fetching card: {e.response.status_code}", e.response.status_code
+        )
     except httpx.RequestError as e:
-        raise Exception(f"Error connecting to API: {str(e)}")
+        raise UpstreamUnavailable(f"Error connecting to API: {str(e)}")
 
 
 def get_autocomplete_from_api(partial: str) -> list[Card]:
     url = f"{settings.API_URL}/api/cards/autocomplete/{partial}"
     try:
-        with httpx.Client() as client:
-            resp = client.get(url, headers=get_headers())
-            resp.raise_for_status()
-            cards = [Card.from_dict(card) for card in resp.json()["cards"]]
-            return cards
+        client = get_client()
+        resp = cached_request(client, "GET", url, headers=get_headers())
+        resp.raise_for_status()
+        cards = [Card.from_dict(card) for card in resp.json()["cards"]]
+        return cards
     except httpx.HTTPStatusError as e:
-        raise Exception(f"HTTP error fetching autocomplete: {e.response.status_code}")
+        raise UpstreamError(
+            f"HTTP error fetching autocomplete: {e.response.status_code}", e.response.status_code
+        )
     except httpx.RequestError as e:
-        raise Exception(f"Error connecting to API: {str(e)}")
+        raise UpstreamUnavailable(f"Error connecting to API: {str(e)}")
 
 
 def get_many_cards_from_api(cards: list[str]) -> list[Card]:
@@ -62,31 +71,35 @@ def get_many_cards_from_api(cards: list[str]) -> list[Card]:
     payload = {"cards": cards}
 
     try:
-        with httpx.Client() as client:
-            resp = client.post(url, json=payload, headers=get_headers())
-            resp.raise_for_status()
-            resp = resp.json()
-            card_list: list[dict] = resp["cards"]
-            cards_final = [Card.from_dict(card) for card in card_list]
-            return cards_final
+        client = get_client()
+        resp = cached_request(client, "POST", url, json=payload, headers=get_headers())
+        resp.raise_for_status()
+        resp = resp.json()
+        card_list: list[dict] = resp["cards"]
+        cards_final = [Card.from_dict(card) for card in card_list]
+        return cards_final
     except httpx.HTTPStatusError as e:
-        raise Exception(f"HTTP error fetching multiple cards: {e.response.status_code}")
+        raise UpstreamError(
+            f"HTTP error fetching multiple cards: {e.response.status_code}", e.response.status_code
+        )
     except httpx.RequestError as e:
-        raise Exception(f"Error connecting to API: {str(e)}")
+        raise UpstreamUnavailable(f"Error connecting to API: {str(e)}")
 
 
 def get_commanders_from_api() -> list[Card]:
     url = f"{settings.API_URL}/api/cards/topcommanders"
     try:
-        with httpx.Client() as client:
-            resp = client.get(url, headers=get_headers())
-            resp.raise_for_status()
-            cards_final = [Card.from_dict(card) for card in resp.json()["cards"]]
-            return cards_final
+        client = get_client()
+        resp = cached_request(client, "GET", url, headers=get_headers())
+        resp.raise_for_status()
+        cards_final = [Card.from_dict(card) for card in resp.json()["cards"]]
+        return cards_final
     except httpx.HTTPStatusError as e:
-        raise Exception(f"HTTP error fetching multiple cards: {e.response.status_code}")
+        raise UpstreamError(
+            f"HTTP error fetching multiple cards: {e.response.status_code}", e.response.status_code
+        )
     except httpx.RequestError as e:
-        raise Exception(f"Error connecting to API: {str(e)}")
+        raise UpstreamUnavailable(f"Error connecting to API: {str(e)}")
 
 def get_card_price_from_scryfall(card_id: str) -> float:
     """
@@ -98,23 +111,77 @@ def get_card_price_from_scryfall(card_id: str) -> float:
     url = f"https://api.scryfall.com/cards/{card_id}"
     
     try:
-        with httpx.Client() as client:
-            resp = client.get(url, timeout=10.0)
-            resp.raise_for_status()
-            data = resp.json()
+        client = get_client()
+        resp = client.get(url, timeout=10.0)
+        resp.raise_for_status()
+        data = resp.json()
 
-            prices = data.get("prices", {})
-            price_usd = prices.get("usd") or prices.get("usd_foil") or prices.get("usd_etched")
+        prices = data.get("prices", {})
+        price_usd = prices.get("usd") or prices.get("usd_foil") or prices.get("usd_etched")
             
-            if price_usd is None:
-                return 0.0
+        if price_usd is None:
+            return 0.0
             
-            return float(price_usd)
+        return float(price_usd)
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
-            raise Exception(f"Card not found in Scryfall: {card_id}")
-        raise Exception(f"HTTP error fetching price: {e.response.status_code}")
+            raise UpstreamError(f"Card not found in Scryfall: {card_id}", 404)
+        raise UpstreamError(
+            f"HTTP error fetching price: {e.response.status_code}", e.response.status_code
+        )
+    except httpx.RequestError as e:
+        raise UpstreamUnavailable(f"Error connecting to Scryfall: {str(e)}")
+    except (ValueError, KeyError) as e:
+        raise Exception(f"Error parsing price data: {str(e)}")
+
+
+SCRYFALL_COLLECTION_URL = "https://api.scryfall.com/cards/collection"
+SCRYFALL_COLLECTION_SIZE = 75
+
+
+def _scryfall_headers() -> dict:
+    return {
+        "User-Agent": f"{settings.NAME}/{settings.VERSION}",
+        "Accept": "application/json",
+    }
+
+
+def _usd_price(record: dict) -> float | None:
+    prices = record.get("prices") or {}
+    price_usd = prices.get("usd") or prices.get("usd_foil") or prices.get("usd_etched")
+    return float(price_usd) if price_usd is not None else None
+
+
+def _post_scryfall_collection(client: httpx.Client, ids: list[str]) -> dict:
+    # Pacing and 429 retries happen in the transport (external.resilience).
+    payload = {"identifiers": [{"id": card_id} for card_id in ids]}
+    resp = client.post(SCRYFALL_COLLECTION_URL, json=payload, headers=_scryfall_headers())
+    resp.raise_for_status()
+    return resp.json()
+
+
+def get_prices_from_scryfall(card_ids: list[str]) -> dict[str, float | None]:
+    """
+    USD prices for many cards through Scryfall's /cards/collection endpoint,
+    75 ids per request, paced by Scryfall's token bucket.
+    Cards Scryfall does not know are missing from the result; cards without
+    a USD price map to None.
+    """
+    card_ids = list(dict.fromkeys(card_ids))
+    prices: dict[str, float | None] = {}
+    client = get_client()
+    try:
+        for start in range(0, len(card_ids), SCRYFALL_COLLECTION_SIZE):
+            chunk = card_ids[start : start + SCRYFALL_COLLECTION_SIZE]
+            data = _post_scryfall_collection(client, chunk)
+            for record in data.get("data", []):
+                prices[record["id"]] = _usd_price(record)
+    except httpx.HTTPStatusError as e:
+        raise UpstreamError(
+            f"HTTP error fetching prices: {e.response.status_code}", e.response.status_code
+        )
     except httpx.RequestError as e:
-        raise Exception(f"Error connecting to Scryfall: {str(e)}")
+        raise UpstreamUnavailable(f"Error connecting to Scryfall: {str(e)}")
     except (ValueError, KeyError) as e:
-        raise Exception(f"Error parsing price data: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error parsing price data: {str(e)}")
+    return prices
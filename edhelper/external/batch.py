@@ -0,0 +1,114 @@
+"""
+Concurrent, chunked version of get_many_cards_from_api.
+
+Large name lists are split into chunks that are posted concurrently (at
+most `concurrency` at a time). A failed chunk does not sink the others:
+the result carries every card that came back plus one ChunkFailure per
+chunk that did not.
+"""
+
+import asyncio
+from typing import Callable
+import httpx
+from edhelper.domain.card import Card
+from edhelper.external.api import get_headers
+from edhelper.external.http import build_async_client
+from edhelper.commom.excptions import UpstreamError, UpstreamUnavailable
+from edhelper.infra.config import settings
+
+
+class ChunkFailure:
+    __slots__ = ("names", "error")
+
+    def __init__(self, names: list[str], error: Exception):
+        self.names = names
+        self.error = error
+
+    def __repr__(self):
+        return f"ChunkFailure({len(self.names)} names, {self.error!r})"
+
+
+class BatchResult:
+    def __init__(self, cards: list[Card] | None = None):
+        self.cards: list[Card] = cards or []
+        self.failures: list[ChunkFailure] = []
+
+    @property
+    def failed_names(self) -> list[str]:
+        return [name for failure in self.failures for name in failure.names]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+# Called after every chunk with (chunks done, total chunks, failure or None).
+ProgressCallback = Callable[[int, int, ChunkFailure | None], None]
+
+
+def chunked(names: list[str], size: int) -> list[list[str]]:
+    return [names[i : i + size] for i in range(0, len(names), size)]
+
+
+async def _fetch_chunk(
+    client: httpx.AsyncClient, names: list[str], headers: dict
+) -> list[Card]:
+    url = f"{settings.API_URL}/api/cards/"
+    try:
+        resp = await client.post(url, json={"cards": names}, headers=headers)
+        resp.raise_for_status()
+        return [Card.from_dict(card) for card in resp.json()["cards"]]
+    except httpx.HTTPStatusError as e:
+        raise UpstreamError(
+            f"HTTP error fetching multiple cards: {e.response.status_code}",
+            e.response.status_code,
+        )
+    except httpx.RequestError as e:
+        raise UpstreamUnavailable(f"Error connecting to API: {str(e)}")
+
+
+async def fetch_cards_in_batches_async(
+    names: list[str],
+    chunk_size: int | None = None,
+    concurrency: int | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> BatchResult:
+    names = list(dict.fromkeys(names))
+    result = BatchResult()
+    if not names:
+        return result
+
+    chunks = chunked(names, chunk_size or settings.API_BATCH_SIZE)
+    semaphore = asyncio.Semaphore(concurrency or settings.API_BATCH_CONCURRENCY)
+    # The first credential read goes to the keyring, keep it off the loop.
+    headers = await asyncio.to_thread(get_headers)
+    done = 0
+
+    async def run(client: httpx.AsyncClient, chunk: list[str]):
+        nonlocal done
+        async with semaphore:
+            failure = None
+            try:
+                result.cards.extend(await _fetch_chunk(client, chunk, headers))
+            except Exception as e:
+                failure = ChunkFailure(chunk, e)
+                result.failures.append(failure)
+            done += 1
+            if on_progress is not None:
+                on_progress(done, len(chunks), failure)
+
+    async with build_async_client() as client:
+        await asyncio.gather(*(run(client, chunk) for chunk in chunks))
+    return result
+
+
+def fetch_cards_in_batches(
+    names: list[str],
+    chunk_size: int | None = None,
+    concurrency: int | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> BatchResult:
+    """Blocking entry point for CLI and shell code (not for a running loop)."""
+    return asyncio.run(
+        fetch_cards_in_batches_async(names, chunk_size, concurrency, on_progress)
+    )
@@ -1,40 +1,86 @@
-import httpx
+import asyncio
+import time
+from edhelper.external.http import get_client
+from edhelper.domain import rate_service
 from edhelper.infra.config import settings
+from edhelper.commom.excptions import UpstreamUnavailable
 
 
-def get_usd_to_brl_rate() -> float:
+BCB_USD_BRL_URL = (
+    "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados/ultimos/1?formato=json"
+)
+
+
+def fetch_usd_to_brl_rate() -> float:
+    """Busca a taxa USD -> BRL na API do Banco Central do Brasil."""
+    resp = get_client().get(BCB_USD_BRL_URL, timeout=10.0)
+    resp.raise_for_status()
+    data = resp.json()
+    if not data:
+        raise Exception("Empty exchange rate response from BCB")
+    return float(data[0]["valor"])
+
+
+def get_usd_to_brl_rate(max_age: float | None = None) -> float:
     """
-    Busca a taxa de conversão USD para BRL.
-    Pode usar uma API pública como exchangerate-api.io ou similar.
+    Taxa de conversão USD para BRL, guardada na tabela exchange_rates.
+
+    The stored rate is used while younger than max_age (defaults to
+    settings.EXCHANGE_RATE_TTL). An older one is refreshed from BCB, and is
+    still used if BCB cannot be reached; with no rate at all this raises.
     """
-    # Opção 1: Usar API pública gratuita (exemplo com exchangerate-api.io)
-    # url = "https://api.exchangerate-api.com/v4/latest/USD"
-    
-    # Opção 2: Usar API do Banco Central do Brasil
-    url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.1/dados/ultimos/1?formato=json"
-    
+    if max_age is None:
+        max_age = settings.EXCHANGE_RATE_TTL
+    stored = rate_service.get_rate("USD", "BRL")
+    if stored is not None and time.time() - stored[1] < max_age:
+        return stored[0]
+    try:
+        rate = fetch_usd_to_brl_rate()
+    except Exception as e:
+        if stored is not None:
+            return stored[0]
+        raise UpstreamUnavailable(f"Could not fetch the USD to BRL rate: {e}")
+    rate_service.save_rate("USD", "BRL", rate)
+    return rate
+
+
+async def get_usd_to_brl_rate_async(max_age: float | None = None) -> float:
+    """get_usd_to_brl_rate() for the editor backend, storing through the writer."""
+    if max_age is None:
+        max_age = settings.EXCHANGE_RATE_TTL
+    stored = await rate_service.get_rate_async("USD", "BRL")
+    if stored is not None and time.time() - stored[1] < max_age:
+        return stored[0]
     try:
-        with httpx.Client() as client:
-            resp = client.get(url, timeout=10.0)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            if data and len(data) > 0:
-                return float(data[0]["valor"])
-            else:
-                # Fallback: usar taxa fixa ou outra API
-                return 5.0  # Taxa aproximada, ajuste conforme necessário
-    except Exception:
-        # Fallback em caso de erro
-        return 5.0  # Taxa aproximada
-
-
-def convert_usd_to_brl(usd_price: float) -> str:
+        rate = await asyncio.to_thread(fetch_usd_to_brl_rate)
+    except Exception as e:
+        if stored is not None:
+            return stored[0]
+        raise UpstreamUnavailable(f"Could not fetch the USD to BRL rate: {e}")
+    await rate_service.save_rate_async("USD", "BRL", rate)
+    return rate
+
+
+def usd_to_cents(usd_price: float | None) -> int | None:
+    return round(usd_price * 100) if usd_price is not None else None
+
+
+def usd_cents_to_brl_cents(usd_cents: int | None, rate: float) -> int | None:
+    # Half-up, like the price shown to the user, not round()'s half-even.
+    return int(usd_cents * rate + 0.5) if usd_cents is not None else None
+
+
+def format_brl_cents(brl_cents: int | None) -> str:
+    """Formata centavos como string no formato brasileiro (1.234,56)."""
+    brl_price = (brl_cents or 0) / 100
+    return f"{brl_price:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def convert_usd_to_brl(usd_price: float, rate: float | None = None) -> str:
     """
     Converte preço de USD para BRL e formata como string no formato brasileiro.
+    Quem converte muitos preços deve buscar a taxa uma vez e passá-la em rate.
     """
-    rate = get_usd_to_brl_rate()
-    brl_price = usd_price * rate
-    
-    # Formatar como R$ X,XX
-    return f"{brl_price:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
\ No newline at end of file
+    if rate is None:
+        rate = get_usd_to_brl_rate()
+    return format_brl_cents(usd_cents_to_brl_cents(usd_to_cents(usd_price), rate))
@@ -1,5 +1,22 @@
-import requests
+import gzip
+import json
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from edhelper.external.http import get_client
+from edhelper.external.http_cache import cached_request, get_cache_mode
+from edhelper.infra.config import settings
+
+
+CARDLISTS_TTL = 24 * 60 * 60
+MEMORY_CACHE_SIZE = 32
+
+# slug -> (fetched_at, card lists), most recently used last.
+_memory: OrderedDict[str, tuple[float, dict[str, list[str]]]] = OrderedDict()
+_memory_lock = threading.Lock()
 
 
 def format_commander_name(commander_name: str):
@@ -11,10 +28,9 @@ def format_commander_name(commander_name: str):
     return formatted_name
 
 
-def request_json(commander_name: str):
-    formatted_name = format_commander_name(commander_name)
+def request_json(formatted_name: str):
     json_url = f"https://json.edhrec.com/pages/commanders/{formatted_name}.json"
-    response = requests.get(json_url)
+    response = cached_request(get_client(), "GET", json_url)
     if response.status_code == 200:
         json_data = response.json()
         return json_data
@@ -22,11 +38,7 @@ def request_json(commander_name: str):
         return None
 
 
-def get_edhrec_cardlists(name):
-    name = format_commander_name(name)
-    json_data = request_json(name)
-    if json_data is None:
-        return {}
+def parse_cardlists(json_data: dict) -> dict[str, list[str]]:
     card_lists = {}
     cardlist_json = json_data["container"]["json_dict"]
     specific_card_lists_data = cardlist_json["cardlists"]
@@ -37,3 +49,81 @@ def get_edhrec_cardlists(name):
             current_cardlist_cards.append(card_view.get("name"))
         card_lists[current_cardlist_name] = current_cardlist_cards
     return card_lists
+
+
+def _disk_path(slug: str) -> Path:
+    return Path(settings.EDHREC_CACHE_DIR) / f"{slug}.json.gz"
+
+
+def _read_memory(slug: str):
+    with _memory_lock:
+        entry = _memory.get(slug)
+        if entry is None:
+            return None
+        if time.time() - entry[0] >= CARDLISTS_TTL:
+            del _memory[slug]
+            return None
+        _memory.move_to_end(slug)
+        return entry
+
+
+def _write_memory(slug: str, fetched_at: float, card_lists: dict):
+    with _memory_lock:
+        _memory[slug] = (fetched_at, card_lists)
+        _memory.move_to_end(slug)
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def _read_disk(slug: str):
+    path = _disk_path(slug)
+    try:
+        fetched_at = path.stat().st_mtime
+        if time.time() - fetched_at >= CARDLISTS_TTL:
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as fp:
+            return fetched_at, json.load(fp)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_disk(slug: str, card_lists: dict):
+    path = _disk_path(slug)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write next to the target and rename, so readers never see half a file.
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as fp:
+        json.dump(card_lists, fp)
+    os.replace(tmp, path)
+
+
+def get_edhrec_cardlists(name, refresh: bool = False):
+    """
+    Card lists (category -> card names) of a commander's EDHREC page.
+
+    Parsed lists are kept for a day, in memory and gzipped on disk, so
+    switching categories or re-running meta does not hit EDHREC again.
+    refresh, or the "refresh"/"off" cache modes, skip the stored copy.
+    """
+    slug = format_commander_name(name)
+    use_cache = not refresh and get_cache_mode() == "default"
+    if use_cache:
+        entry = _read_memory(slug)
+        if entry is None:
+            entry = _read_disk(slug)
+            if entry is not None:
+                _write_memory(slug, *entry)
+        if entry is not None:
+            return entry[1]
+
+    json_data = request_json(slug)
+    if json_data is None:
+        return {}
+    card_lists = parse_cardlists(json_data)
+    if card_lists and get_cache_mode() != "off":
+        _write_memory(slug, time.time(), card_lists)
+        try:
+            _write_disk(slug, card_lists)
+        except OSError:
+            pass
+    return card_lists
@@ -0,0 +1,86 @@
+"""
+Process-wide HTTP client shared by everything in edhelper.external.
+
+One pooled httpx.Client keeps connections alive between calls, so only the
+first request to a host pays for DNS, TCP and TLS. HTTP/2 is used when the
+optional h2 package is installed (pip install edhelper[http2]). Both the
+sync and the async clients send through the rate limiting / retry layer in
+edhelper.external.resilience.
+"""
+
+import atexit
+import threading
+import httpx
+from edhelper.external.resilience import AsyncResilientTransport, ResilientTransport
+from edhelper.infra.config import settings
+
+
+_client: httpx.Client | None = None
+_lock = threading.Lock()
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def transport_options() -> dict:
+    return {
+        "http2": settings.HTTP2 and http2_available(),
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def client_options() -> dict:
+    return {
+        "timeout": httpx.Timeout(
+            settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT
+        ),
+    }
+
+
+def build_client() -> httpx.Client:
+    transport = ResilientTransport(httpx.HTTPTransport(**transport_options()))
+    return httpx.Client(transport=transport, **client_options())
+
+
+def build_async_client() -> httpx.AsyncClient:
+    """
+    A new AsyncClient with the shared settings. Async clients are bound to
+    the event loop they run on, so callers own it and use it as a context
+    manager.
+    """
+    transport = AsyncResilientTransport(
+        httpx.AsyncHTTPTransport(**transport_options())
+    )
+    return httpx.AsyncClient(transport=transport, **client_options())
+
+
+def get_client() -> httpx.Client:
+    """The shared client, created on first use. Safe to use from any thread."""
+    global _client
+    client = _client
+    if client is None or client.is_closed:
+        with _lock:
+            if _client is None or _client.is_closed:
+                _client = build_client()
+            client = _client
+    return client
+
+
+def close_client():
+    global _client
+    with _lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+
+
+atexit.register(close_client)
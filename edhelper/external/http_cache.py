@@ -0,0 +1,304 @@
+"""
+On-disk cache for upstream HTTP responses.
+
+Responses are stored in their own sqlite file next to the database, keyed
+by method + URL + body hash. Only endpoints listed in CACHE_TTLS are cached,
+each with its own TTL. Stale entries that carried an ETag or Last-Modified
+are revalidated with a conditional request instead of being downloaded
+again, and the least recently used entries are evicted once the cache
+grows past settings.HTTP_CACHE_MAX_BYTES. Hits only read: their access
+times are kept in memory and written with the next store, or on close.
+
+cache_mode() overrides the behaviour for a block of code: "refresh" skips
+cached entries but stores what comes back, "off" bypasses the cache.
+"""
+
+import atexit
+import contextvars
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+import httpx
+from edhelper.infra.config import settings
+
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# (method, URL pattern, TTL in seconds), first match wins.
+CACHE_TTLS = (
+    ("GET", re.compile(r"/api/cards/autocomplete/"), DAY),
+    ("GET", re.compile(r"/api/cards/topcommanders$"), DAY),
+    ("GET", re.compile(r"/api/cards/named/"), 7 * DAY),
+    ("POST", re.compile(r"/api/cards/$"), DAY),
+)
+
+MODES = ("default", "refresh", "off")
+
+# Describe the raw payload, not the decoded body that is stored.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+_mode = contextvars.ContextVar("http_cache_mode", default="default")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    key TEXT NOT NULL PRIMARY KEY,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_http_cache_accessed_at ON http_cache (accessed_at);
+"""
+
+
+@contextmanager
+def cache_mode(mode: str):
+    if mode not in MODES:
+        raise ValueError(f"Unknown cache mode: {mode}")
+    token = _mode.set(mode)
+    try:
+        yield
+    finally:
+        _mode.reset(token)
+
+
+def refresh_cache(enabled: bool = True):
+    """cache_mode("refresh") unless the cache is already bypassed."""
+    if enabled and get_cache_mode() == "default":
+        return cache_mode("refresh")
+    return nullcontext()
+
+
+def get_cache_mode() -> str:
+    return _mode.get() if settings.HTTP_CACHE else "off"
+
+
+def ttl_for(method: str, url: str) -> int | None:
+    for policy_method, pattern, ttl in CACHE_TTLS:
+        if method == policy_method and pattern.search(url):
+            return ttl
+    return None
+
+
+def cache_key(method: str, url: str, body: bytes = b"") -> str:
+    digest = hashlib.sha256(body).hexdigest()
+    return hashlib.sha256(f"{method} {url} {digest}".encode()).hexdigest()
+
+
+class CachedResponse:
+    __slots__ = ("status", "headers", "body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, status, headers, body, etag, last_modified, expires_at):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            self.status,
+            headers=json.loads(self.headers),
+            content=self.body,
+            request=request,
+        )
+
+
+class HttpCache:
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        # key -> accessed_at of hits not written yet.
+        self._accessed: dict[str, float] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30.0)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                """
+                SELECT status, headers, body, etag, last_modified, expires_at
+                FROM http_cache WHERE key = ?
+                """,
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+            return CachedResponse(*row)
+
+    def _flush_accessed(self, conn: sqlite3.Connection):
+        """Write the access times of the hits since the last write."""
+        if self._accessed:
+            conn.executemany(
+                "UPDATE http_cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def put(self, key: str, method: str, url: str, response: httpx.Response, ttl: int):
+        now = time.time()
+        headers = {
+            k: v for k, v in response.headers.items() if k not in _DROPPED_HEADERS
+        }
+        body = response.content
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO http_cache (
+                    key, method, url, status, headers, body, etag, last_modified,
+                    stored_at, expires_at, accessed_at, size
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key,
+                    method,
+                    url,
+                    response.status_code,
+                    json.dumps(headers),
+                    body,
+                    response.headers.get("etag"),
+                    response.headers.get("last-modified"),
+                    now,
+                    now + ttl,
+                    now,
+                    len(body),
+                ),
+            )
+            self._accessed.pop(key, None)
+            self._flush_accessed(conn)
+            self._evict(conn)
+            conn.commit()
+
+    def extend(self, key: str, ttl: int):
+        """Mark an entry fresh again after a 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            self._accessed.pop(key, None)
+            self._flush_accessed(conn)
+            conn.execute(
+                "UPDATE http_cache SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                (now + ttl, now, key),
+            )
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        sql = "SELECT COALESCE(SUM(size), 0) FROM http_cache"
+        (total,) = conn.execute(sql).fetchone()
+        if total <= self.max_bytes:
+            return
+        # Walk from the least recently used entry, summing sizes until enough
+        # has been freed, and drop everything up to that point.
+        rows = conn.execute(
+            "SELECT key, size FROM http_cache ORDER BY accessed_at"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM http_cache WHERE key = ?", stale)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            self._accessed.clear()
+            conn.execute("DELETE FROM http_cache")
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._flush_accessed(self._conn)
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+
+_caches: dict[str, HttpCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache() -> HttpCache:
+    path = settings.HTTP_CACHE_PATH
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = HttpCache(path, settings.HTTP_CACHE_MAX_BYTES)
+        return cache
+
+
+def close_caches():
+    with _caches_lock:
+        caches = list(_caches.values())
+        _caches.clear()
+    for cache in caches:
+        cache.close()
+
+
+atexit.register(close_caches)
+
+
+def cached_request(
+    client: httpx.Client, method: str, url: str, **kwargs
+) -> httpx.Response:
+    """
+    client.request() through the cache. Endpoints without a TTL in
+    CACHE_TTLS, and every call made with cache_mode("off"), go straight to
+    the network. Only 200 responses are stored.
+    """
+    mode = get_cache_mode()
+    ttl = ttl_for(method, url)
+    if mode == "off" or ttl is None:
+        return client.request(method, url, **kwargs)
+
+    request = client.build_request(method, url, **kwargs)
+    key = cache_key(method, url, request.content)
+    cache = get_cache()
+    cached = cache.get(key)
+
+    if cached is not None and mode == "default":
+        if cached.fresh:
+            return cached.to_response(request)
+        if cached.etag:
+            request.headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            request.headers["If-Modified-Since"] = cached.last_modified
+
+    response = client.send(request)
+    if response.status_code == 304 and cached is not None:
+        cache.extend(key, ttl)
+        return cached.to_response(request)
+    if response.status_code == 200:
+        cache.put(key, method, url, response, ttl)
+    return response
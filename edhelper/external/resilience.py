@@ -0,0 +1,370 @@
+"""
+Rate limiting, retries and circuit breaking for every upstream call.
+
+ResilientTransport wraps the httpx transport used by the shared clients
+(see edhelper.external.http), so mtg-api, Scryfall, EDHREC and BCB requests
+all go through it without changing the call sites:
+
+- each host has a token bucket (HOST_RATE_LIMITS, settings.HTTP_RATE_LIMIT
+  for the rest) and requests wait for a token instead of being throttled;
+- 429 and 5xx responses and connection errors are retried with jittered
+  exponential backoff, honouring Retry-After;
+- after settings.HTTP_BREAKER_THRESHOLD consecutive failures a host's
+  circuit opens and requests fail fast with CircuitOpenError until
+  settings.HTTP_BREAKER_RESET seconds have passed, then one probe request
+  decides whether it closes again.
+
+Retries and circuit changes are counted in `metrics` and logged to the
+"edhelper.http" logger.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+import httpx
+from edhelper.infra.config import settings
+
+
+logger = logging.getLogger("edhelper.http")
+
+# host -> (requests per second, burst).
+HOST_RATE_LIMITS = {
+    # Scryfall asks for at most 10 requests per second.
+    "api.scryfall.com": (10.0, 10),
+    "json.edhrec.com": (4.0, 4),
+    "api.bcb.gov.br": (2.0, 2),
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(httpx.TransportError):
+    def __init__(self, host: str, retry_in: float, request: httpx.Request):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(
+            f"{host} is failing, not retrying for {retry_in:.1f}s", request=request
+        )
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, returns how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def available(self) -> float:
+        """Tokens free right now, without taking one."""
+        with self._lock:
+            return min(
+                self.burst,
+                self._tokens + (time.monotonic() - self._updated) * self.rate,
+            )
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, host: str, threshold: int, reset_timeout: float):
+        self.host = host
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> float | None:
+        """None when a request may go out, else seconds until it may."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return None
+            retry_in = self.opened_at + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and retry_in <= 0:
+                # Let one request probe the host, the rest keep failing fast.
+                self.state = self.HALF_OPEN
+                return None
+            return max(retry_in, 0.0)
+
+    def blocked(self) -> bool:
+        """True while requests fail fast. Unlike allow(), never takes the probe."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.HALF_OPEN:
+                return True
+            return self.opened_at + self.reset_timeout > time.monotonic()
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("circuit for %s closed", self.host)
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.threshold
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                metrics.incr(self.host, "circuit_opened")
+                logger.warning(
+                    "circuit for %s opened after %d failures", self.host, self.failures
+                )
+
+
+class Metrics:
+    """
+    Per-host counters: requests, retries, throttled (429s), failures (given
+    up), circuit_opened and rejected (failed fast by an open circuit).
+    """
+
+    def __init__(self):
+        self._counts: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def incr(self, host: str, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[host][name] += amount
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {host: dict(counts) for host, counts in self._counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+    def summary(self) -> list[str]:
+        """One line per host that had retries, throttling or circuit trouble."""
+        lines = []
+        for host, counts in sorted(self.snapshot().items()):
+            trouble = [
+                f"{counts[name]} {name.replace('_', ' ')}"
+                for name in ("retries", "throttled", "circuit_opened", "rejected")
+                if counts.get(name)
+            ]
+            if trouble:
+                requests = counts.get("requests", 0)
+                lines.append(f"{host}: {requests} requests, {', '.join(trouble)}")
+        return lines
+
+
+metrics = Metrics()
+
+_buckets: dict[str, TokenBucket] = {}
+_breakers: dict[str, CircuitBreaker] = {}
+_state_lock = threading.Lock()
+
+
+def get_bucket(host: str) -> TokenBucket:
+    with _state_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            rate, burst = HOST_RATE_LIMITS.get(
+                host, (settings.HTTP_RATE_LIMIT, max(1, int(settings.HTTP_RATE_LIMIT)))
+            )
+            bucket = _buckets[host] = TokenBucket(rate, burst)
+        return bucket
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    with _state_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(
+                host, settings.HTTP_BREAKER_THRESHOLD, settings.HTTP_BREAKER_RESET
+            )
+        return breaker
+
+
+def circuit_states() -> dict[str, str]:
+    with _state_lock:
+        return {host: breaker.state for host, breaker in _breakers.items()}
+
+
+def has_headroom(host: str) -> bool:
+    """
+    For background work: the host's circuit is not open and at least half of
+    its burst is free, so foreground requests are not left waiting.
+    """
+    bucket = get_bucket(host)
+    return not get_breaker(host).blocked() and bucket.available() >= bucket.burst / 2
+
+
+def retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt: int, response: httpx.Response | None = None) -> float:
+    """Delay before retry number attempt (0-based), capped at HTTP_BACKOFF_MAX."""
+    if response is not None:
+        delay = retry_after(response)
+        if delay is not None:
+            return min(delay, settings.HTTP_BACKOFF_MAX)
+    # Full jitter, so clients that failed together do not retry together.
+    ceiling = min(settings.HTTP_BACKOFF_MAX, settings.HTTP_BACKOFF_BASE * 2**attempt)
+    return random.uniform(0, ceiling)
+
+
+class _Attempts:
+    """Retry bookkeeping shared by the sync and async transports."""
+
+    def __init__(self, request: httpx.Request):
+        self.request = request
+        self.host = request.url.host
+        self.bucket = get_bucket(self.host)
+        self.breaker = get_breaker(self.host)
+        # Requests that must not be repeated pass extensions={"retry": False}.
+        retry = request.extensions.get("retry", True)
+        self.retries = settings.HTTP_RETRIES if retry else 0
+        self.attempt = 0
+
+    @property
+    def exhausted(self) -> bool:
+        # No point waiting to retry once this host's circuit has opened.
+        return self.attempt >= self.retries or self.breaker.state == self.breaker.OPEN
+
+    def before_send(self) -> float:
+        retry_in = self.breaker.allow()
+        if retry_in is not None:
+            metrics.incr(self.host, "rejected")
+            raise CircuitOpenError(self.host, retry_in, self.request)
+        metrics.incr(self.host, "requests")
+        return self.bucket.reserve()
+
+    def on_response(self, response: httpx.Response) -> float | None:
+        """None to hand the response back, else the delay before retrying."""
+        status = response.status_code
+        if status >= 500:
+            self.breaker.record_failure()
+        else:
+            # A 429 still means the host is up, it just wants us to slow down.
+            self.breaker.record_success()
+            if status != 429:
+                return None
+            metrics.incr(self.host, "throttled")
+        if status not in RETRY_STATUSES or self.exhausted:
+            if status >= 500:
+                metrics.incr(self.host, "failures")
+            return None
+        return self._retry(response)
+
+    def on_error(self, error: httpx.TransportError) -> float:
+        """Delay before retrying after a connection error, or re-raise."""
+        self.breaker.record_failure()
+        if self.exhausted:
+            metrics.incr(self.host, "failures")
+            raise error
+        return self._retry(None, error)
+
+    def on_abort(self):
+        """
+        The attempt ended without a response or a TransportError (cancelled,
+        interrupted or another exception). It counts as a failure so a
+        half-open probe cannot leave the circuit half open for good.
+        """
+        self.breaker.record_failure()
+
+    def _retry(self, response, error=None) -> float:
+        delay = backoff(self.attempt, response)
+        self.attempt += 1
+        metrics.incr(self.host, "retries")
+        logger.warning(
+            "retrying %s %s in %.2fs (attempt %d/%d): %s",
+            self.request.method,
+            self.request.url,
+            delay,
+            self.attempt,
+            self.retries,
+            error if error is not None else response.status_code,
+        )
+        return delay
+
+
+class ResilientTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport):
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempts = _Attempts(request)
+        while True:
+            delay = attempts.before_send()
+            try:
+                time.sleep(delay)
+                response = self.transport.handle_request(request)
+            except httpx.TransportError as e:
+                time.sleep(attempts.on_error(e))
+                continue
+            except BaseException:
+                attempts.on_abort()
+                raise
+            delay = attempts.on_response(response)
+            if delay is None:
+                return response
+            response.close()
+            time.sleep(delay)
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncResilientTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempts = _Attempts(request)
+        while True:
+            delay = attempts.before_send()
+            try:
+                await asyncio.sleep(delay)
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                await asyncio.sleep(attempts.on_error(e))
+                continue
+            except BaseException:
+                attempts.on_abort()
+                raise
+            delay = attempts.on_response(response)
+            if delay is None:
+                return response
+            await response.aclose()
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,153 @@
+import json
+import re
+from typing import IO, Iterator
+from edhelper.domain.card import Card
+from edhelper.external.currency import convert_usd_to_brl
+
+
+CHUNK_SIZE = 1 << 20
+# A card object is a few KB; an element this long is a malformed file.
+MAX_ELEMENT_SIZE = 16 << 20
+
+# Layouts that are not real cards and can never be part of a deck.
+SKIPPED_LAYOUTS = {
+    "token",
+    "double_faced_token",
+    "emblem",
+    "art_series",
+    "planar",
+    "scheme",
+    "vanguard",
+}
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+def iter_json_array(
+    fp: IO[str],
+    chunk_size: int = CHUNK_SIZE,
+    max_element_size: int = MAX_ELEMENT_SIZE,
+) -> Iterator[dict]:
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    Only one chunk plus the element being decoded is kept in memory, so
+    multi-hundred-megabyte bulk files can be read without json.load(). An
+    element that does not decode within max_element_size characters is an
+    error instead of a buffer growing to the end of the file.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of file in JSON array")
+            chunk = fp.read(chunk_size)
+            buffer, pos = buffer[pos:] + chunk, 0
+            eof = not chunk
+            continue
+
+        char = buffer[pos]
+        if not started:
+            if char != "[":
+                raise ValueError("Bulk file must contain a JSON array")
+            started = True
+            pos += 1
+            continue
+        if char == "]":
+            return
+        if char == ",":
+            pos += 1
+            continue
+
+        try:
+            obj, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise
+            if len(buffer) - pos > max_element_size:
+                raise ValueError(
+                    f"Malformed JSON array element: no complete value in "
+                    f"{max_element_size} characters ({e.msg})"
+                ) from e
+            chunk = fp.read(chunk_size)
+            buffer, pos = buffer[pos:] + chunk, 0
+            eof = not chunk
+            continue
+        yield obj
+
+
+def _front_face(record: dict) -> dict:
+    faces = record.get("card_faces") or []
+    return faces[0] if faces else {}
+
+
+def _join_colors(colors) -> str:
+    return ",".join(colors or [])
+
+
+def card_from_scryfall(record: dict, rate: float) -> Card:
+    """Map a Scryfall card object to a Card, converting its price with rate."""
+    face = _front_face(record)
+    image_uris = record.get("image_uris") or face.get("image_uris") or {}
+    type_line = record.get("type_line") or face.get("type_line") or ""
+    oracle_text = record.get("oracle_text") or face.get("oracle_text") or ""
+
+    colors = record.get("colors")
+    if colors is None:
+        colors = face.get("colors")
+
+    mana_cost = record.get("mana_cost")
+    if not mana_cost and record.get("card_faces"):
+        mana_cost = " // ".join(
+            f.get("mana_cost", "") for f in record["card_faces"] if f.get("mana_cost")
+        )
+
+    prices = record.get("prices") or {}
+    price_usd = prices.get("usd") or prices.get("usd_foil") or prices.get("usd_etched")
+    price = convert_usd_to_brl(float(price_usd), rate) if price_usd else None
+
+    is_commander = (
+        "Legendary" in type_line and "Creature" in type_line
+    ) or "can be your commander" in oracle_text
+
+    return Card(
+        id=record["id"],
+        name=record["name"],
+        colors=_join_colors(colors),
+        color_identity=_join_colors(record.get("color_identity")),
+        cmc=int(record.get("cmc") or 0),
+        mana_cost=mana_cost or "",
+        image=image_uris.get("normal"),
+        art=image_uris.get("art_crop"),
+        legal_commanders=(record.get("legalities") or {}).get("commander") == "legal",
+        is_commander=is_commander,
+        price=price,
+        edhrec_rank=record.get("edhrec_rank"),
+        type_line=type_line,
+    )
+
+
+def iter_bulk_cards(fp: IO[str], rate: float) -> Iterator[Card]:
+    """
+    Stream Cards out of a Scryfall oracle-cards or default-cards file.
+
+    Tokens, art cards and digital-only printings are skipped, and only the
+    first printing of every name is kept.
+    """
+    seen = set()
+    for record in iter_json_array(fp):
+        if record.get("object", "card") != "card":
+            continue
+        if record.get("layout") in SKIPPED_LAYOUTS or record.get("digital"):
+            continue
+        name = record.get("name")
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        yield card_from_scryfall(record, rate)
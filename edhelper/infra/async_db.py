@@ -0,0 +1,93 @@
+"""
+Async access to the sqlite database for the editor backend.
+
+Blocking service functions are run on dedicated executors instead of the
+event loop or Starlette's shared threadpool: one writer thread, so writes
+never wait on each other's locks, and a small pool of reader threads that
+WAL lets run alongside it. Every thread keeps its own connection through
+edhelper.infra.db, so the services work unchanged.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from edhelper.infra.config import settings
+
+
+class DatabaseExecutor:
+    def __init__(self, readers: int):
+        self.readers = readers
+        self._lock = threading.Lock()
+        self._reader: ThreadPoolExecutor | None = None
+        self._writer: ThreadPoolExecutor | None = None
+
+    def _executors(self) -> tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+        with self._lock:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="edhelper-db-writer"
+                )
+                self._reader = ThreadPoolExecutor(
+                    max_workers=self.readers, thread_name_prefix="edhelper-db-reader"
+                )
+            return self._reader, self._writer
+
+    async def _run(self, executor: ThreadPoolExecutor, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # The caller's context (e.g. the SQL profiler label) follows the call.
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+        return await loop.run_in_executor(executor, call)
+
+    async def read(self, func, *args, **kwargs):
+        reader, _ = self._executors()
+        return await self._run(reader, func, *args, **kwargs)
+
+    async def write(self, func, *args, **kwargs):
+        _, writer = self._executors()
+        return await self._run(writer, func, *args, **kwargs)
+
+    def shutdown(self):
+        with self._lock:
+            executors = (self._reader, self._writer)
+            self._reader = self._writer = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+
+db_executor = DatabaseExecutor(settings.DB_READERS)
+
+
+def run_read(func, *args, **kwargs):
+    return db_executor.read(func, *args, **kwargs)
+
+
+def run_write(func, *args, **kwargs):
+    return db_executor.write(func, *args, **kwargs)
+
+
+def reader(func):
+    """Async version of a read-only service function."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await db_executor.read(func, *args, **kwargs)
+
+    return wrapper
+
+
+def writer(func):
+    """Async version of a service function that writes."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await db_executor.write(func, *args, **kwargs)
+
+    return wrapper
+
+
+def shutdown_db_executor():
+    db_executor.shutdown()
@@ -2,14 +2,16 @@ from dotenv import load_dotenv
 import os
 import keyring
 from pathlib import Path
-import time
-from datetime import datetime, date
+import threading
+from edhelper.infra.startup import timed
 
 
 load_dotenv()
 
 SERVICE_NAME = "edhelper"
 
+_credentials_lock = threading.Lock()
+
 
 class Settings:
     BASE_PATH = Path(__file__).resolve().parents[1]
@@ -18,82 +20,104 @@ class Settings:
     VERSION = "0.3.0"
     DATABASE_URL = str(BASE_PATH / "db.sqlite3")
     API_URL = "https://mtg-api-production.up.railway.app"
+    SQL_PROFILE = os.getenv("EDHELPER_PROFILE_SQL", "").lower() in ("1", "true", "yes")
+    SQL_PROFILE_TOP = int(os.getenv("EDHELPER_PROFILE_SQL_TOP", "10"))
+    STARTUP_PROFILE = os.getenv("EDHELPER_PROFILE_STARTUP", "").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    DB_READERS = int(os.getenv("EDHELPER_DB_READERS", "4"))
+
+    HTTP2 = os.getenv("EDHELPER_HTTP2", "1").lower() in ("1", "true", "yes")
+    HTTP_TIMEOUT = float(os.getenv("EDHELPER_HTTP_TIMEOUT", "30"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("EDHELPER_HTTP_CONNECT_TIMEOUT", "10"))
+    HTTP_MAX_CONNECTIONS = int(os.getenv("EDHELPER_HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("EDHELPER_HTTP_MAX_KEEPALIVE", "10"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("EDHELPER_HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP_CACHE = os.getenv("EDHELPER_HTTP_CACHE", "1").lower() in ("1", "true", "yes")
+    HTTP_CACHE_MAX_BYTES = int(
+        os.getenv("EDHELPER_HTTP_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+    API_BATCH_SIZE = int(os.getenv("EDHELPER_API_BATCH_SIZE", "200"))
+    API_BATCH_CONCURRENCY = int(os.getenv("EDHELPER_API_BATCH_CONCURRENCY", "4"))
+    HTTP_RATE_LIMIT = float(os.getenv("EDHELPER_HTTP_RATE_LIMIT", "10"))
+    HTTP_RETRIES = int(os.getenv("EDHELPER_HTTP_RETRIES", "3"))
+    HTTP_BACKOFF_BASE = float(os.getenv("EDHELPER_HTTP_BACKOFF_BASE", "0.5"))
+    HTTP_BACKOFF_MAX = float(os.getenv("EDHELPER_HTTP_BACKOFF_MAX", "30"))
+    HTTP_BREAKER_THRESHOLD = int(os.getenv("EDHELPER_HTTP_BREAKER_THRESHOLD", "5"))
+    HTTP_BREAKER_RESET = float(os.getenv("EDHELPER_HTTP_BREAKER_RESET", "30"))
+    CARD_CACHE_SIZE = int(os.getenv("EDHELPER_CARD_CACHE_SIZE", "2048"))
+    SYNC_CARD_INTERVAL = float(os.getenv("EDHELPER_SYNC_CARD_INTERVAL", "5"))
+    SYNC_DECK_INTERVAL = float(os.getenv("EDHELPER_SYNC_DECK_INTERVAL", "60"))
+    SYNC_JOB_CHUNK = int(os.getenv("EDHELPER_SYNC_JOB_CHUNK", "1000"))
+    # A running job not checkpointed for this long is taken as dead.
+    SYNC_JOB_STALE = float(os.getenv("EDHELPER_SYNC_JOB_STALE", "600"))
+    SCHEDULER = os.getenv("EDHELPER_SCHEDULER", "1").lower() in ("1", "true", "yes")
+    SCHEDULER_INTERVAL = float(os.getenv("EDHELPER_SCHEDULER_INTERVAL", "600"))
+    SCHEDULER_IDLE = float(os.getenv("EDHELPER_SCHEDULER_IDLE", "2"))
+    SCHEDULER_DECKS = int(os.getenv("EDHELPER_SCHEDULER_DECKS", "5"))
+    SCHEDULER_BATCH = int(os.getenv("EDHELPER_SCHEDULER_BATCH", "200"))
+    CARD_MISS_TTL = float(os.getenv("EDHELPER_CARD_MISS_TTL", "300"))
+    CARD_DATA_TTL = float(os.getenv("EDHELPER_CARD_DATA_TTL", str(7 * 24 * 60 * 60)))
+    CARD_PRICE_TTL = float(os.getenv("EDHELPER_CARD_PRICE_TTL", str(24 * 60 * 60)))
+    EXCHANGE_RATE_TTL = float(os.getenv("EDHELPER_EXCHANGE_RATE_TTL", str(12 * 60 * 60)))
+
+    _cached_credentials: tuple[str, str] | None = None
 
     @property
-    def API_KEY(self) -> str:
-        keyring_key = keyring.get_password(SERVICE_NAME, "api_key")
-        return keyring_key or os.getenv("API_KEY", "")
+    def HTTP_CACHE_PATH(self) -> str:
+        # Lives next to the database so both follow DATABASE_URL.
+        return str(Path(self.DATABASE_URL).with_name("http_cache.sqlite3"))
 
     @property
-    def CLIENT_ID(self) -> str:
-        keyring_id = keyring.get_password(SERVICE_NAME, "client_id")
-        return keyring_id or os.getenv("CLIENT_ID", "")
+    def EDHREC_CACHE_DIR(self) -> str:
+        return str(Path(self.DATABASE_URL).with_name("edhrec_cache"))
+
+    def _credentials(self) -> tuple[str, str]:
+        # Keyring reads can take tens of milliseconds (D-Bus, encrypted
+        # files), so the credentials are read once and kept in memory until
+        # set_credentials() or clear_credentials() changes them.
+        credentials = self._cached_credentials
+        if credentials is None:
+            with _credentials_lock:
+                credentials = self._cached_credentials
+                if credentials is None:
+                    with timed("keyring"):
+                        api_key = keyring.get_password(SERVICE_NAME, "api_key")
+                        client_id = keyring.get_password(SERVICE_NAME, "client_id")
+                    credentials = (
+                        api_key or os.getenv("API_KEY", ""),
+                        client_id or os.getenv("CLIENT_ID", ""),
+                    )
+                    self._cached_credentials = credentials
+        return credentials
 
     @property
-    def SYNC_TIMESTAMP(self) -> str:
-        timestamp = keyring.get_password(SERVICE_NAME, "sync_timestamp")
-        return timestamp or ""
-
-    @property
-    def CARD_SYNC_TIMESTAMP(self) -> str:
-        timestamp = keyring.get_password(SERVICE_NAME, "card_sync_timestamp")
-        return timestamp or ""
+    def API_KEY(self) -> str:
+        return self._credentials()[0]
 
     @property
-    def DECK_SYNC_TIMESTAMP(self) -> str:
-        timestamp = keyring.get_password(SERVICE_NAME, "deck_sync_timestamp")
-        return timestamp or ""
-
-    def can_sync(self):
-        timestamp = self.SYNC_TIMESTAMP
-        if timestamp == "":
-            self.set_sync_timestamp()
-            return True
-        timestamp_date = datetime.fromtimestamp(float(timestamp))
-        today = date.today()
-        return today > timestamp_date
-
-    def can_sync_card(self):
-        timestamp = self.CARD_SYNC_TIMESTAMP
-        if timestamp == "":
-            self.set_card_sync_timestamp()
-            return True
-        MINTIME = 5
-        return time.time() - float(timestamp) > MINTIME
-
-    def can_sync_deck(self):
-        timestamp = self.DECK_SYNC_TIMESTAMP
-        if timestamp == "":
-            self.set_deck_sync_timestamp()
-            return True
-        MINTIME = 60
-        return time.time() - float(timestamp) > MINTIME
-
-    def set_sync_timestamp(self):
-        timestamp = str(time.time())
-        return keyring.set_password(SERVICE_NAME, "sync_timestamp", timestamp)
-
-    def set_card_sync_timestamp(self):
-        timestamp = str(time.time())
-        return keyring.set_password(SERVICE_NAME, "card_sync_timestamp", timestamp)
-
-    def set_deck_sync_timestamp(self):
-        timestamp = str(time.time())
-        return keyring.set_password(SERVICE_NAME, "deck_sync_timestamp", timestamp)
+    def CLIENT_ID(self) -> str:
+        return self._credentials()[1]
 
     def set_credentials(self, api_key: str, client_id: str):
-        keyring.set_password(SERVICE_NAME, "api_key", api_key)
-        keyring.set_password(SERVICE_NAME, "client_id", client_id)
+        with _credentials_lock:
+            self._cached_credentials = None
+            keyring.set_password(SERVICE_NAME, "api_key", api_key)
+            keyring.set_password(SERVICE_NAME, "client_id", client_id)
 
     def clear_credentials(self):
-        try:
-            keyring.delete_password(SERVICE_NAME, "api_key")
-        except Exception:
-            pass
-        try:
-            keyring.delete_password(SERVICE_NAME, "client_id")
-        except Exception:
-            pass
+        with _credentials_lock:
+            self._cached_credentials = None
+            try:
+                keyring.delete_password(SERVICE_NAME, "api_key")
+            except Exception:
+                pass
+            try:
+                keyring.delete_password(SERVICE_NAME, "client_id")
+            except Exception:
+                pass
 
     def user_is_authenticated(self):
         return self.API_KEY != "" and self.CLIENT_ID != ""
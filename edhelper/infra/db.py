@@ -1,6 +1,108 @@
 from contextlib import contextmanager
 from edhelper.infra.config import settings
+from edhelper.infra.sql_profiler import ProfilingConnection, profiler
+import atexit
 import sqlite3
+import threading
+
+
+# Applied once per connection, right after it is opened.
+PRAGMAS = (
+    ("foreign_keys", "ON"),
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("busy_timeout", 5000),
+    ("mmap_size", 268435456),
+    ("cache_size", -16000),
+    ("temp_store", "MEMORY"),
+)
+
+
+class ConnectionManager:
+    """
+    Keeps one long-lived sqlite connection per thread and database path.
+
+    Connections are configured with PRAGMAS once and reused by every
+    transaction() issued from the same thread.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        # Each connection is only used by the thread that opened it, the
+        # same-thread check is relaxed so close_all() can run at shutdown.
+        factory = ProfilingConnection if profiler.enabled else sqlite3.Connection
+        conn = sqlite3.connect(
+            path, timeout=30.0, check_same_thread=False, factory=factory
+        )
+        for name, value in PRAGMAS:
+            conn.execute(f"PRAGMA {name} = {value};")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def get(self) -> sqlite3.Connection:
+        path = settings.DATABASE_URL
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.path == path:
+            return conn
+        if conn is not None:
+            self._discard(conn)
+        conn = self._connect(path)
+        self._local.conn = conn
+        self._local.path = path
+        self._local.depth = 0
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection):
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+connections = ConnectionManager()
+atexit.register(connections.close_all)
+
+if settings.SQL_PROFILE:
+    profiler.enable()
+
+
+def get_connection() -> sqlite3.Connection:
+    return connections.get()
+
+
+def close_connections():
+    connections.close_all()
+
+
+def enable_sql_profiling():
+    """Turn on SQL timing, connections opened before this are reopened."""
+    if not profiler.enabled:
+        profiler.enable()
+        connections.close_all()
+
+
+def after_commit(callback):
+    """
+    Run callback once the current thread's transaction commits, or right
+    away outside one. Callbacks of a rolled back transaction are dropped.
+    """
+    local = connections._local
+    if getattr(local, "depth", 0) == 0:
+        callback()
+        return
+    local.after_commit.append(callback)
 
 
 @contextmanager
@@ -9,15 +111,28 @@ def transaction(cursor=None):
         yield cursor
         return
 
-    conn = sqlite3.connect(settings.DATABASE_URL)
-    conn.execute("PRAGMA foreign_keys = ON;")
+    conn = connections.get()
+    local = connections._local
     cursor = conn.cursor()
+    # Nested transaction() calls on the same thread join the outer one, only
+    # the outermost block commits or rolls back.
+    outermost = local.depth == 0
+    if outermost:
+        local.after_commit = []
+    local.depth += 1
     try:
         yield cursor
-        conn.commit()
+        if outermost:
+            conn.commit()
     except:
-        conn.rollback()
+        if outermost:
+            conn.rollback()
+            local.after_commit = []
         raise
     finally:
+        local.depth -= 1
         cursor.close()
-        conn.close()
+    if outermost:
+        callbacks, local.after_commit = local.after_commit, []
+        for callback in callbacks:
+            callback()
@@ -0,0 +1,368 @@
+"""
+Versioned schema migrations.
+
+The applied version is tracked with PRAGMA user_version. schema.sql is the
+baseline (version 0 -> 1); every entry in MIGRATIONS moves the database one
+version forward and runs exactly once.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Callable
+from edhelper.infra.config import settings
+
+
+_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+
+def _display_price(column: str) -> str:
+    # Prices are stored as display strings ("1.234,56").
+    return f"CAST(REPLACE(REPLACE({column}, '.', ''), ',', '.') AS REAL)"
+
+
+def _price_cents(column: str) -> str:
+    return f"CAST(ROUND({_display_price(column)} * 100) AS INTEGER)"
+
+
+def _deck_summary_totals(total_price: str) -> str:
+    """Recomputes the aggregated columns of a deck_summary row from its deck."""
+    return f"""
+    (card_count, commander_id, commander_name, color_identity, total_price) = (
+        SELECT
+            COALESCE(SUM(deck_cards.quantidade), 0),
+            MAX(CASE WHEN deck_cards.is_commander THEN cards.id END),
+            MAX(CASE WHEN deck_cards.is_commander THEN cards.name END),
+            MAX(CASE WHEN deck_cards.is_commander THEN cards.color_identity END),
+            {total_price}
+        FROM deck_cards
+        LEFT JOIN cards ON cards.id = deck_cards.card_id
+        WHERE deck_cards.deck_id = deck_summary.deck_id
+    )
+"""
+
+
+def _deck_summary_card_triggers(totals: str, card_columns: str) -> str:
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS deck_summary_deck_cards_ai AFTER INSERT ON deck_cards BEGIN
+            UPDATE deck_summary SET {totals}, last_change = {_NOW}
+            WHERE deck_id = new.deck_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS deck_summary_deck_cards_au AFTER UPDATE ON deck_cards BEGIN
+            UPDATE deck_summary SET {totals}, last_change = {_NOW}
+            WHERE deck_id IN (new.deck_id, old.deck_id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS deck_summary_deck_cards_ad AFTER DELETE ON deck_cards BEGIN
+            UPDATE deck_summary SET {totals}, last_change = {_NOW}
+            WHERE deck_id = old.deck_id;
+        END;
+
+        -- Card data changes (price syncs, renames) refresh the totals of the
+        -- decks holding the card without counting as a change to the deck.
+        CREATE TRIGGER IF NOT EXISTS deck_summary_cards_au
+        AFTER UPDATE OF {card_columns} ON cards BEGIN
+            UPDATE deck_summary SET {totals}
+            WHERE deck_id IN (SELECT deck_id FROM deck_cards WHERE card_id = new.id);
+        END;
+"""
+
+
+# Version 4 parsed the display strings, version 5 sums the numeric column.
+_DECK_SUMMARY_TOTALS_V4 = _deck_summary_totals(
+    f"COALESCE(SUM(deck_cards.quantidade * {_display_price('cards.price')}), 0)"
+)
+_DECK_SUMMARY_TOTALS = _deck_summary_totals(
+    "COALESCE(SUM(deck_cards.quantidade * cards.price_brl_cents), 0) / 100.0"
+)
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _rename_duplicate_decks(conn: sqlite3.Connection) -> str:
+    """
+    UPDATEs giving every deck but the oldest of each name a free name:
+    "<name>-<id>", or "<name>-<id>-2", "-3"... when a deck already has it.
+    """
+    rows = conn.execute("SELECT id, nome FROM decks ORDER BY id").fetchall()
+    taken = {nome for _, nome in rows}
+    kept = set()
+    statements = []
+    for deck_id, nome in rows:
+        if nome not in kept:
+            kept.add(nome)
+            continue
+        new_name = f"{nome}-{deck_id}"
+        suffix = 2
+        while new_name in taken:
+            new_name = f"{nome}-{deck_id}-{suffix}"
+            suffix += 1
+        taken.add(new_name)
+        statements.append(
+            f"UPDATE decks SET nome = {_quote(new_name)} WHERE id = {deck_id};"
+        )
+    return "\n".join(statements)
+
+
+# A migration is SQL, or a function of the connection returning the SQL when
+# it depends on the data.
+MIGRATIONS: list[tuple[int, str, str | Callable[[sqlite3.Connection], str]]] = [
+    (
+        2,
+        "indexes for deck and card lookups",
+        lambda conn: _rename_duplicate_decks(conn)
+        + """
+        DROP INDEX IF EXISTS ix_decks_nome;
+        DROP INDEX IF EXISTS ix_decks_id;
+        DROP INDEX IF EXISTS ix_cards_id;
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_decks_nome ON decks (nome);
+        CREATE INDEX IF NOT EXISTS ix_deck_cards_card_id ON deck_cards (card_id);
+        CREATE INDEX IF NOT EXISTS ix_cards_name_nocase ON cards (name COLLATE NOCASE);
+        """,
+    ),
+    (
+        3,
+        "full-text search over cards",
+        """
+        -- cards_fts refers to cards by rowid, which VACUUM may renumber
+        -- unless it is an INTEGER PRIMARY KEY: cards is rebuilt with one
+        -- (seq), keeping the rowids it already had.
+        CREATE TABLE cards_new (
+            seq INTEGER NOT NULL,
+            id VARCHAR NOT NULL,
+            name VARCHAR,
+            colors VARCHAR,
+            color_identity VARCHAR,
+            cmc INTEGER,
+            mana_cost VARCHAR,
+            image VARCHAR,
+            art VARCHAR,
+            legal_commanders BOOLEAN,
+            is_commander BOOLEAN,
+            price VARCHAR,
+            edhrec_rank INTEGER,
+            type_line VARCHAR,
+            PRIMARY KEY (seq),
+            UNIQUE (id)
+        );
+        INSERT INTO cards_new
+        (seq, id, name, colors, color_identity, cmc, mana_cost, image, art, legal_commanders, is_commander, price, edhrec_rank, type_line)
+        SELECT rowid, id, name, colors, color_identity, cmc, mana_cost, image, art, legal_commanders, is_commander, price, edhrec_rank, type_line
+        FROM cards;
+        DROP TABLE cards;
+        ALTER TABLE cards_new RENAME TO cards;
+        CREATE INDEX IF NOT EXISTS ix_cards_name ON cards (name);
+        CREATE INDEX IF NOT EXISTS ix_cards_name_nocase ON cards (name COLLATE NOCASE);
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(
+            name,
+            type_line,
+            content = 'cards',
+            content_rowid = 'rowid',
+            tokenize = "unicode61 remove_diacritics 2",
+            prefix = '2 3'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS cards_fts_ai AFTER INSERT ON cards BEGIN
+            INSERT INTO cards_fts (rowid, name, type_line)
+            VALUES (new.rowid, new.name, new.type_line);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS cards_fts_ad AFTER DELETE ON cards BEGIN
+            INSERT INTO cards_fts (cards_fts, rowid, name, type_line)
+            VALUES ('delete', old.rowid, old.name, old.type_line);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS cards_fts_au AFTER UPDATE OF name, type_line ON cards BEGIN
+            INSERT INTO cards_fts (cards_fts, rowid, name, type_line)
+            VALUES ('delete', old.rowid, old.name, old.type_line);
+            INSERT INTO cards_fts (rowid, name, type_line)
+            VALUES (new.rowid, new.name, new.type_line);
+        END;
+
+        INSERT INTO cards_fts (cards_fts) VALUES ('rebuild');
+        """,
+    ),
+    (
+        4,
+        "materialized deck summary",
+        f"""
+        CREATE TABLE IF NOT EXISTS deck_summary (
+            deck_id INTEGER NOT NULL,
+            card_count INTEGER NOT NULL DEFAULT 0,
+            commander_id VARCHAR,
+            commander_name VARCHAR,
+            color_identity VARCHAR,
+            total_price REAL NOT NULL DEFAULT 0,
+            last_change DATETIME,
+            PRIMARY KEY (deck_id),
+            FOREIGN KEY(deck_id) REFERENCES decks (id) ON DELETE CASCADE
+        );
+
+        INSERT OR REPLACE INTO deck_summary (deck_id, last_change)
+        SELECT id, last_update FROM decks;
+        UPDATE deck_summary SET {_DECK_SUMMARY_TOTALS_V4};
+
+        CREATE TRIGGER IF NOT EXISTS deck_summary_decks_ai AFTER INSERT ON decks BEGIN
+            INSERT OR REPLACE INTO deck_summary (deck_id, last_change)
+            VALUES (new.id, new.last_update);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS deck_summary_decks_ad AFTER DELETE ON decks BEGIN
+            DELETE FROM deck_summary WHERE deck_id = old.id;
+        END;
+
+        {_deck_summary_card_triggers(
+            _DECK_SUMMARY_TOTALS_V4, "name, price, color_identity"
+        )}
+        """,
+    ),
+    (
+        5,
+        "exchange rates and numeric prices",
+        f"""
+        CREATE TABLE IF NOT EXISTS exchange_rates (
+            base VARCHAR NOT NULL,
+            quote VARCHAR NOT NULL,
+            rate REAL NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (base, quote)
+        );
+
+        ALTER TABLE cards ADD COLUMN price_usd_cents INTEGER;
+        ALTER TABLE cards ADD COLUMN price_brl_cents INTEGER;
+        UPDATE cards SET price_brl_cents = {_price_cents("price")};
+        CREATE INDEX IF NOT EXISTS ix_cards_price_brl_cents ON cards (price_brl_cents);
+
+        -- price stays the display string and price_brl_cents follows it, so
+        -- every writer keeps the numeric column right.
+        CREATE TRIGGER IF NOT EXISTS cards_price_ai AFTER INSERT ON cards BEGIN
+            UPDATE cards SET price_brl_cents = {_price_cents("new.price")}
+            WHERE rowid = new.rowid;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS cards_price_au AFTER UPDATE OF price ON cards BEGIN
+            UPDATE cards SET price_brl_cents = {_price_cents("new.price")}
+            WHERE rowid = new.rowid;
+        END;
+
+        DROP TRIGGER IF EXISTS deck_summary_deck_cards_ai;
+        DROP TRIGGER IF EXISTS deck_summary_deck_cards_au;
+        DROP TRIGGER IF EXISTS deck_summary_deck_cards_ad;
+        DROP TRIGGER IF EXISTS deck_summary_cards_au;
+        {_deck_summary_card_triggers(
+            _DECK_SUMMARY_TOTALS, "name, price_brl_cents, color_identity"
+        )}
+        UPDATE deck_summary SET {_DECK_SUMMARY_TOTALS};
+        """,
+    ),
+    (
+        6,
+        "sync state",
+        """
+        CREATE TABLE IF NOT EXISTS sync_state (
+            scope VARCHAR NOT NULL,
+            key VARCHAR NOT NULL DEFAULT '',
+            last_started_at REAL,
+            last_synced_at REAL,
+            last_outcome VARCHAR,
+            last_error VARCHAR,
+            duration REAL,
+            PRIMARY KEY (scope, key)
+        );
+        CREATE INDEX IF NOT EXISTS ix_sync_state_scope_synced
+        ON sync_state (scope, last_synced_at);
+        """,
+    ),
+    (
+        7,
+        "per-card sync times",
+        """
+        -- Unix times: last_synced_at for the card data from the API,
+        -- price_synced_at for the Scryfall price. NULL means never synced.
+        ALTER TABLE cards ADD COLUMN last_synced_at REAL;
+        ALTER TABLE cards ADD COLUMN price_synced_at REAL;
+        ALTER TABLE cards ADD COLUMN data_hash VARCHAR;
+        CREATE INDEX IF NOT EXISTS ix_cards_last_synced_at ON cards (last_synced_at);
+        CREATE INDEX IF NOT EXISTS ix_cards_price_synced_at ON cards (price_synced_at);
+        """,
+    ),
+    (
+        8,
+        "sync jobs",
+        """
+        -- checkpoint is the id of the last card of the last committed chunk,
+        -- run_started_at/run_processed where the current run picked it up.
+        CREATE TABLE IF NOT EXISTS sync_jobs (
+            id INTEGER NOT NULL,
+            scope VARCHAR NOT NULL,
+            status VARCHAR NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            checkpoint VARCHAR,
+            started_at REAL NOT NULL,
+            run_started_at REAL NOT NULL,
+            run_processed INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL,
+            finished_at REAL,
+            error VARCHAR,
+            PRIMARY KEY (id)
+        );
+        CREATE INDEX IF NOT EXISTS ix_sync_jobs_scope_id ON sync_jobs (scope, id);
+        """,
+    ),
+]
+
+LATEST_VERSION = max([1] + [version for version, _, _ in MIGRATIONS])
+
+
+def get_schema_path() -> Path:
+    # Try to find schema.sql relative to this file first
+    schema_path = Path(__file__).parent / "schema.sql"
+    if not schema_path.exists():
+        # Fallback to BASE_PATH
+        schema_path = Path(settings.BASE_PATH) / "edhelper" / "infra" / "schema.sql"
+    return schema_path
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def _apply(conn: sqlite3.Connection, version: int, sql: str):
+    # executescript() commits any pending transaction, so the migration and
+    # its version bump are wrapped in an explicit one.
+    conn.executescript(f"BEGIN;\n{sql}\nPRAGMA user_version = {version};\nCOMMIT;")
+
+
+def migrate(conn: sqlite3.Connection) -> list[int]:
+    """Bring the database up to LATEST_VERSION, returns the applied versions."""
+    current = get_version(conn)
+    if current >= LATEST_VERSION:
+        return []
+
+    # Rebuilding a table must not cascade to or check the rows referring to
+    # it, and foreign_keys cannot be changed inside the migration's
+    # transaction.
+    foreign_keys = conn.execute("PRAGMA foreign_keys;").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    applied = []
+    try:
+        if current < 1:
+            _apply(conn, 1, get_schema_path().read_text())
+            applied.append(1)
+        for version, _, sql in sorted(MIGRATIONS):
+            if version <= max(current, 1):
+                continue
+            _apply(conn, version, sql(conn) if callable(sql) else sql)
+            applied.append(version)
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {foreign_keys};")
+    return applied
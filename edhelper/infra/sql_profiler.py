@@ -0,0 +1,257 @@
+"""
+Opt-in SQL timing.
+
+When profiling is on, connections opened by edhelper.infra.db use
+ProfilingConnection: every execute()/executemany() is timed (including the
+rows fetched afterwards) and aggregated per label, where a label is the CLI
+command or editor request being served. Statements SQLite runs on its own
+(trigger bodies, executescript, implicit BEGINs) are seen through
+set_trace_callback and counted.
+"""
+
+import contextvars
+import logging
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from tabulate import tabulate
+
+
+logger = logging.getLogger("edhelper.sql")
+
+_current_label = contextvars.ContextVar("sql_profile_label", default="-")
+_local = threading.local()
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    return _SPACES.sub(" ", sql).strip()
+
+
+class QueryStats:
+    __slots__ = ("label", "sql", "calls", "total", "max", "rows", "params", "triggered")
+
+    def __init__(self, label: str, sql: str):
+        self.label = label
+        self.sql = sql
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.params = 0
+        # Statements SQLite ran on behalf of this one, i.e. trigger bodies.
+        self.triggered = 0
+
+    def add_time(self, elapsed: float):
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+
+class SqlProfiler:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, str], QueryStats] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self, label: str | None = None):
+        with self._lock:
+            if label is None:
+                self._stats.clear()
+            else:
+                for key in [k for k in self._stats if k[0] == label]:
+                    del self._stats[key]
+
+    @contextmanager
+    def label(self, name: str):
+        """Attribute the statements run inside the block to name."""
+        token = _current_label.set(name)
+        try:
+            yield
+        finally:
+            _current_label.reset(token)
+
+    def _entry(self, sql: str) -> QueryStats:
+        key = (_current_label.get(), normalize_sql(sql))
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = QueryStats(*key)
+            return entry
+
+    def record(
+        self, sql: str, params: int, elapsed: float, rows: int, triggered: int = 0
+    ) -> QueryStats:
+        entry = self._entry(sql)
+        with self._lock:
+            entry.calls += 1
+            entry.params += params
+            entry.rows += max(rows, 0)
+            entry.triggered += max(triggered, 0)
+            entry.add_time(elapsed)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "[%s] %.3f ms params=%d rows=%d %s",
+                entry.label,
+                elapsed * 1000,
+                params,
+                max(rows, 0),
+                entry.sql,
+            )
+        return entry
+
+    def add_fetch(self, entry: QueryStats, rows: int, elapsed: float):
+        with self._lock:
+            entry.rows += rows
+            entry.add_time(elapsed)
+
+    def trace(self, sql: str):
+        # Inside a ProfilingCursor call the callback fires once for the
+        # statement itself and once per trigger body it sets off, so only the
+        # count is kept. Anything else (executescript, commits) gets its own
+        # untimed entry.
+        if getattr(_local, "traces", None) is not None:
+            if not sql.startswith("BEGIN"):
+                _local.traces += 1
+            return
+        entry = self._entry(sql)
+        with self._lock:
+            entry.calls += 1
+
+    def stats(self, label: str | None = None) -> list[QueryStats]:
+        with self._lock:
+            entries = list(self._stats.values())
+        if label is not None:
+            entries = [e for e in entries if e.label == label]
+        return sorted(entries, key=lambda e: e.total, reverse=True)
+
+    def summary(self, label: str) -> tuple[int, float]:
+        """(statements, total seconds) recorded under label."""
+        entries = self.stats(label)
+        return sum(e.calls for e in entries), sum(e.total for e in entries)
+
+    def report(self, top: int = 10, label: str | None = None) -> str:
+        entries = self.stats(label)[:top]
+        if not entries:
+            return "No SQL statements recorded."
+        headers = [
+            "Label",
+            "Calls",
+            "Total ms",
+            "Avg ms",
+            "Max ms",
+            "Rows",
+            "Params",
+            "Triggered",
+            "SQL",
+        ]
+        data = [
+            [
+                e.label,
+                e.calls,
+                f"{e.total * 1000:.2f}",
+                f"{e.avg * 1000:.3f}",
+                f"{e.max * 1000:.3f}",
+                e.rows,
+                e.params,
+                e.triggered,
+                e.sql if len(e.sql) <= 80 else e.sql[:77] + "...",
+            ]
+            for e in entries
+        ]
+        return tabulate(data, headers=headers, tablefmt="github")
+
+
+profiler = SqlProfiler()
+
+
+@contextmanager
+def _counting_traces():
+    outer = getattr(_local, "traces", None)
+    _local.traces = 0
+    try:
+        yield
+    finally:
+        _local.traces = outer
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    _entry = None
+
+    def execute(self, sql, parameters=()):
+        with _counting_traces():
+            start = perf_counter()
+            try:
+                return super().execute(sql, parameters)
+            finally:
+                self._entry = profiler.record(
+                    sql,
+                    len(parameters),
+                    perf_counter() - start,
+                    self.rowcount,
+                    _local.traces - 1,
+                )
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        with _counting_traces():
+            start = perf_counter()
+            try:
+                return super().executemany(sql, seq_of_parameters)
+            finally:
+                self._entry = profiler.record(
+                    sql,
+                    sum(len(p) for p in seq_of_parameters),
+                    perf_counter() - start,
+                    self.rowcount,
+                    _local.traces - len(seq_of_parameters),
+                )
+
+    def _fetched(self, rows: int, start: float):
+        if self._entry is not None:
+            profiler.add_fetch(self._entry, rows, perf_counter() - start)
+
+    def fetchone(self):
+        start = perf_counter()
+        row = super().fetchone()
+        self._fetched(row is not None, start)
+        return row
+
+    def fetchmany(self, size=None):
+        start = perf_counter()
+        rows = super().fetchmany(size if size is not None else self.arraysize)
+        self._fetched(len(rows), start)
+        return rows
+
+    def fetchall(self):
+        start = perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), start)
+        return rows
+
+    def __next__(self):
+        start = perf_counter()
+        row = super().__next__()
+        self._fetched(1, start)
+        return row
+
+
+class ProfilingConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(profiler.trace)
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
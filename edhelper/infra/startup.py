@@ -0,0 +1,45 @@
+"""
+Timings of the one-off work done when edhelper starts (database migration,
+keyring reads, ...). Printed by `edhelper --info`, and at exit when
+EDHELPER_PROFILE_STARTUP is set.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+
+logger = logging.getLogger("edhelper.startup")
+
+_timings: dict[str, float] = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def timed(name: str):
+    """Add the time spent in the block to the timing called name."""
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = perf_counter() - start
+        with _lock:
+            _timings[name] = _timings.get(name, 0.0) + elapsed
+        logger.debug("%s took %.1f ms", name, elapsed * 1000)
+
+
+def timings() -> dict[str, float]:
+    with _lock:
+        return dict(_timings)
+
+
+def report() -> str:
+    items = timings()
+    if not items:
+        return "No startup timings recorded."
+    width = max(len(name) for name in items)
+    lines = ["Startup timings:"]
+    for name, elapsed in items.items():
+        lines.append(f"  {name:<{width}}  {elapsed * 1000:8.1f} ms")
+    return "\n".join(lines)
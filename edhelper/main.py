@@ -5,6 +5,7 @@ Entry point principal - tenta usar CLI completa, fallback para comandos básicos
 import click
 from edhelper.infra.config import settings
 from edhelper.infra.init_db import init_db
+from edhelper.infra.startup import timed
 
 # Tenta importar CLI completa
 try:
@@ -109,7 +110,8 @@ def start_editor():
         )
 
 
-init_db()
+with timed("init_db"):
+    init_db()
 
 if __name__ == "__main__":
     cli()
@@ -3,9 +3,12 @@ from edhelper.commom.sync_db_commands import SyncDbCommands
 
 
 class SyncDbCommand(BaseCommand):
+    def __init__(self, resume=False):
+        self.resume = resume
+
     def run(self, ctx):
         try:
-            SyncDbCommands.sync_database_shell()
+            SyncDbCommands.sync_database_shell(resume=self.resume)
         except Exception as e:
             print(f"Error: {e}")
 
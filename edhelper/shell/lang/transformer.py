@@ -145,5 +145,5 @@ class CommandTransformer(Transformer):
             return AnalizeCommand()
         return AnalizeCommand(items[0])
 
-    def sync_db_cmd(self, _):
-        return SyncDbCommand()
+    def sync_db_cmd(self, items):
+        return SyncDbCommand(resume=bool(items))
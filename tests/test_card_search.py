@@ -0,0 +1,72 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from edhelper.infra.config import settings
+from edhelper.infra.db import connections
+from edhelper.infra.init_db import init_db
+from edhelper.domain import card_service
+from edhelper.domain.card import Card
+
+
+class CardSearchAfterVacuumTest(unittest.TestCase):
+    def setUp(self):
+        self._database_url = settings.DATABASE_URL
+        self._dir = tempfile.TemporaryDirectory()
+        settings.DATABASE_URL = os.path.join(self._dir.name, "db.sqlite3")
+        init_db()
+
+    def tearDown(self):
+        connections.close_all()
+        settings.DATABASE_URL = self._database_url
+        self._dir.cleanup()
+
+    def _vacuum(self):
+        conn = sqlite3.connect(settings.DATABASE_URL)
+        try:
+            conn.execute("VACUUM;")
+        finally:
+            conn.close()
+
+    def test_search_after_deletes_and_vacuum(self):
+        names = ["Sol Ring", "Lightning Bolt", "Arcane Signet", "Bolt Bend"]
+        card_service.insert_or_update_cards(
+            [
+                Card(id=f"card-{i}", name=name, type_line="Instant")
+                for i, name in enumerate(names)
+            ]
+        )
+        # Leave a gap before the cards that are searched for.
+        conn = sqlite3.connect(settings.DATABASE_URL)
+        try:
+            with conn:
+                conn.execute("DELETE FROM cards WHERE id IN ('card-0', 'card-2')")
+        finally:
+            conn.close()
+        self._vacuum()
+
+        found = card_service.search_cards("bolt")
+        self.assertEqual(
+            sorted(card.name for card in found), ["Bolt Bend", "Lightning Bolt"]
+        )
+        self.assertEqual(card_service.search_cards("ring"), [])
+
+    def test_rowids_survive_vacuum(self):
+        card_service.insert_or_update_cards(
+            [Card(id=f"card-{i}", name=f"Card {i}") for i in range(20)]
+        )
+        conn = sqlite3.connect(settings.DATABASE_URL)
+        try:
+            with conn:
+                conn.execute("DELETE FROM cards WHERE seq % 2 = 0")
+            before = conn.execute("SELECT rowid, id FROM cards ORDER BY id").fetchall()
+            conn.execute("VACUUM;")
+            after = conn.execute("SELECT rowid, id FROM cards ORDER BY id").fetchall()
+        finally:
+            conn.close()
+        self.assertEqual(before, after)
+
+
+if __name__ == "__main__":
+    unittest.main()